@@ -0,0 +1,31 @@
+from functools import wraps
+
+from django.contrib import messages
+from django.shortcuts import redirect
+
+from .models import UsageLimitReached, UserProfile
+
+
+def limit_reached(request):
+    messages.error(request, "You've used all of today's conversions. Upgrade for more.")
+    return redirect("pricing")
+
+
+def usage_limit(view):
+    """Refuse new conversions once the user's plan limit for today is used.
+
+    The check up front turns requests away before their uploads are read;
+    enqueue_job then reserves the conversion atomically and raises
+    UsageLimitReached if a concurrent request took the last one.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "POST":
+            return view(request, *args, **kwargs)
+        if not UserProfile.for_user(request.user).can_use():
+            return limit_reached(request)
+        try:
+            return view(request, *args, **kwargs)
+        except UsageLimitReached:
+            return limit_reached(request)
+    return wrapper
@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
 from django.contrib.auth.models import User
 from django.utils import timezone
-from datetime import timedelta
+
+class UsageLimitReached(Exception):
+    """The plan's conversions for today are used up."""
+
 
 class UserProfile(models.Model):
     PLAN_CHOICES = (
@@ -10,15 +14,43 @@ class UserProfile(models.Model):
         ("business", "Business"),
     )
 
+    # Conversions per day; plans not listed are unlimited.
+    DAILY_LIMITS = {"free": 5}
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     plan = models.CharField(max_length=20, choices=PLAN_CHOICES, default="free")
-    daily_usage = models.IntegerField(default=0)
-    last_reset = models.DateField(auto_now=True)
+
+    @classmethod
+    def for_user(cls, user):
+        try:
+            return user.userprofile
+        except cls.DoesNotExist:
+            # Users created before profiles were added.
+            profile, _ = cls.objects.get_or_create(user=user)
+            return profile
+
+    def daily_limit(self):
+        return self.DAILY_LIMITS.get(self.plan)
 
     def can_use(self):
-        if self.plan == "free":
-            return self.daily_usage < 5
-        return True
+        limit = self.daily_limit()
+        return limit is None or DailyUsage.total(self.user) < limit
+
+    def reserve(self, tool):
+        """Count one conversion of `tool` today, or raise UsageLimitReached.
+
+        The check and the increment run with the profile row locked, so
+        concurrent requests can't both take the last conversion.
+        """
+        limit = self.daily_limit()
+        if limit is None:
+            DailyUsage.record(self.user, tool)
+            return
+        with transaction.atomic():
+            UserProfile.objects.select_for_update().get(pk=self.pk)
+            if DailyUsage.total(self.user) >= limit:
+                raise UsageLimitReached()
+            DailyUsage.record(self.user, tool)
 
     def share_days(self):
         if self.plan == "free":
@@ -27,9 +59,44 @@ class UserProfile(models.Model):
             return 7
         return 3650  # business = no expiry
 
-    def increment(self):
-        self.daily_usage += 1
-        self.save()
-
     def __str__(self):
         return f"{self.user.username} ({self.plan})"
+
+
+class DailyUsage(models.Model):
+    """Conversions per user, day and tool.
+
+    Counters are bumped with F() updates, so there is one row per day and
+    tool rather than one per request, and a new day simply starts new rows.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="usage")
+    date = models.DateField()
+    tool = models.CharField(max_length=32)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date", "tool"], name="unique_daily_usage"),
+        ]
+
+    @classmethod
+    def record(cls, user, tool, amount=1, date=None):
+        date = date or timezone.localdate()
+        bucket = cls.objects.filter(user=user, date=date, tool=tool)
+        if bucket.update(count=F("count") + amount):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user=user, date=date, tool=tool, count=amount)
+        except IntegrityError:
+            # Another request created today's row first.
+            bucket.update(count=F("count") + amount)
+
+    @classmethod
+    def total(cls, user, date=None):
+        date = date or timezone.localdate()
+        return cls.objects.filter(user=user, date=date).aggregate(n=Sum("count"))["n"] or 0
+
+    def __str__(self):
+        return f"{self.user.username} {self.date} {self.tool}: {self.count}"
@@ -1,3 +1,82 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+
+from pdf_engine import jobs
+from pdf_engine.models import ConversionJob
+
+from .models import DailyUsage, UsageLimitReached, UserProfile
+
+
+class UsageLimitTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        patcher = mock.patch.object(jobs, "JOB_DIR", self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("alice")
+        self.profile = UserProfile.for_user(self.user)
+        self.limit = self.profile.daily_limit()
+        self.client.force_login(self.user)
+
+    def upload(self, content=b"%PDF-1.4"):
+        return SimpleUploadedFile("in.pdf", content, content_type="application/pdf")
+
+    def compress(self):
+        return self.client.post(
+            reverse("compress"),
+            {"pdf_file": self.upload(), "compression_level": "recommended"},
+        )
+
+    def test_reserve_stops_at_the_limit(self):
+        for _ in range(self.limit):
+            self.profile.reserve("compress")
+        with self.assertRaises(UsageLimitReached):
+            self.profile.reserve("split")
+        self.assertEqual(DailyUsage.total(self.user), self.limit)
+
+    def test_paid_plans_are_unlimited(self):
+        self.profile.plan = "pro"
+        self.profile.save()
+        for _ in range(self.limit + 1):
+            self.profile.reserve("compress")
+        self.assertEqual(DailyUsage.total(self.user), self.limit + 1)
+
+    def test_queued_jobs_count(self):
+        for i in range(self.limit):
+            jobs.enqueue_job(self.user, "compress", [self.upload(f"%PDF {i}".encode())])
+        self.assertEqual(ConversionJob.objects.filter(status=ConversionJob.QUEUED).count(),
+                         self.limit)
+
+        with self.assertRaises(UsageLimitReached):
+            jobs.enqueue_job(self.user, "compress", [self.upload()])
+        self.assertEqual(ConversionJob.objects.count(), self.limit)
+
+    def test_failed_staging_gives_the_conversion_back(self):
+        with mock.patch.object(jobs, "stage_upload", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                jobs.enqueue_job(self.user, "compress", [self.upload()])
+        self.assertEqual(DailyUsage.total(self.user), 0)
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    def test_view_redirects_once_limit_is_used(self):
+        DailyUsage.record(self.user, "merge", self.limit)
+        response = self.compress()
+        self.assertRedirects(response, reverse("pricing"))
+        self.assertFalse(ConversionJob.objects.exists())
 
-# Create your tests here.
+    def test_view_maps_a_lost_race_to_the_limit_page(self):
+        # The precheck passes, but another request takes the last conversion.
+        DailyUsage.record(self.user, "merge", self.limit)
+        with mock.patch.object(UserProfile, "can_use", return_value=True):
+            response = self.compress()
+        self.assertRedirects(response, reverse("pricing"))
+        self.assertFalse(ConversionJob.objects.exists())
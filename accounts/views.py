@@ -79,7 +79,6 @@ def activate_pro(request):
     if request.method == "POST":
         profile = request.user.userprofile
         profile.plan = "pro"
-        profile.daily_limit = 9999  # optional
         profile.save()
 
         messages.success(request, "🎉 Pro plan activated!")
@@ -0,0 +1,81 @@
+"""Bytes written to disk per conversion, relative to the input size.
+
+    python benchmarks/bench_bytes_written.py [--pages 200]
+
+Counts the bytes passed to write() by the conversion itself (wchar in
+/proc/self/io), so temp-file round trips show up directly. Linux only.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf_engine.core.conversions import run_operation
+
+OPERATIONS = {
+    "merge": "merged.pdf",
+    "compress": "compressed.pdf",
+    "pdf_to_word": "output.docx",
+    "unlock": "unlocked.pdf",
+}
+
+
+def make_pdf(path, pages, encrypt=None):
+    c = canvas.Canvas(path, pagesize=A4, encrypt=encrypt)
+    w, h = A4
+    for i in range(pages):
+        for line in range(40):
+            c.drawString(40, h - 60 - line * 18, f"Page {i + 1} line {line + 1} " * 3)
+        c.showPage()
+    c.save()
+
+
+def written_bytes():
+    with open("/proc/self/io") as f:
+        for line in f:
+            if line.startswith("wchar:"):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(operation, paths, output_path, **options):
+    before = written_bytes()
+    run_operation(operation, paths, output_path, **options)
+    return written_bytes() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, "plain.pdf")
+        locked = os.path.join(tmp, "locked.pdf")
+        make_pdf(plain, args.pages)
+        make_pdf(locked, args.pages, encrypt="secret")
+        size = os.path.getsize(plain)
+
+        print(f"input: {args.pages} pages, {size / 1024:.0f} KiB")
+        print(f"{'operation':<12} {'input':<9} {'written KiB':>12} {'x input':>8}")
+        for operation, filename in OPERATIONS.items():
+            for label, path, options in (
+                ("plain", plain, {}),
+                ("encrypted", locked, {"password": "secret"}),
+            ):
+                if operation in ("merge", "compress") and options:
+                    continue
+                paths = [path, path] if operation == "merge" else [path]
+                output_path = os.path.join(tmp, f"{label}_{filename}")
+                written = measure(operation, paths, output_path, **options)
+                print(f"{operation:<12} {label:<9} {written / 1024:>12.0f} "
+                      f"{written / size:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Concurrent conversion bookkeeping against the configured database.
+
+    python benchmarks/bench_db_load.py [--workers 1 4 8 16] [--seconds 5]
+        [--setups legacy configured]
+
+Each worker process repeats the writes a conversion job makes (queue the
+job, claim it, count usage, mark it done) as fast as it can. "legacy" is
+the old SQLite setup (rollback journal, deferred transactions, 5 s lock
+timeout); "configured" is config/settings.py as it stands, so run with
+DB_ENGINE=postgresql (and DB_POOL=1) to measure PostgreSQL. SQLite runs
+get a fresh database file each; PostgreSQL uses DB_NAME as it is.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+
+def setup_django(setup, db_name):
+    if db_name:
+        os.environ["DB_NAME"] = db_name
+    from config import settings
+
+    if setup == "legacy":
+        settings.DATABASES["default"]["OPTIONS"] = {}
+
+    import django
+    django.setup()
+
+
+def prepare(setup, db_name):
+    setup_django(setup, db_name)
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    User.objects.get_or_create(username="bench_db_load")
+
+
+def convert_once(user):
+    from django.utils import timezone
+
+    from accounts.models import DailyUsage
+    from pdf_engine.models import ConversionJob
+
+    job = ConversionJob.objects.create(user=user, operation="compress")
+    DailyUsage.record(user, "compress")
+    ConversionJob.objects.filter(pk=job.pk, status=ConversionJob.QUEUED).update(
+        status=ConversionJob.RUNNING, started_at=timezone.now()
+    )
+    job.status = ConversionJob.DONE
+    job.finished_at = timezone.now()
+    job.save()
+
+
+def _work(setup, db_name, seconds, barrier, queue):
+    setup_django(setup, db_name)
+    from django.contrib.auth.models import User
+    from django.db import OperationalError
+
+    user = User.objects.get(username="bench_db_load")
+    # Start the clock once every worker has imported Django.
+    barrier.wait()
+    deadline = time.time() + seconds
+    done = errors = 0
+    while time.time() < deadline:
+        try:
+            convert_once(user)
+            done += 1
+        except OperationalError:
+            errors += 1
+    queue.put((done, errors))
+
+
+def run(setup, workers, seconds, db_name):
+    queue = multiprocessing.Queue()
+    barrier = multiprocessing.Barrier(workers)
+    procs = [
+        multiprocessing.Process(target=_work, args=(setup, db_name, seconds, barrier, queue))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--setups", nargs="+", default=["legacy", "configured"],
+                        choices=["legacy", "configured"])
+    args = parser.parse_args()
+
+    sqlite = os.environ.get("DB_ENGINE", "sqlite") == "sqlite"
+    print(f"{'setup':>10} {'workers':>7} {'jobs/s':>9} {'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for setup in args.setups:
+            for workers in args.workers:
+                db_name = os.path.join(tmp, f"{setup}_{workers}.sqlite3") if sqlite else None
+                p = multiprocessing.Process(target=prepare, args=(setup, db_name))
+                p.start()
+                p.join()
+
+                done, errors = run(setup, workers, args.seconds, db_name)
+                print(f"{setup:>10} {workers:>7} {done / args.seconds:>9.0f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Throughput and peak memory of excel_to_pdf renderers.
+
+    python benchmarks/bench_excel_to_pdf.py [--rows 1000 10000 100000]
+        [--columns 8] [--sheets 1]
+
+"iterrows" is the old pandas + drawString-per-cell code (first sheet
+only), "tables" the streaming renderer in pdf_engine.core.tables (all
+sheets). rows/s counts the rows each mode actually rendered.
+
+Each run happens in a fresh process so ru_maxrss is that run's peak RSS.
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf_engine.core.tables import render_workbook
+
+
+def make_workbook(path, rows, columns, sheets):
+    wb = Workbook(write_only=True)
+    start = datetime.date(2024, 1, 1)
+    for s in range(sheets):
+        ws = wb.create_sheet(f"Sheet{s + 1}")
+        ws.append([f"Column {c + 1}" for c in range(columns)])
+        for r in range(rows):
+            ws.append([
+                r if c == 0 else
+                start + datetime.timedelta(days=r % 365) if c == 1 else
+                f"item {r * c % 9973}" if c % 2 else
+                r * c / 7
+                for c in range(columns)
+            ])
+    wb.save(path)
+
+
+def render_iterrows(xlsx_path, pdf_path):
+    # The previous implementation.
+    df = pd.read_excel(xlsx_path)
+    c = canvas.Canvas(pdf_path, pagesize=A4)
+    w, h = A4
+    y = h - 40
+    for _, row in df.iterrows():
+        x = 40
+        for v in row:
+            c.drawString(x, y, str(v))
+            x += 120
+        y -= 20
+        if y < 40:
+            c.showPage()
+            y = h - 40
+    c.save()
+
+
+def render_tables(xlsx_path, pdf_path):
+    render_workbook(xlsx_path, pdf_path)
+
+
+MODES = {"iterrows": render_iterrows, "tables": render_tables}
+
+# How many sheets of the workbook each mode renders.
+SHEETS_RENDERED = {"iterrows": lambda sheets: 1, "tables": lambda sheets: sheets}
+
+
+def _run(mode, xlsx_path, queue):
+    pdf_path = xlsx_path + f".{mode}.pdf"
+    try:
+        start = time.perf_counter()
+        MODES[mode](xlsx_path, pdf_path)
+        elapsed = time.perf_counter() - start
+        os.remove(pdf_path)
+    except Exception as e:
+        queue.put(e)
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    queue.put((elapsed, peak / 1024))
+
+
+def measure(mode, xlsx_path):
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_run, args=(mode, xlsx_path, queue))
+    p.start()
+    result = queue.get()
+    p.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--sheets", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'mode':>9} {'seconds':>9} {'rows/s':>9} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            xlsx_path = os.path.join(tmp, f"book_{rows}.xlsx")
+            make_workbook(xlsx_path, rows, args.columns, args.sheets)
+            for mode in MODES:
+                elapsed, peak = measure(mode, xlsx_path)
+                rendered = rows * SHEETS_RENDERED[mode](args.sheets)
+                print(f"{rows:>7} {mode:>9} {elapsed:>9.2f} {rendered / elapsed:>9.0f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Time and peak memory of image_to_pdf strategies.
+
+    python benchmarks/bench_image_to_pdf.py [--images 10 50] [--megapixels 12]
+
+"pil" is the old approach (every image decoded, then PIL's save_all),
+"streaming" the page-at-a-time builder with JPEG passthrough and
+"downscale" the builder with --max-dpi on A4 pages.
+
+Each run happens in a fresh process so ru_maxrss is that run's peak RSS.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from pdf_engine.core.imagepdf import images_to_pdf
+
+
+def make_images(directory, count, megapixels):
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([(x // 7) % 256, (y // 5) % 256, ((x + y) // 11) % 256], -1)
+    noise = np.random.randint(0, 24, base.shape)
+    Image.fromarray((base + noise).astype("uint8")).save(
+        os.path.join(directory, "photo.jpg"), quality=90
+    )
+    # The same bytes under different names are enough to measure throughput.
+    src = os.path.join(directory, "photo.jpg")
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"img_{i}.jpg")
+        os.link(src, path)
+        paths.append(path)
+    return paths
+
+
+def build_pil(paths, output_path, max_dpi):
+    # The previous implementation.
+    images = [Image.open(p).convert("RGB") for p in paths]
+    images[0].save(output_path, "PDF", save_all=True, append_images=images[1:])
+
+
+def build_streaming(paths, output_path, max_dpi):
+    images_to_pdf(paths, output_path)
+
+
+def build_downscale(paths, output_path, max_dpi):
+    images_to_pdf(paths, output_path, max_dpi=max_dpi)
+
+
+MODES = {"pil": build_pil, "streaming": build_streaming, "downscale": build_downscale}
+
+
+def _run(mode, paths, output_path, max_dpi, queue):
+    try:
+        start = time.perf_counter()
+        MODES[mode](paths, output_path, max_dpi)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(output_path)
+        os.remove(output_path)
+    except Exception as e:
+        queue.put(e)
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    queue.put((elapsed, peak / 1024, size / 1024 ** 2))
+
+
+def measure(mode, paths, output_path, max_dpi):
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_run, args=(mode, paths, output_path, max_dpi, queue))
+    p.start()
+    result = queue.get()
+    p.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--max-dpi", type=int, default=150)
+    args = parser.parse_args()
+
+    print(f"{'images':>6} {'mode':>10} {'seconds':>9} {'peak MiB':>9} {'out MiB':>8}")
+    for count in args.images:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = make_images(tmp, count, args.megapixels)
+            output_path = os.path.join(tmp, "out.pdf")
+            for mode in MODES:
+                elapsed, peak, size = measure(mode, paths, output_path, args.max_dpi)
+                print(f"{count:>6} {mode:>10} {elapsed:>9.2f} {peak:>9.1f} {size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Start-up cost of the web app and the conversion backends.
+
+    python benchmarks/bench_importtime.py [--targets web core merge ...]
+        [--repeat 5] [--top 5]
+
+Each target is imported in a fresh interpreter under `python -X importtime`:
+"web" is everything a WSGI worker loads (django.setup() and the URLconf),
+"worker" the same for `runworkers`, "core" the pdf_engine.core package and
+an operation name that tool's converter, on top of the core package. "all"
+loads every converter.
+
+Reported are the median import time, the process RSS once the target is
+loaded and the slowest third-party packages, from importtime's cumulative
+column.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = "--- target ---"
+LOCAL = {"pdf_engine", "accounts", "pricing", "config"}
+
+OPERATIONS = [
+    "merge", "split", "compress", "unlock", "pdf_to_word", "pdf_to_image",
+    "image_to_pdf", "excel_to_pdf", "pdf_to_excel", "word_to_pdf",
+]
+
+PROBE = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+{prelude}
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+{target}
+seconds = time.perf_counter() - start
+with open("/proc/self/status") as f:
+    rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+print(seconds, rss)
+"""
+
+DJANGO = (
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')\n"
+    "import django\n"
+    "django.setup()\n"
+)
+
+
+def target_code(name):
+    """Return (prelude, target) source for a target name."""
+    # Django's own start-up is part of what a web or job worker pays.
+    if name == "web":
+        return "", DJANGO + "import config.urls"
+    if name == "worker":
+        return "", DJANGO + (
+            "import pdf_engine.management.commands.runworkers\n"
+            "from pdf_engine.core.conversions import load_converters\n"
+            "load_converters()"
+        )
+    if name == "core":
+        return "", "import pdf_engine.core"
+    if name == "all":
+        return "import pdf_engine.core", (
+            "from pdf_engine.core.conversions import OPERATIONS, converter\n"
+            "for operation in OPERATIONS: converter(operation)"
+        )
+    return "import pdf_engine.core", (
+        f"from pdf_engine.core.conversions import converter\nconverter({name!r})"
+    )
+
+
+def heaviest(stderr, top):
+    """Slowest third-party packages imported after the marker, as (name, seconds).
+
+    A package imported by another one (numpy by pandas) is counted in both.
+    """
+    found = {}
+    for line in stderr.split(MARKER, 1)[-1].splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cumulative.isdigit() and "." not in name and name not in LOCAL:
+            found[name] = found.get(name, 0) + int(cumulative) / 1e6
+    return sorted(found.items(), key=lambda item: -item[1])[:top]
+
+
+def measure(name, top):
+    prelude, target = target_code(name)
+    code = PROBE.format(root=ROOT, prelude=prelude, marker=MARKER, target=target)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"{name}: {proc.stderr.strip().splitlines()[-1]}")
+    seconds, rss = proc.stdout.split()
+    return float(seconds), int(rss), heaviest(proc.stderr, top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", nargs="+",
+                        default=["web", "worker", "core", "all"] + OPERATIONS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    if not args.json:
+        print(f"{'target':>13} {'import ms':>10} {'RSS MiB':>8}  slowest imports")
+    for name in args.targets:
+        runs = [measure(name, args.top) for _ in range(args.repeat)]
+        seconds = statistics.median(run[0] for run in runs)
+        rss = statistics.median(run[1] for run in runs)
+        slowest = runs[-1][2]
+        results[name] = {"seconds": seconds, "rss": rss, "slowest": slowest}
+        if not args.json:
+            listed = ", ".join(f"{module} {s * 1000:.0f}" for module, s in slowest)
+            print(f"{name:>13} {seconds * 1000:>10.0f} {rss / 2 ** 20:>8.1f}  {listed}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
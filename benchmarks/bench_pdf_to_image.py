@@ -0,0 +1,115 @@
+"""Time and peak memory of pdf_to_image rendering strategies.
+
+    python benchmarks/bench_pdf_to_image.py [--pages 10 50 200] [--dpi 200]
+        [--format png] [--workers 4]
+
+"all" is the old render-everything approach, "streaming" renders chunk by
+chunk in one process and "parallel" spreads the chunks over --workers
+processes.
+
+Each run happens in a fresh process so ru_maxrss is that run's peak RSS.
+Needs poppler (pdftoppm) on PATH or POPPLER_PATH.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf2image import convert_from_path
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from pdf_engine.core.rendering import render_to_zip
+
+POPPLER_PATH = os.environ.get("POPPLER_PATH") or None
+
+
+def make_pdf(path, pages):
+    c = canvas.Canvas(path, pagesize=A4)
+    w, h = A4
+    for i in range(pages):
+        c.setFont("Helvetica", 14)
+        for line in range(40):
+            c.drawString(40, h - 60 - line * 18, f"Page {i + 1} line {line + 1}")
+        c.rect(40, 40, w - 80, 120, fill=1)
+        c.showPage()
+    c.save()
+
+
+def render_all(pdf_path, zip_path, dpi, image_format="png", workers=1):
+    # The previous implementation: every page decoded into memory at once.
+    images = convert_from_path(pdf_path, dpi=dpi, poppler_path=POPPLER_PATH)
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
+        for i, img in enumerate(images, start=1):
+            with z.open(f"page_{i}.png", "w") as entry:
+                img.save(entry, "PNG")
+
+
+def render_streaming(pdf_path, zip_path, dpi, image_format="png", workers=1):
+    render_to_zip(pdf_path, zip_path, dpi=dpi, image_format=image_format,
+                  poppler_path=POPPLER_PATH)
+
+
+def render_parallel(pdf_path, zip_path, dpi, image_format="png", workers=1):
+    render_to_zip(pdf_path, zip_path, dpi=dpi, image_format=image_format,
+                  workers=workers, poppler_path=POPPLER_PATH)
+
+
+MODES = {"all": render_all, "streaming": render_streaming, "parallel": render_parallel}
+
+
+def _run(mode, pdf_path, args, queue):
+    zip_path = pdf_path + f".{mode}.zip"
+    try:
+        start = time.perf_counter()
+        MODES[mode](pdf_path, zip_path, args.dpi, args.format, args.workers)
+        elapsed = time.perf_counter() - start
+        os.remove(zip_path)
+    except Exception as e:
+        queue.put(e)
+        return
+    # ru_maxrss is KiB on Linux. Pool workers are children of this process.
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    queue.put((elapsed, peak / 1024))
+
+
+def measure(mode, pdf_path, args):
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_run, args=(mode, pdf_path, args, queue))
+    p.start()
+    result = queue.get()
+    p.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--format", default="png", choices=["png", "jpeg", "webp"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'mode':>10} {'seconds':>9} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = os.path.join(tmp, f"doc_{pages}.pdf")
+            make_pdf(pdf_path, pages)
+            for mode in MODES:
+                elapsed, peak = measure(mode, pdf_path, args)
+                print(f"{pages:>6} {mode:>10} {elapsed:>9.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
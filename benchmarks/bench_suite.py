@@ -0,0 +1,229 @@
+"""Time and peak memory of every conversion tool, compared with a baseline.
+
+    python benchmarks/bench_suite.py [--tiers small medium large]
+        [--operations merge split ...] [--repeat 3] [--corpus DIR]
+        [--baseline benchmarks/baseline.json] [--tolerance 0.25] [--timeout 600]
+        [--save]
+
+Each operation runs through pdf_engine.core.conversions.run_operation, as
+a job worker would, on generated documents (see corpus.py) of three sizes:
+
+    small    10 pages,  5 scans,   5 photos,   1,000 rows,    50 paragraphs
+    medium  500 pages, 50 scans,  25 photos,  20,000 rows, 1,000 paragraphs
+    large  5000 pages, 200 scans, 100 photos, 200,000 rows, 10,000 paragraphs
+
+Every run happens in a fresh process with empty analysis and OCR caches.
+The best of --repeat runs is reported, with the result's stage breakdown
+from pdf_engine.core.metrics. Results are compared with --baseline; a run
+more than --tolerance slower, or using that much more memory, is a
+regression and makes the script exit with status 1. --save writes the
+results as the new baseline. Runs that fail (poppler, Java or LibreOffice
+missing), crash, are killed (e.g. out of memory) or take longer than
+--timeout seconds are reported and left out of the comparison.
+
+Fixtures are generated into --corpus and reused on later runs; without it
+they go to a temporary directory.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from queue import Empty
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import Corpus
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Seconds a single run may take, and how often a running one is checked on.
+RUN_TIMEOUT = 600
+POLL_INTERVAL = 1
+
+TIERS = {
+    "small": {"pages": 10, "scans": 5, "photos": 5, "rows": 1000, "paragraphs": 50},
+    "medium": {"pages": 500, "scans": 50, "photos": 25, "rows": 20000, "paragraphs": 1000},
+    "large": {"pages": 5000, "scans": 200, "photos": 100, "rows": 200000, "paragraphs": 10000},
+}
+
+# Differences below these are noise, whatever the percentage.
+MIN_SECONDS = 0.05
+MIN_MIB = 8
+
+# operation -> function(corpus, tier) returning (input paths, options).
+# Tools that render or run tabula on every page get the scan page count.
+CASES = {
+    "merge": lambda c, t: (
+        [c.text_pdf(t["pages"] // 2, seed=1), c.text_pdf(t["pages"] - t["pages"] // 2, seed=2)],
+        {},
+    ),
+    "split": lambda c, t: ([c.text_pdf(t["pages"])], {"split_mode": "fixed", "range_size": 10}),
+    "compress": lambda c, t: ([c.scanned_pdf(t["scans"])], {"compression_level": "recommended"}),
+    "unlock": lambda c, t: ([c.encrypted_pdf(t["pages"])], {"password": "secret"}),
+    "pdf_to_word": lambda c, t: ([c.text_pdf(t["pages"])], {}),
+    "pdf_to_image": lambda c, t: ([c.text_pdf(t["scans"])], {"dpi": 150}),
+    "image_to_pdf": lambda c, t: (c.images(t["photos"]), {}),
+    "excel_to_pdf": lambda c, t: ([c.workbook(t["rows"])], {}),
+    "pdf_to_excel": lambda c, t: ([c.text_pdf(t["scans"])], {}),
+    "word_to_pdf": lambda c, t: ([c.docx(t["paragraphs"])], {}),
+}
+
+
+def _run(operation, paths, options, work_dir, queue):
+    try:
+        from pdf_engine.core import config, metrics
+        from pdf_engine.core.conversions import converter, result_name, run_operation
+
+        # Fresh caches, so every run parses and OCRs from scratch.
+        config.configure(
+            ANALYSIS_DIR=os.path.join(work_dir, "analysis"),
+            OCR_CACHE_DIR=os.path.join(work_dir, "ocr"),
+        )
+        output_path = os.path.join(work_dir, result_name(operation, os.path.basename(paths[0])))
+        # Backends load on first use; their import time is bench_importtime's.
+        converter(operation)
+        with metrics.measure() as m:
+            run_operation(operation, paths, output_path, **options)
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+        return
+    queue.put({
+        "seconds": round(m.wall_time, 4),
+        "cpu_seconds": round(m.cpu_time, 4),
+        "peak_mib": round(m.peak_rss / 2 ** 20, 1),
+        "output_bytes": os.path.getsize(output_path),
+        "stages": {name: round(t, 4) for name, t in m.stages.items()},
+    })
+
+
+def _exit_reason(exitcode):
+    if exitcode is not None and exitcode < 0:
+        return f"killed by signal {-exitcode}"
+    return f"exited with status {exitcode}"
+
+
+def measure(operation, paths, options, timeout=RUN_TIMEOUT):
+    with tempfile.TemporaryDirectory() as work_dir:
+        queue = multiprocessing.Queue()
+        p = multiprocessing.Process(target=_run, args=(operation, paths, options, work_dir, queue))
+        p.start()
+        deadline = time.monotonic() + timeout
+        result = None
+        # A child that crashes or is killed (out of memory, say) never
+        # reports, so wait in short steps and watch it.
+        while result is None:
+            try:
+                result = queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                if not p.is_alive():
+                    try:
+                        # It may have reported just before exiting.
+                        result = queue.get(timeout=POLL_INTERVAL)
+                    except Empty:
+                        p.join()
+                        result = {"error": f"Worker {_exit_reason(p.exitcode)}"}
+                elif time.monotonic() > deadline:
+                    p.kill()
+                    result = {"error": f"Timed out after {timeout:g} seconds"}
+        p.join()
+    return result
+
+
+def best_of(runs):
+    if any("error" in run for run in runs):
+        return next(run for run in runs if "error" in run)
+    best = min(runs, key=lambda run: run["seconds"])
+    return {**best, "peak_mib": min(run["peak_mib"] for run in runs)}
+
+
+def change(value, base, floor):
+    """Relative change from base, or None when the difference is noise."""
+    if not base or abs(value - base) < floor:
+        return None
+    return value / base - 1
+
+
+def compare(result, base, tolerance):
+    """Return (time change, memory change, regressed)."""
+    if base is None or "error" in base:
+        return None, None, False
+    time_change = change(result["seconds"], base["seconds"], MIN_SECONDS)
+    mem_change = change(result["peak_mib"], base["peak_mib"], MIN_MIB)
+    regressed = any(c is not None and c > tolerance for c in (time_change, mem_change))
+    return time_change, mem_change, regressed
+
+
+def percent(value):
+    return "" if value is None else f"{value:+.0%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiers", nargs="+", default=["small", "medium"], choices=list(TIERS))
+    parser.add_argument("--operations", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", help="keep generated documents in this directory")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--timeout", type=float, default=RUN_TIMEOUT,
+                        help="seconds before a run is killed and reported as failed")
+    parser.add_argument("--save", action="store_true", help="write the results as the baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+    print(f"{'operation':>13} {'tier':>7} {'seconds':>9} {'change':>7} "
+          f"{'peak MiB':>9} {'change':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Corpus(args.corpus or tmp)
+        for tier in args.tiers:
+            for operation in args.operations:
+                key = f"{operation}/{tier}"
+                paths, options = CASES[operation](corpus, TIERS[tier])
+                result = best_of([
+                    measure(operation, paths, options, args.timeout) for _ in range(args.repeat)
+                ])
+                results[key] = result
+                if "error" in result:
+                    print(f"{operation:>13} {tier:>7}   failed: {result['error'].splitlines()[0]}")
+                    continue
+                time_change, mem_change, regressed = compare(
+                    result, baseline.get(key), args.tolerance
+                )
+                if regressed:
+                    regressions.append(key)
+                print(f"{operation:>13} {tier:>7} {result['seconds']:>9.3f} "
+                      f"{percent(time_change):>7} {result['peak_mib']:>9.1f} "
+                      f"{percent(mem_change):>7}{'  REGRESSION' if regressed else ''}")
+
+    if args.save:
+        # Keep baseline entries for operations and tiers that weren't run.
+        saved = {**baseline, **{k: v for k, v in results.items() if "error" not in v}}
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "machine": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count(),
+                },
+                "results": dict(sorted(saved.items())),
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Saved {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Deterministic input documents for the benchmarks.
+
+Every builder takes a size and a seed and writes the same content for the
+same arguments, so timings from different runs (and machines) measure the
+same work. Files are created in a corpus directory and reused when they
+already exist there:
+
+    corpus = Corpus("/tmp/pdf_corpus")
+    corpus.text_pdf(500)        # /tmp/pdf_corpus/text_500_s0.pdf
+
+Only ReportLab, Pillow, numpy, openpyxl, python-docx and PyPDF2 are used;
+nothing here imports pdf_engine.
+"""
+import datetime
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+WORDS = (
+    "invoice total amount account balance payment period customer order "
+    "delivery service quantity price tax net gross report summary annual "
+    "quarter revenue expense budget forecast contract schedule reference"
+).split()
+
+
+def sentence(rng, words=12):
+    return " ".join(WORDS[i] for i in rng.integers(0, len(WORDS), words)).capitalize() + "."
+
+
+def scan_image(rng, number, width=1240, height=1754):
+    """A grayscale page 'scan' at 150 dpi: text-like bars on a noisy background."""
+    page = np.full((height, width), 235, dtype=np.int16)
+    page += rng.integers(-12, 12, page.shape, dtype=np.int16)
+    img = Image.fromarray(page.clip(0, 255).astype("uint8"), "L")
+    draw = ImageDraw.Draw(img)
+    draw.text((100, 80), f"Scanned page {number}", fill=20)
+    y = 160
+    while y < height - 120:
+        x = 100
+        while x < width - 140:
+            word = int(rng.integers(20, 110))
+            draw.rectangle([x, y, x + word, y + 14], fill=int(rng.integers(10, 70)))
+            x += word + 18
+        y += 34
+    return img
+
+
+class Corpus:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _build(self, name, build):
+        # Write next to the target and rename, so an interrupted run never
+        # leaves a truncated fixture behind to be reused. The temporary name
+        # keeps the extension: openpyxl and python-docx go by it.
+        path = self._path(name)
+        if not os.path.exists(path):
+            tmp = self._path(f"tmp_{name}")
+            build(tmp)
+            os.replace(tmp, path)
+        return path
+
+    def text_pdf(self, pages, seed=0):
+        """Text pages with a table each and a bookmark every 10 pages."""
+        def build(path):
+            rng = np.random.default_rng(seed)
+            c = canvas.Canvas(path, pagesize=A4, invariant=1)
+            w, h = A4
+            for i in range(pages):
+                if i % 10 == 0:
+                    key = f"section{i // 10}"
+                    c.bookmarkPage(key)
+                    c.addOutlineEntry(f"Section {i // 10 + 1}", key, level=0)
+                c.setFont("Helvetica-Bold", 16)
+                c.drawString(40, h - 50, f"Section {i // 10 + 1}, page {i + 1}")
+                c.setFont("Helvetica", 10)
+                for line in range(30):
+                    c.drawString(40, h - 80 - line * 14, sentence(rng))
+
+                # A 4 x 8 ruled table, the kind tabula picks up.
+                top, row_h, col_w = h - 540, 18, (w - 80) / 4
+                for r in range(9):
+                    c.line(40, top - r * row_h, w - 40, top - r * row_h)
+                for col in range(5):
+                    c.line(40 + col * col_w, top, 40 + col * col_w, top - 8 * row_h)
+                for r in range(8):
+                    cells = (
+                        ["Item", "Quantity", "Price", "Total"] if r == 0 else
+                        [WORDS[int(rng.integers(len(WORDS)))], str(int(rng.integers(1, 50))),
+                         f"{rng.random() * 100:.2f}", f"{rng.random() * 5000:.2f}"]
+                    )
+                    for col, text in enumerate(cells):
+                        c.drawString(44 + col * col_w, top - r * row_h - 13, text)
+                c.showPage()
+            c.save()
+
+        return self._build(f"text_{pages}_s{seed}.pdf", build)
+
+    def encrypted_pdf(self, pages, password="secret", seed=0):
+        from PyPDF2 import PdfReader, PdfWriter
+
+        source = self.text_pdf(pages, seed)
+
+        def build(path):
+            writer = PdfWriter()
+            for page in PdfReader(source).pages:
+                writer.add_page(page)
+            writer.encrypt(password)
+            with open(path, "wb") as f:
+                writer.write(f)
+
+        return self._build(f"encrypted_{pages}_s{seed}.pdf", build)
+
+    def scanned_pdf(self, pages, seed=0):
+        """Image-only pages (one distinct JPEG each), like a scanner produces."""
+        def build(path):
+            rng = np.random.default_rng(seed)
+            c = canvas.Canvas(path, pagesize=A4, invariant=1)
+            w, h = A4
+            for i in range(pages):
+                c.drawImage(ImageReader(scan_image(rng, i + 1)), 0, 0, w, h)
+                c.showPage()
+            c.save()
+
+        return self._build(f"scanned_{pages}_s{seed}.pdf", build)
+
+    def images(self, count, megapixels=2, seed=0):
+        """`count` distinct RGB JPEG photos."""
+        paths = []
+        width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+        height = int(width * 3 / 4)
+        y, x = np.mgrid[0:height, 0:width]
+        for i in range(count):
+            def build(path, i=i):
+                rng = np.random.default_rng(seed * 100003 + i)
+                base = np.stack([(x // 7 + i) % 256, (y // 5) % 256, ((x + y) // 11) % 256], -1)
+                noise = rng.integers(0, 24, base.shape)
+                Image.fromarray((base + noise).astype("uint8")).save(path, "JPEG", quality=90)
+
+            paths.append(self._build(f"photo_{megapixels}mp_s{seed}_{i}.jpg", build))
+        return paths
+
+    def workbook(self, rows, columns=8, sheets=1):
+        def build(path):
+            from openpyxl import Workbook
+
+            wb = Workbook(write_only=True)
+            start = datetime.date(2024, 1, 1)
+            for s in range(sheets):
+                ws = wb.create_sheet(f"Sheet{s + 1}")
+                ws.append([f"Column {c + 1}" for c in range(columns)])
+                for r in range(rows):
+                    ws.append([
+                        r if c == 0 else
+                        start + datetime.timedelta(days=r % 365) if c == 1 else
+                        f"item {r * c % 9973}" if c % 2 else
+                        r * c / 7
+                        for c in range(columns)
+                    ])
+            wb.save(path)
+
+        return self._build(f"book_{rows}x{columns}x{sheets}.xlsx", build)
+
+    def docx(self, paragraphs, seed=0):
+        def build(path):
+            from docx import Document
+
+            rng = np.random.default_rng(seed)
+            doc = Document()
+            for i in range(paragraphs):
+                if i % 20 == 0:
+                    doc.add_heading(f"Section {i // 20 + 1}", level=1)
+                doc.add_paragraph(" ".join(sentence(rng) for _ in range(5)))
+            doc.save(path)
+
+        return self._build(f"doc_{paragraphs}_s{seed}.docx", build)
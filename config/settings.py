@@ -1,4 +1,5 @@
 
+import os
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'dev'
@@ -32,12 +33,130 @@ TEMPLATES = [{
  ]},
 }]
 WSGI_APPLICATION='config.wsgi.application'
-DATABASES={'default':{'ENGINE':'django.db.backends.sqlite3','NAME':BASE_DIR/'db.sqlite3'}}
+# Database from the environment. DB_ENGINE is "sqlite" (default) or
+# "postgresql". SQLite runs in WAL mode so readers don't block the writer,
+# waits up to DB_TIMEOUT seconds for the write lock instead of failing with
+# "database is locked", and takes it at the start of each transaction.
+# PostgreSQL reuses connections for DB_CONN_MAX_AGE seconds, or with
+# DB_POOL=1 keeps a psycopg pool per process (needs psycopg[pool]).
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_TIMEOUT = int(os.environ.get('DB_TIMEOUT', 20))
+if DB_ENGINE == 'postgresql':
+    DB_POOL = os.environ.get('DB_POOL') == '1'
+    DATABASES = {'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'pdftools'),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+        # Pooled connections go back to the pool instead of being kept.
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': DB_TIMEOUT,
+            **({'pool': True} if DB_POOL else {}),
+        },
+    }}
+else:
+    DATABASES = {'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            'timeout': DB_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA mmap_size=134217728;'
+            ),
+        },
+    }}
 STATIC_URL='/static/'
 STATICFILES_DIRS=[BASE_DIR/'static']
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Conversion jobs are processed by `manage.py runworkers`. Set
+# CONVERSION_JOBS_EAGER to run them inside the request instead. Keep the job
+# directory on the same filesystem as MEDIA_ROOT and FILE_UPLOAD_TEMP_DIR so
+# uploads and results are moved into place instead of copied.
+CONVERSION_JOBS_EAGER = False
+CONVERSION_JOB_DIR = BASE_DIR / "jobs"
+
+# Workers touch a running job every CONVERSION_JOB_HEARTBEAT seconds. The
+# reaper fails jobs not touched for CONVERSION_JOB_STALE_AFTER seconds (their
+# worker was killed or crashed), and deletes finished jobs after
+# CONVERSION_JOB_RETENTION_DAYS; /metrics keeps their totals.
+CONVERSION_JOB_HEARTBEAT = 30
+CONVERSION_JOB_STALE_AFTER = 5 * 60
+CONVERSION_JOB_RETENTION_DAYS = 30
+
+# Chunked uploads (every tool) are assembled here; keep it on the
+# same filesystem as CONVERSION_JOB_DIR. Sessions untouched for
+# UPLOAD_SESSION_MAX_AGE seconds are removed by the reaper. A user can hold
+# UPLOAD_SESSION_MAX_OPEN sessions of UPLOAD_SESSION_MAX_OPEN_BYTES in total
+# until jobs use them; more are refused with 429.
+UPLOAD_SESSION_DIR = BASE_DIR / "uploads"
+UPLOAD_CHUNK_SIZE = 5 * 1024 ** 2
+UPLOAD_SESSION_MAX_BYTES = 1024 ** 3
+UPLOAD_SESSION_MAX_AGE = 24 * 60 * 60
+UPLOAD_SESSION_MAX_OPEN = 20
+UPLOAD_SESSION_MAX_OPEN_BYTES = 2 * 1024 ** 3
+
+# Per-document analysis (page text, image inventory) and OCR text, cached by
+# content hash so tools run on the same upload parse it once. Both hold
+# document text, so they are private (0700 directories, 0600 files), and
+# the reaper drops entries unused for DOCUMENT_CACHE_MAX_AGE seconds, then
+# the least recently used ones while a cache is over
+# DOCUMENT_CACHE_MAX_BYTES. The engines are handed both directories when
+# the app starts (see pdf_engine/apps.py).
+PDF_ANALYSIS_DIR = os.environ.get('PDF_ANALYSIS_DIR') or BASE_DIR / 'cache' / 'analysis'
+OCR_CACHE_DIR = os.environ.get('OCR_CACHE_DIR') or BASE_DIR / 'cache' / 'ocr'
+DOCUMENT_CACHE_MAX_AGE = 24 * 60 * 60
+DOCUMENT_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Processes each pdf_to_image or OCR job renders pages with. 0 (auto) lets
+# `manage.py runworkers` share the cores between its workers, one each when
+# there are as many workers as cores; outside runworkers it means
+# min(4, cores).
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS') or 0)
+
+# Word -> PDF. WORD_TO_PDF_BACKEND is "unoserver" (a warm LibreOffice per
+# worker, started with OFFICE_SERVER_COMMAND), "soffice" (SOFFICE_PATH, a
+# cold start per document), "docx2pdf" or "auto". An instance is killed
+# after OFFICE_TIMEOUT seconds on one document and restarted after
+# OFFICE_MAX_CONVERSIONS documents.
+WORD_TO_PDF_BACKEND = os.environ.get('WORD_TO_PDF_BACKEND') or 'auto'
+OFFICE_SERVER_COMMAND = os.environ.get('OFFICE_SERVER_COMMAND') or 'unoserver'
+SOFFICE_PATH = os.environ.get('SOFFICE_PATH') or 'soffice'
+OFFICE_TIMEOUT = float(os.environ.get('OFFICE_TIMEOUT') or 120)
+OFFICE_MAX_CONVERSIONS = int(os.environ.get('OFFICE_MAX_CONVERSIONS') or 200)
+
+# `manage.py runworkers` also deletes expired shared files this often
+# (seconds, 0 disables). `manage.py reap_expired` does a one-off sweep.
+SHARED_FILE_REAP_INTERVAL = 15 * 60
+
+# Repeated conversions are served from a result cache capped at this size
+# (least recently used entries are evicted first). 0 disables the cache.
+CONVERSION_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# How view/download/share hand files to clients: "sendfile" (WSGI server
+# file_wrapper), "x-sendfile" or "x-accel-redirect" (front proxy). For nginx,
+# expose MEDIA_ROOT as an internal location at FILE_DELIVERY_ACCEL_PREFIX.
+FILE_DELIVERY = "sendfile"
+FILE_DELIVERY_ACCEL_PREFIX = "/protected/"
+
+# `/metrics` (Prometheus text format) requires `Authorization: Bearer
+# <METRICS_TOKEN>` when METRICS_TOKEN is set, and otherwise only answers
+# METRICS_ALLOWED_IPS. Behind a reverse proxy on the same host every client
+# appears as 127.0.0.1, so set the token (or deny /metrics at the proxy).
+# Jobs slower than SLOW_JOB_SECONDS are logged to "pdf_engine.slow_jobs"
+# with a per-stage breakdown.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ("127.0.0.1", "::1")
+SLOW_JOB_SECONDS = 30
 DEFAULT_AUTO_FIELD='django.db.models.BigAutoField'
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "PDF Tools <noreply@pdftools.com>"
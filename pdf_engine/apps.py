@@ -1,4 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class PdfEngineConfig(AppConfig):
     name = 'pdf_engine'
+
+    def ready(self):
+        import pdf_engine.signals
+        from pdf_engine.core import config
+
+        # The engines don't use Django; hand them the settings that tune them.
+        if getattr(settings, "RENDER_WORKERS", 0):
+            config.configure(RENDER_WORKERS=settings.RENDER_WORKERS)
+        if getattr(settings, "PDF_ANALYSIS_DIR", None):
+            config.configure(ANALYSIS_DIR=str(settings.PDF_ANALYSIS_DIR))
+        if getattr(settings, "OCR_CACHE_DIR", None):
+            config.configure(OCR_CACHE_DIR=str(settings.OCR_CACHE_DIR))
+        for name in ("WORD_TO_PDF_BACKEND", "OFFICE_SERVER_COMMAND", "SOFFICE_PATH",
+                     "OFFICE_TIMEOUT", "OFFICE_MAX_CONVERSIONS"):
+            if hasattr(settings, name):
+                config.configure(**{name: getattr(settings, name)})
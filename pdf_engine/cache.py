@@ -0,0 +1,99 @@
+import hashlib
+import json
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import CachedResult
+from .storage import acquire_blob, release_blob
+
+# Conversion result cache. A result is keyed on the operation, its options
+# and the SHA-256 of every input in upload order, so a repeated upload is
+# answered from the stored artifact instead of running the conversion again.
+# Entries hold a reference on the result's blob, so a hit is shared without
+# copying anything.
+#
+# Jobs given a password are never cached: keyed without it, a hit would hand
+# the decrypted result to anyone uploading the same file; keyed with it, a
+# hash of the password would be stored.
+
+MAX_BYTES = getattr(settings, "CONVERSION_CACHE_MAX_BYTES", 2 * 1024 ** 3)
+
+SECRET_OPTIONS = ("password",)
+
+
+def enabled():
+    return MAX_BYTES > 0
+
+
+def cacheable(options):
+    """Whether a job with `options` may be answered from or added to the cache."""
+    return enabled() and not any(options.get(name) for name in SECRET_OPTIONS)
+
+
+def result_key(operation, input_hashes, options):
+    """Stable key for an operation run on the given inputs and options."""
+    payload = json.dumps(
+        {"operation": operation, "inputs": list(input_hashes), "options": options},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def lookup(key):
+    """Return the cached result for `key` and count the hit, or None.
+
+    The caller owns a reference on the returned entry's blob and must
+    release it: taken with the entry locked, it keeps the file alive even
+    if evict() drops the entry before the caller shares the blob.
+    """
+    with transaction.atomic():
+        cached = (
+            CachedResult.objects.select_for_update()
+            .select_related("blob").filter(key=key).first()
+        )
+        if cached is None:
+            return None
+
+        CachedResult.objects.filter(pk=cached.pk).update(
+            hits=F("hits") + 1, last_used_at=timezone.now()
+        )
+        acquire_blob(cached.blob)
+    return cached
+
+
+def store(key, operation, blob, compute_seconds):
+    """Remember `blob` as the result for `key`."""
+    acquire_blob(blob)
+    try:
+        with transaction.atomic():
+            return CachedResult.objects.create(
+                key=key,
+                operation=operation,
+                blob=blob,
+                size=blob.size,
+                compute_seconds=compute_seconds,
+            )
+    except IntegrityError:
+        # A concurrent job produced the same result first; keep that one.
+        release_blob(blob)
+        return CachedResult.objects.get(key=key)
+
+
+def evict(max_bytes=None):
+    """Drop least recently used entries until the cache fits in `max_bytes`."""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    total = CachedResult.objects.aggregate(total=Sum("size"))["total"] or 0
+    evicted = 0
+
+    for cached in CachedResult.objects.order_by("last_used_at").iterator():
+        if total <= max_bytes:
+            break
+        # Releases the blob; shares of it keep the file alive.
+        cached.delete()
+        total -= cached.size
+        evicted += 1
+
+    return evicted
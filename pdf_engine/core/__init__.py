@@ -0,0 +1,12 @@
+# The conversion engines, without Django. Everything in this package works
+# on files and options only, so it can be used by the job workers, the
+# `convert` command and benchmarks alike, or from any other Python code:
+#
+#     from pdf_engine.core import convert
+#     convert("compress", ["in.pdf"], "out.pdf", compression_level="extreme")
+#
+# `python -m pdf_engine.core` runs the command line interface (see cli.py).
+
+from .conversions import OPERATIONS, convert, converter, result_name, run_operation
+
+__all__ = ["OPERATIONS", "convert", "converter", "result_name", "run_operation"]
@@ -0,0 +1,176 @@
+import json
+import os
+
+from PyPDF2 import PdfReader
+
+from . import config, filecache, metrics
+
+# Parsed facts about a PDF, shared by every tool that only needs to look at
+# it: page count, encryption, and per page its text and image inventory.
+# Entries are stored on disk under config.ANALYSIS_DIR keyed by the file's
+# SHA-256, so running several tools on the same upload parses it once.
+# Pages are analysed lazily, the first time a tool asks for them, and the
+# PdfReader is only opened when something isn't stored yet.
+#
+# Text of encrypted documents is never written to disk, and the directory
+# is private to the service user (see filecache.py); the Django app prunes
+# it by age and size.
+
+# Per-page entries that hold document text.
+TEXT_FIELDS = ("text", "ocr")
+
+
+def page_images(page):
+    """Yield the image XObject streams drawn by `page`, forms included."""
+    def walk(resources, seen):
+        if resources is None:
+            return
+        xobjects = resources.get_object().get("/XObject")
+        if xobjects is None:
+            return
+        for ref in xobjects.get_object().values():
+            obj = ref.get_object()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            if obj.get("/Subtype") == "/Image":
+                yield obj
+            elif obj.get("/Subtype") == "/Form":
+                yield from walk(obj.get("/Resources"), seen)
+
+    yield from walk(page.get("/Resources"), set())
+
+
+def _filter_names(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def _store_path(sha256):
+    return os.path.join(config.ANALYSIS_DIR, sha256[:2], f"{sha256}.json")
+
+
+class DocumentAnalysis:
+    """Lazily analysed view of one PDF. Use as a context manager to save."""
+
+    def __init__(self, path, password=None, sha256=None):
+        self.path = path
+        self.password = password
+        self.sha256 = sha256 or filecache.file_sha256(path)
+        self._reader = None
+        self.dirty = False
+
+        try:
+            self.data = json.loads(filecache.read_text(_store_path(self.sha256)))
+        except (TypeError, ValueError):
+            reader = self.reader
+            self.data = {
+                "page_count": len(reader.pages),
+                "encrypted": reader.is_encrypted,
+                "pages": {},
+            }
+            self.dirty = True
+
+        if self.encrypted:
+            # Checks the password even when everything else is stored.
+            self.reader
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            reader = PdfReader(self.path)
+            # Files with only an owner password open with an empty one.
+            if reader.is_encrypted and not reader.decrypt(self.password or ""):
+                raise ValueError("Invalid PDF password")
+            self._reader = reader
+        return self._reader
+
+    @property
+    def page_count(self):
+        return self.data["page_count"]
+
+    @property
+    def encrypted(self):
+        return self.data["encrypted"]
+
+    def page(self, index):
+        return self.reader.pages[index]
+
+    def _entry(self, index):
+        return self.data["pages"].setdefault(str(index), {})
+
+    def text(self, index):
+        """Embedded text of page `index` (0-based)."""
+        entry = self._entry(index)
+        if "text" not in entry:
+            entry["text"] = self.page(index).extract_text() or ""
+            self.dirty = True
+        return entry["text"]
+
+    def texts(self):
+        return [self.text(i) for i in range(self.page_count)]
+
+    def images(self, index):
+        """Inventory of the images on page `index`."""
+        entry = self._entry(index)
+        if "images" not in entry:
+            entry["images"] = [
+                {
+                    "width": int(image.get("/Width", 0)),
+                    "height": int(image.get("/Height", 0)),
+                    "filter": _filter_names(image.get("/Filter")),
+                    "bytes": len(image._data or b""),
+                }
+                for image in page_images(self.page(index))
+            ]
+            self.dirty = True
+        return entry["images"]
+
+    def ocr_text(self, index):
+        return self._entry(index).get("ocr")
+
+    def set_ocr_text(self, index, text):
+        self._entry(index)["ocr"] = text
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        data = self.data
+        if self.encrypted:
+            data = dict(data, pages={
+                i: {k: v for k, v in entry.items() if k not in TEXT_FIELDS}
+                for i, entry in data["pages"].items()
+            })
+
+        path = _store_path(self.sha256)
+
+        # Another worker may have analysed other pages meanwhile; keep them.
+        try:
+            stored = json.loads(filecache.read_text(path))["pages"]
+        except (TypeError, ValueError, KeyError):
+            stored = {}
+        for i, entry in data["pages"].items():
+            stored.setdefault(i, {}).update(entry)
+        data = dict(data, pages=stored)
+
+        filecache.write_text(config.ANALYSIS_DIR, path, json.dumps(data))
+        self.dirty = False
+
+
+def open_analysis(path, password=None):
+    """Open a DocumentAnalysis, recording the parse for the current job."""
+    with metrics.stage("parse"):
+        analysis = DocumentAnalysis(path, password)
+    metrics.add("pages", analysis.page_count)
+    return analysis
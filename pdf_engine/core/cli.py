@@ -0,0 +1,196 @@
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .conversions import OPERATIONS, converter, result_name, run_operation
+
+# Batch conversions from the command line, for backfills and other bulk
+# work that shouldn't go through HTTP one file at a time:
+#
+#     python -m pdf_engine.core compress archive/ -o compressed/ --recursive \
+#         -O compression_level=extreme --skip-existing
+#     python manage.py convert pdf_to_image scans/*.pdf -O dpi=150
+#
+# Directories are searched for the operation's input types. Every file is
+# converted on its own, in a pool of --workers processes, and its result is
+# written under --output-dir at the same relative path with the result's
+# extension. merge and image_to_pdf take all inputs, in order, into one
+# result. Results are written under a temporary name and renamed when done,
+# so with --skip-existing an interrupted run picks up where it stopped.
+
+INPUT_EXTENSIONS = {
+    "word_to_pdf": (".doc", ".docx"),
+    "image_to_pdf": (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff", ".webp"),
+    "excel_to_pdf": (".xls", ".xlsx"),
+}
+COMBINED = {"merge", "image_to_pdf"}
+
+
+def parse_options(pairs):
+    """Turn KEY=VALUE strings into keyword arguments; values may be JSON."""
+    options = {}
+    for pair in pairs or ():
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Options are KEY=VALUE, got {pair!r}")
+        try:
+            options[key] = json.loads(value)
+        except ValueError:
+            options[key] = value
+    return options
+
+
+def check_options(operation, options):
+    try:
+        inspect.signature(converter(operation)).bind([], "", **options)
+    except TypeError as e:
+        raise ValueError(f"Bad options for {operation}: {e}")
+
+
+def collect(operation, inputs, recursive=False):
+    """Return (path, path relative to the output directory) for every input."""
+    extensions = INPUT_EXTENSIONS.get(operation, (".pdf",))
+    files = []
+    for source in inputs:
+        if not os.path.isdir(source):
+            files.append((source, os.path.basename(source)))
+            continue
+        for root, dirs, names in os.walk(source):
+            dirs.sort()
+            if not recursive:
+                dirs.clear()
+            for name in sorted(names):
+                if name.lower().endswith(extensions) and not name.startswith("."):
+                    path = os.path.join(root, name)
+                    files.append((path, os.path.relpath(path, source)))
+    return files
+
+
+def output_path(operation, output_dir, relative):
+    stem = os.path.splitext(relative)[0]
+    ext = os.path.splitext(result_name(operation, os.path.basename(relative)))[1]
+    return os.path.join(output_dir, stem + ext)
+
+
+def convert_file(operation, paths, output, options):
+    """Convert `paths` into `output`; returns the seconds it took."""
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    base, ext = os.path.splitext(output)
+    partial = f"{base}.part{ext}"
+    start = time.perf_counter()
+    try:
+        run_operation(operation, paths, partial, **options)
+        os.replace(partial, output)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return time.perf_counter() - start
+
+
+def plan(operation, files, output_dir, skip_existing=False):
+    """Return the (label, input paths, output path) tasks to run, and skips."""
+    if operation in COMBINED:
+        if not files:
+            return [], []
+        first = os.path.basename(files[0][0])
+        groups = [(f"{len(files)} file(s)", [path for path, _ in files],
+                   os.path.join(output_dir, result_name(operation, first)))]
+    else:
+        groups = [(path, [path], output_path(operation, output_dir, relative))
+                  for path, relative in files]
+
+    tasks, skipped = [], []
+    for label, paths, output in groups:
+        if skip_existing and os.path.exists(output):
+            skipped.append(label)
+        else:
+            tasks.append((label, paths, output))
+    return tasks, skipped
+
+
+def run(operation, inputs, output_dir=".", options=None, workers=None,
+        recursive=False, skip_existing=False, out=sys.stdout):
+    """Convert `inputs` (files or directories); returns the number of failures."""
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+    options = options or {}
+    check_options(operation, options)
+    workers = workers or os.cpu_count() or 1
+
+    tasks, skipped = plan(operation, collect(operation, inputs, recursive), output_dir,
+                          skip_existing)
+    for label in skipped:
+        out.write(f"skipped {label}\n")
+
+    converted = failed = 0
+
+    def report(label, output, result):
+        nonlocal converted, failed
+        try:
+            seconds = result()
+        except Exception as e:
+            out.write(f"failed  {label}: {type(e).__name__}: {e}\n")
+            failed += 1
+        else:
+            out.write(f"ok      {label} -> {output} ({seconds:.2f}s)\n")
+            converted += 1
+
+    runnable = []
+    for label, paths, output in tasks:
+        # Never let a result replace one of its own inputs.
+        if os.path.abspath(output) in {os.path.abspath(p) for p in paths}:
+            out.write(f"failed  {label}: the result would overwrite the input\n")
+            failed += 1
+        else:
+            runnable.append((label, paths, output))
+
+    if workers <= 1 or len(runnable) <= 1:
+        for label, paths, output in runnable:
+            report(label, output, lambda: convert_file(operation, paths, output, options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(convert_file, operation, paths, output, options): (label, output)
+                for label, paths, output in runnable
+            }
+            for future in as_completed(futures):
+                report(*futures[future], future.result)
+
+    out.write(f"{converted} converted, {len(skipped)} skipped, {failed} failed\n")
+    return failed
+
+
+def add_arguments(parser):
+    parser.add_argument("operation", choices=sorted(OPERATIONS))
+    parser.add_argument("inputs", nargs="+", help="Files or directories.")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="Where results go (default: current directory).")
+    parser.add_argument("-O", "--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="Option for the operation, e.g. -O dpi=150. Repeatable.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Files converted at once (default: CPU count). pdf_to_image "
+                             "and OCR start RENDER_WORKERS processes of their own.")
+    parser.add_argument("--recursive", action="store_true",
+                        help="Search directories recursively.")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Leave inputs whose result already exists alone.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pdf_engine.core", description="Convert files or whole directories."
+    )
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        failed = run(
+            args.operation, args.inputs, args.output_dir, parse_options(args.option),
+            args.workers, args.recursive, args.skip_existing,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    sys.exit(1 if failed else 0)
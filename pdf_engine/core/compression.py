@@ -0,0 +1,219 @@
+import hashlib
+import io
+
+from PIL import Image
+from PyPDF2.generic import NameObject, NumberObject
+
+# Compression engine behind CompressPDFForm. Scanned PDFs are almost all
+# image bytes, so each image XObject is downsampled to the level's target
+# DPI and re-encoded as JPEG; images that wouldn't get smaller are left
+# alone. Identical images and embedded font programs used on several pages
+# are collapsed onto one object so the writer only stores them once; merge
+# uses the same Deduplicator across its inputs.
+
+# level -> (target DPI, JPEG quality)
+LEVELS = {
+    "extreme": (72, 40),
+    "recommended": (150, 65),
+    "less": (220, 85),
+}
+
+COLOR_MODES = {
+    "/DeviceRGB": "RGB",
+    "/DeviceGray": "L",
+    "/DeviceCMYK": "CMYK",
+}
+ICC_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+
+FONT_FILE_KEYS = ("/FontFile", "/FontFile2", "/FontFile3")
+
+# Below this an image isn't worth re-encoding.
+MIN_IMAGE_BYTES = 4 * 1024
+
+
+def _filters(obj):
+    value = obj.get("/Filter")
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def _stream_key(obj):
+    """Hash of a stream's encoded bytes and dictionary, for deduplication."""
+    digest = hashlib.sha256(obj._data or b"")
+    for key in sorted(obj.keys()):
+        if key != "/Length":
+            digest.update(f"{key}={obj.raw_get(key)!r};".encode())
+    return digest.hexdigest()
+
+
+def _color_mode(obj):
+    space = obj.get("/ColorSpace")
+    if space is None:
+        return None
+    space = space.get_object()
+    if isinstance(space, list) and space and space[0] == "/ICCBased":
+        return ICC_MODES.get(space[1].get_object().get("/N"))
+    return COLOR_MODES.get(str(space))
+
+
+def decode_image(obj):
+    """Return a PIL image for an image XObject, or None if unsupported."""
+    if obj.get("/ImageMask") or "/Decode" in obj:
+        return None
+
+    filters = _filters(obj)
+    if filters == ["/DCTDecode"]:
+        return Image.open(io.BytesIO(obj._data))
+    if any(f in ("/JPXDecode", "/CCITTFaxDecode", "/JBIG2Decode", "/DCTDecode") for f in filters):
+        return None
+
+    mode = _color_mode(obj)
+    if mode is None or obj.get("/BitsPerComponent") != 8:
+        return None
+    return Image.frombytes(mode, (obj["/Width"], obj["/Height"]), obj.get_data())
+
+
+def recompress_image(obj, max_size, quality):
+    """Downsample and JPEG-encode an image XObject in place.
+
+    Returns True if the stream was replaced.
+    """
+    if len(obj._data or b"") < MIN_IMAGE_BYTES:
+        return False
+
+    try:
+        image = decode_image(obj)
+    except Exception:
+        # Damaged or exotic image data: leave it as it is.
+        return False
+    if image is None:
+        return False
+
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if image.width > max_size[0] or image.height > max_size[1]:
+        image.thumbnail(max_size, Image.LANCZOS)
+
+    buf = io.BytesIO()
+    image.save(buf, "JPEG", quality=quality, optimize=True)
+    data = buf.getvalue()
+    if len(data) >= len(obj._data):
+        return False
+
+    obj._data = data
+    obj.decoded_self = None
+    obj[NameObject("/Filter")] = NameObject("/DCTDecode")
+    obj[NameObject("/Width")] = NumberObject(image.width)
+    obj[NameObject("/Height")] = NumberObject(image.height)
+    obj[NameObject("/BitsPerComponent")] = NumberObject(8)
+    obj[NameObject("/ColorSpace")] = NameObject(
+        "/DeviceGray" if image.mode == "L" else "/DeviceRGB"
+    )
+    if "/DecodeParms" in obj:
+        del obj["/DecodeParms"]
+    return True
+
+
+class Deduplicator:
+    """Collapses identical images and font programs onto one object.
+
+    One instance can be fed pages from several documents, so resources
+    shared between them are stored once too.
+    """
+
+    def __init__(self):
+        self.streams = {}   # stream key -> canonical indirect reference
+        self.seen = set()   # (document, idnum) already handled
+        self.stats = {"duplicates_removed": 0}
+
+    def _canonical(self, ref):
+        """Return the reference to use for `ref`, sharing identical streams."""
+        key = _stream_key(ref.get_object())
+        canonical = self.streams.setdefault(key, ref)
+        if canonical.pdf is not ref.pdf or canonical.idnum != ref.idnum:
+            self.stats["duplicates_removed"] += 1
+        return canonical
+
+    def _first_visit(self, ref):
+        key = (id(ref.pdf), ref.idnum)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    def dedupe_page(self, page):
+        self._resources(page.get("/Resources"))
+
+    def _resources(self, resources, *args):
+        if resources is None:
+            return
+        resources = resources.get_object()
+
+        xobjects = resources.get("/XObject")
+        if xobjects is not None:
+            xobjects = xobjects.get_object()
+            for name in list(xobjects.keys()):
+                ref = xobjects.raw_get(name)
+                if not hasattr(ref, "idnum"):
+                    continue
+                obj = ref.get_object()
+                subtype = obj.get("/Subtype")
+
+                if subtype == "/Form" and self._first_visit(ref):
+                    self._resources(obj.get("/Resources"), *args)
+                elif subtype == "/Image":
+                    canonical = self._canonical(ref)
+                    xobjects[NameObject(name)] = canonical
+                    if self._first_visit(canonical):
+                        self._image(canonical.get_object(), *args)
+
+        fonts = resources.get("/Font")
+        if fonts is not None:
+            for name in list(fonts.get_object().keys()):
+                self._font(fonts.get_object()[name].get_object())
+
+    def _image(self, obj, *args):
+        pass
+
+    def _font(self, font):
+        descendants = font.get("/DescendantFonts")
+        if descendants is not None:
+            for descendant in descendants.get_object():
+                self._font(descendant.get_object())
+
+        descriptor = font.get("/FontDescriptor")
+        if descriptor is None:
+            return
+        descriptor = descriptor.get_object()
+        for key in FONT_FILE_KEYS:
+            ref = descriptor.raw_get(key) if key in descriptor else None
+            if hasattr(ref, "idnum"):
+                descriptor[NameObject(key)] = self._canonical(ref)
+
+
+class Compressor(Deduplicator):
+    """Rewrites the images and fonts of one document, page by page."""
+
+    def __init__(self, level="recommended"):
+        super().__init__()
+        self.dpi, self.quality = LEVELS.get(level, LEVELS["recommended"])
+        self.stats.update(images_recompressed=0, images_skipped=0)
+
+    def compress_page(self, page):
+        box = page.mediabox
+        # An image can't usefully have more pixels than the page at target DPI.
+        max_size = (
+            max(1, int(float(box.width) / 72 * self.dpi)),
+            max(1, int(float(box.height) / 72 * self.dpi)),
+        )
+        self._resources(page.get("/Resources"), max_size)
+        page.compress_content_streams()
+
+    def _image(self, obj, max_size):
+        if recompress_image(obj, max_size, self.quality):
+            self.stats["images_recompressed"] += 1
+        else:
+            self.stats["images_skipped"] += 1
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+# Tunables of the conversion engines. The defaults come from the
+# environment, so the engines work without Django (the CLI, benchmarks);
+# the Django app sets them from its settings with configure() when it
+# starts (see pdf_engine/apps.py). Engines read them when they run rather
+# than at import, so configure() reaches modules that are already loaded.
+#
+# This module imports nothing heavy: web processes configure the engines
+# without loading them.
+
+# Processes a pdf_to_image or OCR job renders pages with.
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS") or min(4, os.cpu_count() or 1))
+
+# Where the document analysis store and the OCR cache live (analysis.py,
+# ocr.py). The Django app also prunes them, from the same values.
+ANALYSIS_DIR = os.environ.get("PDF_ANALYSIS_DIR") or os.path.join(
+    tempfile.gettempdir(), "pdf_engine_analysis"
+)
+OCR_CACHE_DIR = os.environ.get("OCR_CACHE_DIR") or os.path.join(
+    tempfile.gettempdir(), "pdf_engine_ocr"
+)
+
+# Word -> PDF (office.py): the backend, the commands that start LibreOffice,
+# and when a warm instance is killed (seconds) or recycled (documents).
+WORD_TO_PDF_BACKEND = os.environ.get("WORD_TO_PDF_BACKEND") or "auto"
+OFFICE_SERVER_COMMAND = os.environ.get("OFFICE_SERVER_COMMAND") or "unoserver"
+SOFFICE_PATH = os.environ.get("SOFFICE_PATH") or "soffice"
+OFFICE_TIMEOUT = float(os.environ.get("OFFICE_TIMEOUT") or 120)
+OFFICE_MAX_CONVERSIONS = int(os.environ.get("OFFICE_MAX_CONVERSIONS") or 200)
+
+
+def configure(**values):
+    """Override engine settings, e.g. configure(RENDER_WORKERS=2)."""
+    for name, value in values.items():
+        if not name.isupper() or name not in globals():
+            raise TypeError(f"Unknown engine setting: {name}")
+        globals()[name] = value
@@ -0,0 +1,89 @@
+import importlib
+import os
+import shutil
+import tempfile
+
+# Conversion functions take a list of input paths and the path to write the
+# result to. They know nothing about requests, users or storage, so the job
+# workers can run them in any process.
+#
+# Each one lives next to the engine it drives and is imported the first
+# time its operation runs. Web processes load this registry to check and
+# name jobs without paying for pandas, tabula, python-docx or Pillow; a
+# worker imports them when a job needs them (runworkers preloads them all
+# before forking).
+
+# =====================================================
+# REGISTRY
+# =====================================================
+
+# operation name -> ("module:function" in this package, result filename)
+# The filename may reference {name}, the first upload's original name.
+OPERATIONS = {
+    "unlock": ("pdfops:unlock", "unlocked_{name}"),
+    "merge": ("pdfops:merge_pdfs", "merged.pdf"),
+    "split": ("pdfops:split_pdf", "split.zip"),
+    "compress": ("pdfops:compress_pdf", "compressed.pdf"),
+    "word_to_pdf": ("office:word_to_pdf", "output.pdf"),
+    "image_to_pdf": ("imagepdf:image_to_pdf", "images.pdf"),
+    "pdf_to_excel": ("extraction:pdf_to_excel", "output.xlsx"),
+    "excel_to_pdf": ("tables:excel_to_pdf", "output.pdf"),
+    "pdf_to_word": ("pdfdocx:pdf_to_word", "output.docx"),
+    "pdf_to_image": ("rendering:pdf_to_image", "images.zip"),
+}
+
+
+def converter(operation):
+    """Return the function behind `operation`, importing its backend if needed."""
+    try:
+        target, _ = OPERATIONS[operation]
+    except KeyError:
+        raise ValueError(f"Unknown operation: {operation}")
+    module, name = target.split(":")
+    return getattr(importlib.import_module(f".{module}", __package__), name)
+
+
+def load_converters():
+    """Import every backend up front, e.g. before forking workers."""
+    for operation in OPERATIONS:
+        converter(operation)
+
+
+def run_operation(operation, paths, output_path, **options):
+    return converter(operation)(paths, output_path, **options)
+
+
+def result_name(operation, input_name):
+    """File name of `operation`'s result for an input called `input_name`."""
+    _, filename = OPERATIONS[operation]
+    return filename.format(name=input_name)
+
+
+def convert(operation, inputs, output, **options):
+    """Run `operation` on paths or binary file objects.
+
+    `output` is a path or a writable binary file object. File object inputs
+    are copied to a temporary directory first, since the converters (and
+    the tools behind them) work on files.
+    """
+    with tempfile.TemporaryDirectory(prefix="pdf_engine_") as tmp:
+        paths = []
+        for i, source in enumerate(inputs):
+            if isinstance(source, (str, os.PathLike)):
+                paths.append(os.fspath(source))
+                continue
+            name = os.path.basename(getattr(source, "name", "") or f"input_{i}")
+            path = os.path.join(tmp, f"{i}_{name}")
+            with open(path, "wb") as f:
+                shutil.copyfileobj(source, f)
+            paths.append(path)
+
+        if isinstance(output, (str, os.PathLike)):
+            return run_operation(operation, paths, os.fspath(output), **options)
+
+        ext = os.path.splitext(result_name(operation, os.path.basename(paths[0])))[1]
+        output_path = os.path.join(tmp, f"output{ext}")
+        run_operation(operation, paths, output_path, **options)
+        with open(output_path, "rb") as f:
+            shutil.copyfileobj(f, output)
+        return output
@@ -0,0 +1,162 @@
+import importlib.util
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import tabula
+from openpyxl import load_workbook
+from tabula.errors import JavaNotFoundError
+
+from . import metrics
+from .analysis import open_analysis
+from .ocr import page_texts
+from .pages import batches, parse_page_ranges
+from .rendering import POPPLER_PATH
+
+# Table extraction for pdf_to_excel. tabula runs inside a small pool of
+# long-lived processes that each keep a JVM warm (tabula-py starts it
+# in-process through JPype and reuses it), so only the first job of a worker
+# pays for Java start-up. A document is split into batches of pages that are
+# extracted concurrently and put back together in page order.
+#
+# Without JPype tabula falls back to a `java` subprocess per call; batches
+# still run in parallel, but every one of them starts its own JVM.
+
+logger = logging.getLogger(__name__)
+
+TABLE_WORKERS = int(os.environ.get("TABLE_WORKERS") or 2)
+BATCH_PAGES = int(os.environ.get("TABLE_BATCH_PAGES") or 10)
+
+_pool = None
+
+
+def jvm_in_process():
+    return importlib.util.find_spec("jpype") is not None
+
+
+def extract_batch(pdf_path, pages, password=None):
+    """Return the tables tabula finds on `pages` (1-based), in order."""
+    return tabula.read_pdf(
+        pdf_path, pages=pages, multiple_tables=True, password=password, silent=True
+    )
+
+
+def warm_up():
+    """Start the JVM and load tabula's classes before the first real job."""
+    if not jvm_in_process():
+        return
+    from reportlab.pdfgen import canvas
+
+    path = os.path.join(tempfile.gettempdir(), f"pdf_engine_warm_{os.getpid()}.pdf")
+    c = canvas.Canvas(path)
+    c.drawString(72, 720, "warm up")
+    c.save()
+    try:
+        extract_batch(path, [1])
+    except Exception:
+        logger.exception("Table extractor warm-up failed")
+    finally:
+        os.remove(path)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=TABLE_WORKERS, initializer=warm_up)
+        # Runs before a multiprocessing child waits for its own children,
+        # and before multiprocessing's queues (priority 10) stop feeding,
+        # so the shutdown reaches the workers.
+        util.Finalize(None, stop_pool, exitpriority=100)
+    return _pool
+
+
+def start_pool():
+    """Start the extractor processes (and their JVMs) ahead of the first job."""
+    if TABLE_WORKERS > 1:
+        pool = get_pool()
+        for _ in range(TABLE_WORKERS):
+            pool.submit(os.getpid)
+
+
+def stop_pool():
+    """Shut the extractor processes down.
+
+    Also called on exit: a multiprocessing child waits for its own children
+    when it exits, so the pool must be gone by then.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def extract_tables(pdf_path, pages, password=None, workers=TABLE_WORKERS,
+                   batch_pages=BATCH_PAGES):
+    """Return the tables on `pages` (1-based page numbers), in page order.
+
+    An empty list is returned when Java isn't installed, so callers can
+    fall back to plain text.
+    """
+    global _pool
+    chunks = batches(pages, batch_pages)
+
+    try:
+        if workers <= 1:
+            results = [extract_batch(pdf_path, chunk, password) for chunk in chunks]
+        else:
+            # Even a single batch goes to the pool: that is where the JVMs are warm.
+            pool = get_pool()
+            futures = [pool.submit(extract_batch, pdf_path, chunk, password) for chunk in chunks]
+            try:
+                results = [future.result() for future in futures]
+            except BrokenProcessPool:
+                _pool = None
+                raise
+            finally:
+                # Don't leave a failed document's batches queued up.
+                for future in futures:
+                    future.cancel()
+    except JavaNotFoundError:
+        logger.warning("Java not found, table extraction skipped")
+        return []
+
+    return [table for result in results for table in result]
+
+
+def ensure_visible_sheet(xlsx_path):
+    wb = load_workbook(xlsx_path)
+    if not any(ws.sheet_state == "visible" for ws in wb.worksheets):
+        wb.worksheets[0].sheet_state = "visible"
+        wb.save(xlsx_path)
+
+
+def pdf_to_excel(paths, output_path, password=None, pages=None):
+    path = paths[0]
+    analysis = open_analysis(path, password)
+    selected = parse_page_ranges(pages, analysis.page_count)
+
+    with metrics.stage("extract"):
+        tables = extract_tables(path, sorted(set(selected)), password=password)
+
+    if not tables:
+        rows = []
+        with analysis, metrics.stage("text"):
+            texts = page_texts(
+                analysis, poppler_path=POPPLER_PATH, pages=[p - 1 for p in selected]
+            )
+            for text in texts:
+                for line in text.splitlines():
+                    if line.strip():
+                        rows.append([line])
+        tables = [pd.DataFrame(rows, columns=["Content"])]
+
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        for i, t in enumerate(tables):
+            t.to_excel(writer, sheet_name=f"Sheet{i+1}", index=False)
+
+    ensure_visible_sheet(output_path)
+    return output_path
@@ -0,0 +1,108 @@
+import contextvars
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+# Helpers for the on-disk caches that hold document text (analysis.py,
+# ocr.py). Their contents are users' documents, so the cache directory is
+# made 0700 and every entry is written 0600, through a temporary file that
+# is renamed into place. Reading an entry refreshes its mtime, and prune()
+# removes entries by age and then, oldest first, by total size.
+#
+# Entries are keyed by the input's SHA-256. Callers that already know it
+# (the job worker hashed every upload while staging it) pass it in with
+# known_hashes() so the file isn't read a second time.
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_private = set()
+_known_hashes = contextvars.ContextVar("pdf_engine_known_hashes", default={})
+
+
+@contextmanager
+def known_hashes(hashes):
+    """Within the block, file_sha256() answers {path: sha256} without reading."""
+    token = _known_hashes.set(hashes)
+    try:
+        yield
+    finally:
+        _known_hashes.reset(token)
+
+
+def file_sha256(path):
+    known = _known_hashes.get().get(path)
+    if known:
+        return known
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def private_dir(root):
+    """Create `root` (if needed) and make it accessible to this user only."""
+    if root not in _private:
+        os.makedirs(root, mode=0o700, exist_ok=True)
+        os.chmod(root, 0o700)
+        _private.add(root)
+
+
+def read_text(path):
+    """Return the entry at `path`, or None, and mark it as recently used."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return text
+
+
+def write_text(root, path, text):
+    """Write an entry under `root` so that readers never see half of it."""
+    private_dir(root)
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def prune(root, max_bytes, max_age, now=None):
+    """Remove entries older than `max_age` seconds, then the least recently
+    used ones until the rest fit in `max_bytes`. Returns (files, bytes)."""
+    now = now or time.time()
+    cutoff = now - max_age
+    entries = []
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # Leave writes in progress alone.
+            if name.endswith(".tmp") and st.st_mtime >= cutoff:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+        freed += size
+    return removed, freed
@@ -0,0 +1,231 @@
+import io
+import shutil
+import zlib
+
+from PIL import Image, ImageOps
+
+from . import metrics
+
+# Streaming image -> PDF builder. Pages are written to the output file as
+# they are produced and only byte offsets are kept for the xref table, so
+# memory is bounded by the image being processed. Baseline RGB/grayscale
+# JPEGs that don't need resizing are copied into the PDF untouched
+# (DCTDecode), other images are decoded, optionally downscaled and encoded.
+
+# page size name -> (width, height) in points, portrait
+PAGE_SIZES = {
+    "A4": (595.28, 841.89),
+    "Letter": (612.0, 792.0),
+}
+
+JPEG_QUALITY = 90
+COPY_SIZE = 1024 * 1024
+
+EXIF_ORIENTATION = 0x0112
+
+# EXIF orientation -> placement matrix for a w x h box at (x, y), for the
+# rotations that can be done while drawing instead of decoding the image.
+ROTATIONS = {
+    1: lambda x, y, w, h: (w, 0, 0, h, x, y),
+    3: lambda x, y, w, h: (-w, 0, 0, -h, x + w, y + h),
+    6: lambda x, y, w, h: (0, -h, w, 0, x, y + h),
+    8: lambda x, y, w, h: (0, h, -w, 0, x + w, y),
+}
+
+
+class PdfStreamWriter:
+    """Minimal PDF writer that emits one page at a time."""
+
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.next_id = 3
+        self.pages = []
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self):
+        num = self.next_id
+        self.next_id += 1
+        return num
+
+    def begin(self, num):
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n".encode())
+
+    def end(self):
+        self.f.write(b"\nendobj\n")
+
+    def write_object(self, num, body):
+        self.begin(num)
+        self.f.write(body.encode())
+        self.end()
+
+    def write_stream(self, num, entries, length, copy):
+        """Write a stream object; `copy` writes exactly `length` bytes."""
+        self.begin(num)
+        self.f.write(f"<< {entries} /Length {length} >>\nstream\n".encode())
+        copy(self.f)
+        self.f.write(b"\nendstream")
+        self.end()
+
+    def add_image_page(self, page_size, image_entries, image_length, copy_image, matrix):
+        image_id, content_id, page_id = self.reserve(), self.reserve(), self.reserve()
+        self.write_stream(
+            image_id, f"/Type /XObject /Subtype /Image {image_entries}",
+            image_length, copy_image,
+        )
+
+        content = "q {} cm /Im0 Do Q".format(" ".join(f"{v:.4f}" for v in matrix)).encode()
+        self.write_stream(content_id, "", len(content), lambda f: f.write(content))
+
+        width, height = page_size
+        self.write_object(
+            page_id,
+            f"<< /Type /Page /Parent {self.PAGES} 0 R "
+            f"/MediaBox [0 0 {width:.2f} {height:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>",
+        )
+        self.pages.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{p} 0 R" for p in self.pages)
+        self.write_object(
+            self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>"
+        )
+        self.write_object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>")
+
+        xref = self.f.tell()
+        self.f.write(f"xref\n0 {self.next_id}\n0000000000 65535 f \n".encode())
+        for num in range(1, self.next_id):
+            self.f.write(f"{self.offsets[num]:010d} 00000 n \n".encode())
+        self.f.write(
+            f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode()
+        )
+
+
+def page_box(image_size, page_size="A4", orientation="portrait"):
+    """Return (page width, page height, placement box) in points."""
+    iw, ih = image_size
+    if page_size not in PAGE_SIZES:
+        # "Auto": the page is the image, one pixel per point.
+        return iw, ih, (0, 0, iw, ih)
+
+    pw, ph = PAGE_SIZES[page_size]
+    if orientation == "landscape":
+        pw, ph = ph, pw
+    scale = min(pw / iw, ph / ih)
+    w, h = iw * scale, ih * scale
+    return pw, ph, ((pw - w) / 2, (ph - h) / 2, w, h)
+
+
+def max_pixels(box, max_dpi):
+    """Largest useful pixel size for an image drawn in `box`, or None."""
+    if not max_dpi:
+        return None
+    _, _, w, h = box
+    return max(1, int(w / 72 * max_dpi)), max(1, int(h / 72 * max_dpi))
+
+
+def _passthrough(im, limit):
+    """Whether the JPEG behind `im` can be embedded without decoding."""
+    if im.format != "JPEG" or im.mode not in ("RGB", "L"):
+        return False
+    if im.getexif().get(EXIF_ORIENTATION, 1) not in ROTATIONS:
+        return False
+    return limit is None or (im.width <= limit[0] and im.height <= limit[1])
+
+
+def _display_size(im):
+    if im.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+        return im.height, im.width
+    return im.size
+
+
+def _decode(im, limit):
+    """Decode, orient, flatten and downscale `im` to an RGB or L image."""
+    if limit and im.format == "JPEG":
+        # Let the JPEG decoder skip detail we'd throw away anyway.
+        im.draft(im.mode, limit)
+    im = ImageOps.exif_transpose(im)
+
+    if im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info):
+        rgba = im.convert("RGBA")
+        im = Image.new("RGB", rgba.size, "white")
+        im.paste(rgba, mask=rgba.getchannel("A"))
+    elif im.mode.startswith("I;16"):
+        # convert() clips 16-bit samples at 255; scale them down instead.
+        im = im.point(lambda v: v / 256).convert("L")
+    elif im.mode in ("1", "L", "I", "F"):
+        im = im.convert("L")
+    elif im.mode != "RGB":
+        im = im.convert("RGB")
+
+    if limit and (im.width > limit[0] or im.height > limit[1]):
+        im.thumbnail(limit, Image.LANCZOS)
+    return im
+
+
+def add_image(writer, path, page_size="A4", orientation="portrait", max_dpi=None):
+    with Image.open(path) as im:
+        pw, ph, box = page_box(_display_size(im), page_size, orientation)
+        limit = max_pixels(box, max_dpi)
+
+        if _passthrough(im, limit):
+            space = "/DeviceRGB" if im.mode == "RGB" else "/DeviceGray"
+            entries = (
+                f"/Width {im.width} /Height {im.height} /ColorSpace {space} "
+                f"/BitsPerComponent 8 /Filter /DCTDecode"
+            )
+            matrix = ROTATIONS[im.getexif().get(EXIF_ORIENTATION, 1)](*box)
+            im.close()
+
+            with open(path, "rb") as src:
+                src.seek(0, 2)
+                length = src.tell()
+                src.seek(0)
+                writer.add_image_page(
+                    (pw, ph), entries, length,
+                    lambda f: shutil.copyfileobj(src, f, COPY_SIZE),
+                    matrix,
+                )
+            return
+
+        source_format = im.format
+        im = _decode(im, limit)
+
+    space = "/DeviceRGB" if im.mode == "RGB" else "/DeviceGray"
+    entries = f"/Width {im.width} /Height {im.height} /ColorSpace {space} /BitsPerComponent 8"
+    if source_format == "JPEG":
+        # Already lossy: re-encoding as JPEG keeps it small.
+        buf = io.BytesIO()
+        im.save(buf, "JPEG", quality=JPEG_QUALITY)
+        data = buf.getvalue()
+        entries += " /Filter /DCTDecode"
+    else:
+        data = zlib.compress(im.tobytes(), 6)
+        entries += " /Filter /FlateDecode"
+    im.close()
+
+    writer.add_image_page(
+        (pw, ph), entries, len(data), lambda f: f.write(data), ROTATIONS[1](*box)
+    )
+
+
+def images_to_pdf(paths, output_path, page_size="A4", orientation="portrait", max_dpi=None):
+    """Write one page per image in `paths` to `output_path`."""
+    with open(output_path, "wb") as f:
+        writer = PdfStreamWriter(f)
+        for path in paths:
+            add_image(writer, path, page_size, orientation, max_dpi)
+        writer.close()
+    return output_path
+
+
+def image_to_pdf(paths, output_path, page_size="A4", orientation="portrait", max_dpi=None):
+    metrics.add("pages", len(paths))
+    return images_to_pdf(paths, output_path, page_size, orientation, max_dpi)
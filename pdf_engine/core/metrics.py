@@ -0,0 +1,103 @@
+import contextvars
+import resource
+import time
+from contextlib import contextmanager
+
+# Resource accounting for conversion jobs. `measure()` wraps a whole job and
+# records wall time, CPU time (including pool processes that have exited)
+# and peak RSS; inside it, `stage(name)` times a pipeline step and `add()`
+# counts things like pages. Conversion code can call both without knowing
+# whether a measurement is running.
+
+_current = contextvars.ContextVar("pdf_engine_measurement", default=None)
+
+
+def _cpu_time():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def reset_peak_rss():
+    """Start a new peak RSS measurement for this process (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS; it never resets.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _children_peak():
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+
+class Measurement:
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+        self.wall_time = None
+        self.cpu_time = None
+        self.peak_rss = None
+
+    def add(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + time.perf_counter() - start
+
+
+@contextmanager
+def measure():
+    """Measure the block; yields the Measurement, filled in on exit."""
+    m = Measurement()
+    token = _current.set(m)
+    reset_peak_rss()
+    children_peak = _children_peak()
+    start_wall, start_cpu = time.perf_counter(), _cpu_time()
+    try:
+        yield m
+    finally:
+        m.wall_time = time.perf_counter() - start_wall
+        m.cpu_time = _cpu_time() - start_cpu
+        m.peak_rss = peak_rss()
+        # Children's peak can't be reset; if it rose, a pool process this
+        # block started set the new high.
+        if _children_peak() > children_peak:
+            m.peak_rss = max(m.peak_rss, _children_peak())
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline step of the current measurement, if any."""
+    m = _current.get()
+    if m is None:
+        yield
+    else:
+        with m.stage(name):
+            yield
+
+
+def add(name, amount=1):
+    m = _current.get()
+    if m is not None:
+        m.add(name, amount)
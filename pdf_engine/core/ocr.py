@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from pdf2image import convert_from_path
+
+from . import config, filecache
+from .analysis import page_images
+
+# OCR for scanned pages. Text is taken from the PDF where it has any; pages
+# that only carry images are rendered one at a time and read by Tesseract in
+# a process pool, one page per task. Results are kept with the document's
+# analysis and cached on disk under config.OCR_CACHE_DIR, keyed by a hash
+# of the page's content stream and image data, so the same scan uploaded
+# again (or inside another document) is not read twice.
+#
+# Like the analysis store, the cache is private to the service user and
+# pruned by the Django app.
+#
+# pytesseract is imported only once a page needs OCR: it loads pandas when
+# that is installed, which text-only documents have no use for.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DPI = 300
+DEFAULT_LANG = os.environ.get("OCR_LANG") or "eng"
+
+
+def tesseract_available():
+    import pytesseract
+
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def page_key(page, dpi, lang):
+    """Hash of everything that determines a page's OCR text."""
+    digest = hashlib.sha256(f"{dpi}:{lang}:".encode())
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    for image in page_images(page):
+        digest.update(image._data or b"")
+    return digest.hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(config.OCR_CACHE_DIR, key[:2], f"{key}.txt")
+
+
+def cached_text(key):
+    return filecache.read_text(_cache_path(key))
+
+
+def store_text(key, text):
+    filecache.write_text(config.OCR_CACHE_DIR, _cache_path(key), text)
+
+
+def ocr_page(pdf_path, number, dpi=DEFAULT_DPI, lang=DEFAULT_LANG, password=None,
+             poppler_path=None):
+    """Render page `number` (1-based) and return Tesseract's text for it."""
+    images = convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        first_page=number,
+        last_page=number,
+        grayscale=True,
+        userpw=password,
+        poppler_path=poppler_path,
+    )
+    try:
+        import pytesseract
+
+        return pytesseract.image_to_string(images[0], lang=lang)
+    finally:
+        images[0].close()
+
+
+def page_texts(analysis, workers=None, dpi=DEFAULT_DPI, lang=DEFAULT_LANG,
+               poppler_path=None, pages=None):
+    """Return the text of the pages of a DocumentAnalysis, OCRing scans.
+
+    `pages` selects 0-based page indexes (default: all); the result has one
+    entry per selected page. `workers` defaults to config.RENDER_WORKERS.
+    """
+    workers = config.RENDER_WORKERS if workers is None else workers
+    pages = range(analysis.page_count) if pages is None else pages
+    texts = []
+    pending = {}   # cache key -> positions in `texts` of the pages showing it
+
+    for position, index in enumerate(pages):
+        text = analysis.text(index)
+        if not text.strip() and analysis.images(index):
+            text = analysis.ocr_text(index)
+            if text is None:
+                key = page_key(analysis.page(index), dpi, lang)
+                text = cached_text(key)
+                if text is None:
+                    pending.setdefault(key, []).append((position, index))
+                    text = ""
+                else:
+                    analysis.set_ocr_text(index, text)
+        texts.append(text)
+
+    if not pending:
+        return texts
+    if not tesseract_available():
+        logger.warning("Tesseract not found, %d scanned page(s) left empty", len(pending))
+        return texts
+
+    def done(key, text):
+        # The shared cache only ever holds text of unencrypted documents.
+        if not analysis.encrypted:
+            store_text(key, text)
+        for position, index in pending[key]:
+            texts[position] = text
+            analysis.set_ocr_text(index, text)
+
+    # Identical pages are only read once.
+    options = (dpi, lang, analysis.password, poppler_path)
+    if workers <= 1 or len(pending) == 1:
+        for key, found in pending.items():
+            done(key, ocr_page(analysis.path, found[0][1] + 1, *options))
+        return texts
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = {
+            key: pool.submit(ocr_page, analysis.path, found[0][1] + 1, *options)
+            for key, found in pending.items()
+        }
+        for key, future in futures.items():
+            done(key, future.result())
+    return texts
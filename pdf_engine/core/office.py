@@ -0,0 +1,208 @@
+import logging
+import os
+import shlex
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from multiprocessing import util
+
+from . import config
+
+# Word -> PDF on Linux through headless LibreOffice. Every worker process
+# keeps its own LibreOffice instance running between jobs, started by
+# unoserver on a pair of local ports, and sends documents to it over
+# XML-RPC instead of launching soffice for each file. So `runworkers
+# --processes N` gives a pool of N warm instances.
+#
+# An instance is restarted after config.OFFICE_MAX_CONVERSIONS documents,
+# to keep LibreOffice's memory growth in check, and killed when a
+# conversion runs longer than config.OFFICE_TIMEOUT seconds; the next job
+# starts a fresh one. Ports are picked free for every instance.
+#
+# config.WORD_TO_PDF_BACKEND picks the converter: "unoserver", "soffice" (a
+# cold `soffice --convert-to` per document), "docx2pdf" (needs Microsoft
+# Word) or "auto", the first of those that is installed.
+
+logger = logging.getLogger(__name__)
+
+START_TIMEOUT = 60
+
+_server = None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command():
+    return shlex.split(config.OFFICE_SERVER_COMMAND)
+
+
+def profile_url(directory):
+    # A private profile per instance; LibreOffice locks the one it uses.
+    return "file://" + os.path.abspath(directory)
+
+
+class OfficeServer:
+    """One unoserver-managed LibreOffice instance."""
+
+    def __init__(self):
+        self.process = None
+        self.profile = None
+        self.port = None
+        self.conversions = 0
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.profile = tempfile.mkdtemp(prefix="pdf_engine_office_")
+        self.port = free_port()
+        uno_port = free_port()
+        self.process = subprocess.Popen(
+            server_command() + [
+                "--interface", "127.0.0.1", "--uno-interface", "127.0.0.1",
+                "--port", str(self.port), "--uno-port", str(uno_port),
+                "--user-installation", profile_url(self.profile),
+                "--conversion-timeout", str(int(config.OFFICE_TIMEOUT)),
+                "--quiet",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # unoserver starts soffice as a child; stop() kills both.
+            start_new_session=True,
+        )
+        self.conversions = 0
+
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if not self.running:
+                break
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("LibreOffice did not start")
+
+    def stop(self):
+        if self.process is not None:
+            if self.running:
+                try:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            self.process.wait()
+            self.process = None
+        if self.profile is not None:
+            shutil.rmtree(self.profile, ignore_errors=True)
+            self.profile = None
+
+    def convert(self, input_path, output_path):
+        from unoserver.client import UnoClient
+
+        if self.running and self.conversions >= config.OFFICE_MAX_CONVERSIONS:
+            self.stop()
+        if not self.running:
+            self.stop()
+            self.start()
+
+        # unoserver gives up on a stuck conversion itself; this catches an
+        # instance that stops answering altogether.
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self.stop()
+
+        watchdog = threading.Timer(config.OFFICE_TIMEOUT + 10, kill)
+        watchdog.start()
+        try:
+            UnoClient("127.0.0.1", str(self.port)).convert(
+                inpath=input_path, outpath=output_path, convert_to="pdf"
+            )
+        except Exception as e:
+            watchdog.cancel()
+            self.stop()
+            if timed_out.is_set():
+                raise TimeoutError("LibreOffice conversion timed out") from e
+            raise
+        finally:
+            watchdog.cancel()
+        self.conversions += 1
+
+
+def get_server():
+    global _server
+    if _server is None:
+        _server = OfficeServer()
+        # LibreOffice runs in its own session; don't leave it behind on exit.
+        util.Finalize(None, stop_server, exitpriority=100)
+    return _server
+
+
+def stop_server():
+    if _server is not None:
+        _server.stop()
+
+
+def backend():
+    if config.WORD_TO_PDF_BACKEND != "auto":
+        return config.WORD_TO_PDF_BACKEND
+    if shutil.which(server_command()[0]):
+        return "unoserver"
+    if shutil.which(config.SOFFICE_PATH):
+        return "soffice"
+    return "docx2pdf"
+
+
+def start_server():
+    """Start this process's LibreOffice instance ahead of the first job."""
+    if backend() == "unoserver":
+        try:
+            get_server().start()
+        except Exception:
+            logger.exception("Could not start LibreOffice")
+
+
+def convert_cold(input_path, output_path):
+    with tempfile.TemporaryDirectory() as tmp:
+        subprocess.run(
+            [
+                config.SOFFICE_PATH, "--headless", "--norestore",
+                f"-env:UserInstallation={profile_url(os.path.join(tmp, 'profile'))}",
+                "--convert-to", "pdf", "--outdir", tmp, input_path,
+            ],
+            check=True, timeout=config.OFFICE_TIMEOUT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        name = os.path.splitext(os.path.basename(input_path))[0] + ".pdf"
+        shutil.move(os.path.join(tmp, name), output_path)
+
+
+def convert_to_pdf(input_path, output_path):
+    """Convert a word processing document to PDF with the configured backend."""
+    name = backend()
+    if name == "unoserver":
+        get_server().convert(input_path, output_path)
+    elif name == "soffice":
+        convert_cold(input_path, output_path)
+    elif name == "docx2pdf":
+        from docx2pdf import convert
+
+        convert(input_path, output_path)
+    else:
+        raise ValueError(f"Unknown WORD_TO_PDF_BACKEND: {name}")
+    return output_path
+
+
+def word_to_pdf(paths, output_path):
+    return convert_to_pdf(paths[0], output_path)
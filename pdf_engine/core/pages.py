@@ -0,0 +1,44 @@
+import re
+
+# Page range specs as typed by users: "1-3, 5, 8-" (1-based, inclusive;
+# "8-" runs to the last page, "-3" starts at the first).
+
+RANGE_RE = re.compile(r"^(\d*)\s*-\s*(\d*)$")
+
+
+def parse_page_ranges(spec, total):
+    """Return the 1-based page numbers selected by `spec`, in spec order.
+
+    An empty spec (or "all") selects every page. Raises ValueError for
+    malformed ranges or pages outside 1..total.
+    """
+    if spec is None or not str(spec).strip() or str(spec).strip().lower() == "all":
+        return list(range(1, total + 1))
+
+    pages = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part.isdigit():
+            first = last = int(part)
+        else:
+            match = RANGE_RE.match(part)
+            if not match or not any(match.groups()):
+                raise ValueError(f"Invalid page range: {part}")
+            first = int(match.group(1) or 1)
+            last = int(match.group(2) or total)
+
+        if not 1 <= first <= total or not 1 <= last <= total:
+            raise ValueError(f"Page range {part} is outside 1-{total}")
+        step = 1 if last >= first else -1
+        pages.extend(range(first, last + step, step))
+
+    if not pages:
+        raise ValueError("No pages selected")
+    return pages
+
+
+def batches(pages, size):
+    """Split a list of pages into consecutive lists of at most `size`."""
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
@@ -0,0 +1,20 @@
+from docx import Document
+
+from . import metrics
+from .analysis import open_analysis
+from .ocr import page_texts
+from .rendering import POPPLER_PATH
+
+# PDF -> Word: the text of every page (OCR'd for scans) as paragraphs.
+
+
+def pdf_to_word(paths, output_path, password=None):
+    doc = Document()
+
+    with open_analysis(paths[0], password) as analysis, metrics.stage("text"):
+        for text in page_texts(analysis, poppler_path=POPPLER_PATH):
+            if text.strip():
+                doc.add_paragraph(text)
+
+    doc.save(output_path)
+    return output_path
@@ -0,0 +1,163 @@
+import os
+import re
+import shutil
+import zipfile
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from . import metrics
+from .compression import Compressor, Deduplicator
+from .pages import parse_page_ranges
+
+# The tools that edit PDFs as PDFs, with PyPDF2: unlock, merge, split and
+# compress.
+
+# =====================================================
+# UTILITIES
+# =====================================================
+
+def open_pdf(path, password=None):
+    """Open a PDF for reading, decrypting it in memory when needed."""
+    if not path:
+        raise ValueError("No PDF uploaded")
+
+    with metrics.stage("parse"):
+        reader = PdfReader(path)
+        if reader.is_encrypted:
+            if not password or not reader.decrypt(password):
+                raise ValueError("Invalid PDF password")
+        metrics.add("pages", len(reader.pages))
+    return reader
+
+
+def link_or_copy(src, dst):
+    """Make `dst` hold the bytes of `src` without copying them if possible."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+    return dst
+
+# =====================================================
+# PDF TOOLS
+# =====================================================
+
+def unlock(paths, output_path, password=None):
+    reader = open_pdf(paths[0], password)
+
+    # Nothing to remove: hand the original bytes through untouched.
+    if not reader.is_encrypted:
+        return link_or_copy(paths[0], output_path)
+
+    with metrics.stage("unlock"):
+        writer = PdfWriter()
+        for page in reader.pages:
+            writer.add_page(page)
+
+        with open(output_path, "wb") as f:
+            writer.write(f)
+    return output_path
+
+
+def merge_pdfs(paths, output_path, page_ranges=None):
+    """Merge `paths` in order; page_ranges[i] optionally selects pages of input i."""
+    writer = PdfWriter()
+    dedupe = Deduplicator()
+    page_ranges = page_ranges or []
+    # PdfWriter tracks copied objects by id() of their reader, so every
+    # reader stays referenced until the output is written.
+    readers = []
+
+    for i, path in enumerate(paths):
+        reader = open_pdf(path)
+        readers.append(reader)
+        spec = page_ranges[i] if i < len(page_ranges) else None
+        pages = [p - 1 for p in parse_page_ranges(spec, len(reader.pages))]
+
+        # Fonts and images repeated across inputs end up stored once.
+        for index in sorted(set(pages)):
+            dedupe.dedupe_page(reader.pages[index])
+        writer.append(reader, pages=pages)
+
+    with open(output_path, "wb") as f:
+        writer.write(f)
+    return output_path
+
+
+def split_parts(reader, split_mode, range_size=None, custom_ranges=None):
+    """Yield (name, 0-based page indexes) for every part of a split."""
+    total = len(reader.pages)
+
+    if split_mode == "fixed":
+        for i, first in enumerate(range(0, total, range_size), start=1):
+            yield f"part_{i}.pdf", range(first, min(first + range_size, total))
+
+    elif split_mode == "custom":
+        parts = [part for part in custom_ranges.split(",") if part.strip()]
+        for i, part in enumerate(parts, start=1):
+            yield f"part_{i}.pdf", [p - 1 for p in parse_page_ranges(part, total)]
+
+    elif split_mode == "bookmarks":
+        starts = {}
+        for item in reader.outline:
+            # Nested lists hold the children of the bookmark before them.
+            if not isinstance(item, list):
+                page = reader.get_destination_page_number(item)
+                if page is not None and page >= 0:
+                    starts.setdefault(page, item.title)
+        if not starts:
+            raise ValueError("This PDF has no bookmarks")
+
+        # Pages before the first bookmark become a part of their own.
+        bounds = sorted(starts)
+        if bounds[0] > 0:
+            starts[0] = "start"
+            bounds.insert(0, 0)
+        for i, (first, last) in enumerate(zip(bounds, bounds[1:] + [total]), start=1):
+            title = re.sub(r"[^\w\- ]+", "", starts[first]).strip()[:60] or "part"
+            yield f"part_{i}_{title}.pdf", range(first, last)
+
+    else:
+        raise ValueError(f"Unknown split mode: {split_mode}")
+
+
+def split_pdf(paths, output_path, split_mode="fixed", range_size=None,
+              custom_ranges=None, password=None):
+    reader = open_pdf(paths[0], password)
+
+    # Each part goes into the ZIP before the next one is built, so only one
+    # PdfWriter is alive at a time. PdfWriter needs a seekable stream, so a
+    # part passes through a file next to the output.
+    part_path = output_path + ".part"
+    try:
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as z:
+            for name, pages in split_parts(reader, split_mode, range_size, custom_ranges):
+                writer = PdfWriter()
+                for i in pages:
+                    writer.add_page(reader.pages[i])
+                with open(part_path, "wb") as f:
+                    writer.write(f)
+                z.write(part_path, name)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return output_path
+
+
+def compress_pdf(paths, output_path, compression_level="recommended"):
+    reader = open_pdf(paths[0])
+    writer = PdfWriter()
+    compressor = Compressor(compression_level)
+
+    for page in reader.pages:
+        compressor.compress_page(page)
+        writer.add_page(page)
+
+    with open(output_path, "wb") as f:
+        writer.write(f)
+
+    # Nothing left to squeeze out: hand back the original instead.
+    if os.path.getsize(output_path) >= os.path.getsize(paths[0]):
+        os.remove(output_path)
+        link_or_copy(paths[0], output_path)
+    return output_path
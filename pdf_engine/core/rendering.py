@@ -0,0 +1,122 @@
+import io
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pdf2image import convert_from_path
+from PyPDF2 import PdfReader
+
+from . import config
+
+# Page rendering for pdf_to_image. Pages are rendered a few at a time with
+# pdf2image's first_page/last_page, encoded into the ZIP and released before
+# the next chunk, so memory stays bounded by `chunk_size` pages no matter how
+# long the document is. With workers > 1 the chunks are rendered in a process
+# pool and written back in page order; pdf_to_image defaults to
+# config.RENDER_WORKERS.
+
+POPPLER_PATH = os.environ.get("POPPLER_PATH") or None
+DEFAULT_CHUNK_SIZE = 4
+
+# format name -> (Pillow format, file extension, save options)
+IMAGE_FORMATS = {
+    "png": ("PNG", "png", {}),
+    "jpeg": ("JPEG", "jpg", {"quality": 85, "optimize": True}),
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+}
+
+
+def page_count(pdf_path, password=None):
+    # Only the page tree is needed: no analysis, so no hashing of the file.
+    reader = PdfReader(pdf_path)
+    # Files with only an owner password open with an empty one.
+    if reader.is_encrypted and not reader.decrypt(password or ""):
+        raise ValueError("Invalid PDF password")
+    return len(reader.pages)
+
+
+def page_chunks(total, chunk_size):
+    """Yield (first_page, last_page) pairs, 1-based and inclusive."""
+    for first in range(1, total + 1, chunk_size):
+        yield first, min(first + chunk_size - 1, total)
+
+
+def render_chunk(pdf_path, first, last, dpi=200, image_format="png", password=None,
+                 poppler_path=None):
+    """Render pages first..last and return their encoded bytes in order."""
+    fmt, _, save_options = IMAGE_FORMATS[image_format]
+    images = convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        first_page=first,
+        last_page=last,
+        userpw=password,
+        poppler_path=poppler_path,
+    )
+
+    pages = []
+    for offset in range(len(images)):
+        image = images[offset]
+        images[offset] = None
+        buf = io.BytesIO()
+        image.save(buf, fmt, **save_options)
+        image.close()
+        pages.append(buf.getvalue())
+    return pages
+
+
+def iter_rendered_chunks(pdf_path, dpi=200, image_format="png", workers=1,
+                         chunk_size=DEFAULT_CHUNK_SIZE, password=None, poppler_path=None):
+    """Yield (first_page, [encoded page bytes]) for each chunk, in page order."""
+    chunks = page_chunks(page_count(pdf_path, password), chunk_size)
+    options = (dpi, image_format, password, poppler_path)
+
+    if workers <= 1:
+        for first, last in chunks:
+            yield first, render_chunk(pdf_path, first, last, *options)
+        return
+
+    # Only keep a couple of chunks per worker in flight so finished pages
+    # don't pile up in memory while the ZIP is being written.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first, last in chunks:
+            pending.append((first, pool.submit(
+                render_chunk, pdf_path, first, last, *options
+            )))
+            if len(pending) >= workers * 2:
+                first_done, future = pending.popleft()
+                yield first_done, future.result()
+        while pending:
+            first_done, future = pending.popleft()
+            yield first_done, future.result()
+
+
+def render_to_zip(pdf_path, output_path, dpi=200, image_format="png", workers=1,
+                  chunk_size=DEFAULT_CHUNK_SIZE, password=None, poppler_path=None):
+    """Render every page of `pdf_path` as page_N.<ext> entries of a ZIP."""
+    _, ext, _ = IMAGE_FORMATS[image_format]
+
+    # Image formats are already compressed, deflating them again only burns CPU.
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as z:
+        for first, pages in iter_rendered_chunks(
+            pdf_path, dpi, image_format, workers, chunk_size, password, poppler_path
+        ):
+            for offset, data in enumerate(pages):
+                z.writestr(f"page_{first + offset}.{ext}", data)
+    return output_path
+
+
+def pdf_to_image(paths, output_path, dpi=200, image_format="png", workers=None,
+                 password=None):
+    # Poppler decrypts by itself, so encrypted PDFs aren't rewritten first.
+    return render_to_zip(
+        paths[0],
+        output_path,
+        dpi=dpi,
+        image_format=image_format,
+        workers=workers or config.RENDER_WORKERS,
+        password=password,
+        poppler_path=POPPLER_PATH,
+    )
@@ -0,0 +1,221 @@
+import datetime
+import math
+import os
+from itertools import chain, islice
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+# Spreadsheet -> PDF table renderer for excel_to_pdf. Every sheet is read as
+# a stream of rows (openpyxl read-only mode for .xlsx, pandas otherwise) and
+# written a page at a time: column widths come from the string lengths of a
+# sample of leading rows, and each page is drawn as one text object per
+# column rather than one drawString per cell. Only the sample and the
+# current page are held in memory. A later row with more filled columns
+# than the sample widens the layout from its page on.
+
+FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+FONT_SIZE = 8
+LEADING = 11
+MARGIN = 36
+PADDING = 6
+TITLE_SIZE = 12
+
+SAMPLE_ROWS = 500
+MAX_COLUMN_CHARS = 40
+MIN_COLUMN_WIDTH = 24
+
+OPENPYXL_EXTENSIONS = (".xlsx", ".xlsm", ".xltx", ".xltm")
+
+# Average glyph width for sizing columns from character counts, and the
+# widest glyph, below which a cell can't overflow without measuring it.
+CHAR_WIDTH = stringWidth("0", FONT, FONT_SIZE)
+WIDEST_CHAR = stringWidth("W", BOLD_FONT, FONT_SIZE)
+ELLIPSIS = "…"
+
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.10g}"
+    if isinstance(value, datetime.datetime) and value.time() == datetime.time():
+        value = value.date()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return " ".join(str(value).split())
+
+
+def iter_sheets(path):
+    """Yield (title, row iterator) for every sheet."""
+    if os.path.splitext(path)[1].lower() in OPENPYXL_EXTENSIONS:
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                yield ws.title, ws.iter_rows(values_only=True)
+        finally:
+            wb.close()
+        return
+
+    for title, df in pd.read_excel(path, sheet_name=None, header=None).items():
+        yield title, df.itertuples(index=False, name=None)
+
+
+def last_filled(row):
+    for i in range(len(row), 0, -1):
+        if row[i - 1] is not None and row[i - 1] != "":
+            return i
+    return 0
+
+
+def column_widths(sample):
+    """Column widths in points, from the longest value in each column."""
+    lengths = pd.DataFrame(sample).apply(lambda column: column.str.len()).max()
+    chars = lengths.clip(lower=1, upper=MAX_COLUMN_CHARS).to_numpy()
+    return chars * CHAR_WIDTH + PADDING
+
+
+def fit_widths(widths, available):
+    """Narrow the widest columns until the widths fit in `available` points."""
+    if widths.sum() <= available:
+        return widths
+
+    # Cap every column at the largest width that still fits, so short
+    # columns keep their natural width and only long text gets clipped.
+    ordered = np.sort(widths)
+    narrower = np.concatenate(([0], ordered.cumsum()[:-1]))
+    caps = (available - narrower) / np.arange(len(ordered), 0, -1)
+    cap = caps[np.argmax(ordered > caps)]
+    return np.minimum(widths, max(cap, MIN_COLUMN_WIDTH))
+
+
+def clip(text, width, font=FONT):
+    """Cut `text` so it fits in `width` points."""
+    if stringWidth(text, font, FONT_SIZE) <= width:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if stringWidth(text[:mid] + ELLIPSIS, font, FONT_SIZE) <= width:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + ELLIPSIS
+
+
+def pad(rows, columns):
+    return [row + [""] * (columns - len(row)) for row in rows]
+
+
+def page_layout(widths):
+    """Page size, column offsets and fitted widths for natural `widths`."""
+    pagesize = A4
+    if widths.sum() > A4[0] - 2 * MARGIN:
+        pagesize = landscape(A4)
+    widths = fit_widths(widths, pagesize[0] - 2 * MARGIN)
+    return pagesize, MARGIN + widths.cumsum() - widths, widths
+
+
+class TableRenderer:
+    def __init__(self, output_path):
+        self.canvas = canvas.Canvas(output_path, pagesize=A4, pageCompression=1)
+
+    def draw_column(self, x, y, texts, font):
+        text = self.canvas.beginText(x, y)
+        text.setFont(font, FONT_SIZE, LEADING)
+        for line in texts:
+            text.textLine(line)
+        self.canvas.drawText(text)
+
+    def draw_page(self, pagesize, title, header, rows, offsets, widths):
+        c = self.canvas
+        c.setPageSize(pagesize)
+        _, height = pagesize
+        y = height - MARGIN
+
+        c.setFont(BOLD_FONT, TITLE_SIZE)
+        c.drawString(MARGIN, y - TITLE_SIZE, title)
+        y -= TITLE_SIZE + LEADING
+
+        for j, (x, width) in enumerate(zip(offsets, widths)):
+            limit = width - PADDING
+            # Short values can't overflow; only measure the others.
+            safe = int(limit // WIDEST_CHAR)
+            self.draw_column(x, y - FONT_SIZE, [clip(header[j], limit, BOLD_FONT)], BOLD_FONT)
+            self.draw_column(
+                x, y - FONT_SIZE - LEADING,
+                [row[j] if len(row[j]) <= safe else clip(row[j], limit) for row in rows],
+                FONT,
+            )
+
+        c.setLineWidth(0.5)
+        c.line(MARGIN, y - LEADING + 2, MARGIN + sum(widths), y - LEADING + 2)
+
+        c.showPage()
+
+    def add_sheet(self, title, rows):
+        rows = (r for r in rows if r and any(v is not None and v != "" for v in r))
+        sample = list(islice(rows, SAMPLE_ROWS))
+        if not sample:
+            return
+
+        # Sheets often report formatted but empty columns; size to the data.
+        def cells(row):
+            return [format_value(v) for v in row[:last_filled(row)]]
+
+        sample = [cells(r) for r in sample]
+        widths = column_widths(pad(sample, max(len(r) for r in sample)))
+
+        # The first row is taken as the header and repeated on every page.
+        header = sample[0]
+        rows = chain(sample[1:], (cells(r) for r in rows))
+
+        drawn = False
+        while True:
+            pagesize, offsets, fitted = page_layout(widths)
+            per_page = int((pagesize[1] - 2 * MARGIN - TITLE_SIZE - 2 * LEADING) // LEADING)
+            page = list(islice(rows, per_page))
+
+            columns = max((len(r) for r in page), default=0)
+            if columns > len(widths):
+                # A row past the sample fills more columns: widen the layout
+                # from this page on rather than drop its cells.
+                extra = column_widths([r[len(widths):] for r in pad(page, columns)])
+                widths = np.concatenate((widths, extra))
+                rows = chain(page, rows)
+                continue
+
+            if drawn and not page:
+                break
+            columns = len(widths)
+            self.draw_page(
+                pagesize, title, pad([header], columns)[0], pad(page, columns), offsets, fitted
+            )
+            drawn = True
+            if len(page) < per_page:
+                break
+
+    def save(self):
+        self.canvas.save()
+
+
+def render_workbook(path, output_path):
+    """Render every sheet of the workbook at `path` as PDF tables."""
+    renderer = TableRenderer(output_path)
+    for title, rows in iter_sheets(path):
+        renderer.add_sheet(title, rows)
+    renderer.save()
+    return output_path
+
+
+def excel_to_pdf(paths, output_path):
+    return render_workbook(paths[0], output_path)
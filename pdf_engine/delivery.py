@@ -0,0 +1,157 @@
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, parse_etags
+
+from .storage import guess_content_type
+
+# Delivery of stored files for the view/download/share endpoints.
+#
+# FILE_DELIVERY selects how the bytes reach the client:
+#   "sendfile"          the file is handed to the WSGI server's file_wrapper,
+#                       positioned at the requested range, so servers such as
+#                       gunicorn copy it with os.sendfile() (the default)
+#   "x-sendfile"        an X-Sendfile header for Apache/lighttpd
+#   "x-accel-redirect"  an X-Accel-Redirect header for nginx; MEDIA_ROOT must
+#                       be exposed as an internal location at
+#                       FILE_DELIVERY_ACCEL_PREFIX
+# ETag/If-None-Match is answered here in every mode. Ranges are served here
+# in "sendfile" mode and by the proxy in the header modes.
+
+DELIVERY = getattr(settings, "FILE_DELIVERY", "sendfile")
+ACCEL_PREFIX = getattr(settings, "FILE_DELIVERY_ACCEL_PREFIX", "/protected/")
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """A file limited to `length` bytes from its current position.
+
+    fileno() is still the real descriptor, so servers that sendfile() from
+    the current offset for Content-Length bytes get the exact range, while
+    plain read() loops stop at the end of it.
+    """
+
+    def __init__(self, f, start, length):
+        self.f = f
+        self.f.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.f.fileno()
+
+    def close(self):
+        self.f.close()
+
+
+def file_etag(shared):
+    if shared.blob_id:
+        return f'"{shared.blob.sha256}"'
+    stat = os.stat(shared.file.path)
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def etag_matches(header, etag):
+    """Whether an If-None-Match `header` matches `etag` (weak comparison)."""
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return tags == ["*"] or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def parse_range(header, size):
+    """Return (start, end) for a single byte range, None to send it all.
+
+    Raises ValueError when the range can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def serve_file(request, shared, as_attachment=False):
+    """Respond with the file behind `shared`, honouring ETag and Range."""
+    try:
+        etag = file_etag(shared)
+    except FileNotFoundError:
+        raise Http404("File not found")
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    filename = shared.filename or os.path.basename(shared.file.name)
+    content_type = shared.content_type or guess_content_type(filename)
+
+    if DELIVERY in ("x-sendfile", "x-accel-redirect"):
+        response = HttpResponse(content_type=content_type)
+        # Both are URL-decoded by the proxy (mod_xsendfile's default
+        # XSendFileUnescape, nginx's URI handling); names may hold spaces,
+        # '%', '?' or non-ASCII characters.
+        if DELIVERY == "x-sendfile":
+            response["X-Sendfile"] = quote(shared.file.path)
+        else:
+            response["X-Accel-Redirect"] = ACCEL_PREFIX + quote(shared.file.name)
+    else:
+        response = _file_response(request, shared, etag, content_type)
+
+    response["ETag"] = etag
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def _file_response(request, shared, etag, content_type):
+    size = shared.blob.size if shared.blob_id else shared.file.size
+
+    # A range is only valid against the version the client already has.
+    if_range = request.headers.get("If-Range")
+    header = request.headers.get("Range") if not if_range or if_range == etag else None
+
+    try:
+        byte_range = parse_range(header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    try:
+        f = shared.file.open("rb")
+    except FileNotFoundError:
+        raise Http404("File not found")
+    if byte_range is None:
+        response = FileResponse(f, content_type=content_type)
+        response["Content-Length"] = size
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(RangeFile(f, start, length), status=206, content_type=content_type)
+    response["Content-Length"] = length
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
@@ -1,10 +1,15 @@
 from django import forms
 
 # ================= Split PDF Form =================
+# The PDF for split, compress and PDF -> image comes as a posted file or an
+# upload id (see views.single_upload); their forms only cover the options.
 class SplitPDFForm(forms.Form):
-    pdf_file = forms.FileField(label="Select PDF")
     split_mode = forms.ChoiceField(
-        choices=[('fixed', 'Fixed Ranges'), ('custom', 'Custom Ranges')],
+        choices=[
+            ('fixed', 'Fixed Ranges'),
+            ('custom', 'Custom Ranges'),
+            ('bookmarks', 'By Bookmarks'),
+        ],
         label="Split Mode"
     )
     range_size = forms.IntegerField(
@@ -42,7 +47,6 @@ class MergePDFForm(forms.Form):
 
 # ================= Compress PDF Form =================
 class CompressPDFForm(forms.Form):
-    pdf_file = forms.FileField(label="Select PDF")
     compression_level = forms.ChoiceField(
         choices=[
             ('extreme', 'Extreme Compression'),
@@ -51,3 +55,59 @@ class CompressPDFForm(forms.Form):
         ],
         label="Compression Level"
     )
+
+
+# ================= PDF to Image Form =================
+# quality choice -> rendering DPI
+DPI_PRESETS = {
+    "screen": 72,
+    "standard": 150,
+    "high": 200,
+    "print": 300,
+}
+
+
+class PdfToImageForm(forms.Form):
+    image_format = forms.ChoiceField(
+        choices=[('png', 'PNG'), ('jpeg', 'JPEG'), ('webp', 'WebP')],
+        initial='jpeg',
+        label="Image Format"
+    )
+    quality = forms.ChoiceField(
+        choices=[
+            ('screen', 'Screen (72 DPI)'),
+            ('standard', 'Standard (150 DPI)'),
+            ('high', 'High (200 DPI)'),
+            ('print', 'Print (300 DPI)')
+        ],
+        initial='standard',
+        label="Resolution"
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        quality = cleaned_data.get('quality')
+        if quality:
+            cleaned_data['dpi'] = DPI_PRESETS[quality]
+        return cleaned_data
+
+
+# ================= Image to PDF Form =================
+class ImageToPdfForm(forms.Form):
+    page_size = forms.ChoiceField(
+        choices=[('A4', 'A4'), ('Letter', 'Letter'), ('Auto', 'Auto (fit images)')],
+        initial='A4',
+        label="Page Size"
+    )
+    orientation = forms.ChoiceField(
+        choices=[('portrait', 'Portrait'), ('landscape', 'Landscape')],
+        initial='portrait',
+        label="Orientation"
+    )
+    max_dpi = forms.TypedChoiceField(
+        choices=[('', 'Original'), ('300', 'Print (300 DPI)'), ('150', 'Screen (150 DPI)')],
+        coerce=int,
+        empty_value=None,
+        required=False,
+        label="Image Resolution"
+    )
@@ -0,0 +1,412 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import zip_longest
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from . import cache
+from .core import filecache
+from .core.metrics import measure
+from .core.conversions import OPERATIONS, result_name, run_operation
+from .models import ConversionJob, JobTotals, UploadSession
+from .storage import create_shared_file, release_blob, share_blob
+from .uploads import session_path
+from accounts.models import DailyUsage, UserProfile
+
+# Conversions run outside the request cycle: views store the uploads in a
+# per-job directory and queue a ConversionJob row, `manage.py runworkers`
+# processes claim queued rows and run them. The database is the broker, so
+# nothing beyond the app's own DB is needed.
+#
+# A running job's heartbeat_at is touched every CONVERSION_JOB_HEARTBEAT
+# seconds. When a worker is killed, runs out of memory or crashes, the
+# heartbeat stops and the reaper fails the job after
+# CONVERSION_JOB_STALE_AFTER seconds (fail_stale_jobs).
+
+logger = logging.getLogger("pdf_engine.slow_jobs")
+
+JOB_DIR = getattr(
+    settings, "CONVERSION_JOB_DIR",
+    os.path.join(tempfile.gettempdir(), "pdf_engine_jobs"),
+)
+HEARTBEAT = getattr(settings, "CONVERSION_JOB_HEARTBEAT", 30)
+STALE_AFTER = getattr(settings, "CONVERSION_JOB_STALE_AFTER", 5 * 60)
+
+# Histogram buckets for job wall time, in seconds.
+WALL_TIME_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+
+# =====================================================
+# UTILITIES
+# =====================================================
+
+def job_dir(job):
+    return os.path.join(JOB_DIR, str(job.id))
+
+
+def result_filename(job):
+    return result_name(job.operation, original_name(job))
+
+
+def original_name(job):
+    return job.inputs[0]["name"] if job.inputs else ""
+
+
+def cache_key(job):
+    return cache.result_key(
+        job.operation, [item["sha256"] for item in job.inputs], job.options
+    )
+
+
+def stage_upload(upload, path):
+    """Put an upload at `path` and return its SHA-256.
+
+    Large uploads Django already spooled to disk and finished upload
+    sessions are moved, not copied.
+    """
+    if isinstance(upload, UploadSession):
+        shutil.move(session_path(upload), path)
+        # Deleted by query so the instance keeps its pk for repeats of it.
+        UploadSession.objects.filter(pk=upload.pk).delete()
+        return upload.sha256
+
+    digest = hashlib.sha256()
+
+    if hasattr(upload, "temporary_file_path"):
+        for chunk in upload.chunks():
+            digest.update(chunk)
+        shutil.move(upload.temporary_file_path(), path)
+        return digest.hexdigest()
+
+    with open(path, "wb") as f:
+        for chunk in upload.chunks():
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+# =====================================================
+# ENQUEUE
+# =====================================================
+
+def enqueue_job(user, operation, uploaded_files, **options):
+    """Store the uploads next to a new queued job and return the job."""
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+
+    # Counted when accepted, before anything is staged, so queued jobs count
+    # against the limit too and concurrent requests can't overshoot it;
+    # given back below or by run_job if the conversion fails.
+    UserProfile.for_user(user).reserve(operation)
+
+    job = ConversionJob(user=user, operation=operation, options=options)
+    directory = job_dir(job)
+
+    start = time.perf_counter()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        staged = {}  # upload session pk -> path it was staged at
+        for i, upload in enumerate(uploaded_files):
+            ext = os.path.splitext(upload.name)[1].lower()
+            path = os.path.join(directory, f"input_{i}{ext}")
+            if isinstance(upload, UploadSession) and upload.pk in staged:
+                # A session listed twice: its file has already moved here.
+                os.link(staged[upload.pk], path)
+                sha256 = upload.sha256
+            else:
+                sha256 = stage_upload(upload, path)
+                if isinstance(upload, UploadSession):
+                    staged[upload.pk] = path
+            job.inputs.append({
+                "path": path, "name": upload.name, "sha256": sha256, "size": upload.size,
+            })
+    except BaseException:
+        DailyUsage.record(user, operation, -1)
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    job.input_bytes = job.input_size()
+    job.stages["upload"] = time.perf_counter() - start
+
+    if cache.cacheable(job.options):
+        cached = cache.lookup(cache_key(job))
+        if cached is not None:
+            # Same inputs and options as an earlier job: answer right away.
+            try:
+                job.result = share_blob(
+                    user, cached.blob, result_filename(job),
+                    UserProfile.for_user(user).share_days(), original_name(job),
+                )
+            finally:
+                release_blob(cached.blob)
+            job.output_bytes = job.result.size
+            job.status = ConversionJob.DONE
+            job.cache_hit = True
+            job.options.pop("password", None)
+            job.started_at = job.finished_at = timezone.now()
+            job.save()
+            shutil.rmtree(directory, ignore_errors=True)
+            return job
+
+    job.save()
+
+    if getattr(settings, "CONVERSION_JOBS_EAGER", False):
+        now = timezone.now()
+        ConversionJob.objects.filter(pk=job.pk).update(
+            status=ConversionJob.RUNNING, started_at=now, heartbeat_at=now
+        )
+        job.refresh_from_db()
+        run_job(job)
+
+    return job
+
+# =====================================================
+# WORKER
+# =====================================================
+
+def claim_next_job():
+    """Atomically move the oldest queued job to running, or return None."""
+    while True:
+        pk = (
+            ConversionJob.objects.filter(status=ConversionJob.QUEUED)
+            .order_by("created_at")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is None:
+            return None
+
+        now = timezone.now()
+        claimed = ConversionJob.objects.filter(
+            pk=pk, status=ConversionJob.QUEUED
+        ).update(status=ConversionJob.RUNNING, started_at=now, heartbeat_at=now)
+
+        # Another worker won the race for this row, try the next one.
+        if claimed:
+            return ConversionJob.objects.get(pk=pk)
+
+
+@contextmanager
+def heartbeat(job):
+    """Touch the job's heartbeat_at every HEARTBEAT seconds while it runs."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT):
+                try:
+                    ConversionJob.objects.filter(
+                        pk=job.pk, status=ConversionJob.RUNNING
+                    ).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    # A missed beat is made up by the next one.
+                    pass
+        finally:
+            # This thread's own connection.
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name="job-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """Run a claimed job and record its result or error."""
+    directory = job_dir(job)
+    filename = result_filename(job)
+    output_path = os.path.join(directory, f"output{os.path.splitext(filename)[1]}")
+    interrupted = None
+
+    # Hashed while staging; engines keyed by content hash reuse them.
+    hashes = {item["path"]: item["sha256"] for item in job.inputs}
+
+    with measure() as m, heartbeat(job):
+        try:
+            with m.stage("convert"), filecache.known_hashes(hashes):
+                run_operation(
+                    job.operation,
+                    [item["path"] for item in job.inputs],
+                    output_path,
+                    **job.options
+                )
+            elapsed = m.stages["convert"]
+
+            with m.stage("store"):
+                job.result = create_shared_file(
+                    job.user, output_path, filename,
+                    UserProfile.for_user(job.user).share_days(), original_name(job),
+                )
+                job.output_bytes = job.result.size
+                if cache.cacheable(job.options):
+                    cache.store(cache_key(job), job.operation, job.result.blob, elapsed)
+                    cache.evict()
+            job.status = ConversionJob.DONE
+        except BaseException as e:
+            job.status = ConversionJob.FAILED
+            job.error = str(e) or e.__class__.__name__
+            DailyUsage.record(
+                job.user, job.operation, -1, date=timezone.localdate(job.created_at)
+            )
+            if not isinstance(e, Exception):
+                # SystemExit or KeyboardInterrupt: record the job, then stop.
+                job.error = "The worker stopped before the job finished."
+                interrupted = e
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    job.wall_time = m.wall_time
+    job.cpu_time = m.cpu_time
+    job.peak_rss = m.peak_rss
+    job.pages = m.counts.get("pages")
+    job.stages.update(m.stages)
+    log_if_slow(job)
+
+    # Don't keep passwords around once the job no longer needs them.
+    job.options.pop("password", None)
+    job.finished_at = timezone.now()
+    job.save()
+    if interrupted is not None:
+        raise interrupted
+    return job
+
+
+def fail_stale_jobs(now=None):
+    """Fail running jobs whose worker stopped sending heartbeats.
+
+    The conversion is given back and the job's files are removed. Jobs are
+    failed rather than requeued: one that took its worker down (out of
+    memory, a crashing backend) would most likely do it again. Returns the
+    number of jobs failed.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=STALE_AFTER)
+    stale = ConversionJob.objects.filter(status=ConversionJob.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+    failed = 0
+    for job in stale.select_related("user"):
+        job.options.pop("password", None)
+        # Only if it's still stale: its worker may have caught up meanwhile.
+        if not stale.filter(pk=job.pk).update(
+            status=ConversionJob.FAILED,
+            error="The worker stopped before the job finished.",
+            options=job.options,
+            finished_at=now,
+        ):
+            continue
+        DailyUsage.record(
+            job.user, job.operation, -1, date=timezone.localdate(job.created_at)
+        )
+        shutil.rmtree(job_dir(job), ignore_errors=True)
+        failed += 1
+    return failed
+
+
+def log_if_slow(job):
+    if job.wall_time < getattr(settings, "SLOW_JOB_SECONDS", 30):
+        return
+    stages = ", ".join(f"{name}={secs:.2f}s" for name, secs in job.stages.items())
+    logger.warning(
+        "Slow job %s: %s %s in %.1fs (cpu %.1fs, peak %.0f MiB, %d bytes in, "
+        "%s pages) [%s]",
+        job.id, job.operation, job.status, job.wall_time, job.cpu_time,
+        job.peak_rss / 1024 ** 2, job.input_bytes, job.pages, stages,
+    )
+
+
+def worker_loop(poll_interval=1.0, max_jobs=None, stop=None):
+    """Process queued jobs until `stop` is set (or `max_jobs` have run).
+
+    A job that has started is always finished before the loop returns.
+    """
+    stop = stop or threading.Event()
+    done = 0
+    while not stop.is_set() and (max_jobs is None or done < max_jobs):
+        close_old_connections()
+        job = claim_next_job()
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+        done += 1
+
+# =====================================================
+# TOTALS
+# =====================================================
+
+def job_totals(jobs):
+    """Counters per (operation, status) over the finished jobs in `jobs`."""
+    # Annotations can't share a name with the field they sum.
+    rows = (
+        jobs.filter(finished_at__isnull=False)
+        .values("operation", "status").order_by("operation", "status").annotate(
+            n_jobs=Count("id"),
+            n_cache_hits=Count("id", filter=Q(cache_hit=True)),
+            n_cpu_time=Sum("cpu_time"),
+            n_input_bytes=Sum("input_bytes"),
+            n_output_bytes=Sum("output_bytes"),
+            n_pages=Sum("pages"),
+            n_peak_rss=Max("peak_rss"),
+            n_wall_count=Count("id", filter=Q(wall_time__isnull=False)),
+            n_wall_time=Sum("wall_time"),
+            **{f"le_{i}": Count("id", filter=Q(wall_time__lte=b))
+               for i, b in enumerate(WALL_TIME_BUCKETS)},
+        )
+    )
+    totals = []
+    for row in rows:
+        total = {"operation": row.pop("operation"), "status": row.pop("status")}
+        total["wall_buckets"] = [row.pop(f"le_{i}") for i in range(len(WALL_TIME_BUCKETS))]
+        total.update((key[2:], value or 0) for key, value in row.items())
+        totals.append(total)
+    return totals
+
+
+def add_totals(row):
+    """Fold a job_totals() row into the stored JobTotals."""
+    totals, _ = JobTotals.objects.select_for_update().get_or_create(
+        operation=row["operation"], status=row["status"]
+    )
+    for field in ("jobs", "cache_hits", "cpu_time", "input_bytes", "output_bytes",
+                  "pages", "wall_count", "wall_time"):
+        setattr(totals, field, getattr(totals, field) + row[field])
+    totals.peak_rss = max(totals.peak_rss, row["peak_rss"])
+    totals.wall_buckets = [
+        a + b for a, b in zip_longest(totals.wall_buckets, row["wall_buckets"], fillvalue=0)
+    ]
+    totals.save()
+
+
+def all_job_totals():
+    """job_totals() for every finished job, pruned ones included."""
+    merged = {}
+    stored = JobTotals.objects.values(
+        "operation", "status", "jobs", "cache_hits", "cpu_time", "input_bytes",
+        "output_bytes", "pages", "peak_rss", "wall_count", "wall_time", "wall_buckets",
+    )
+    for row in [*stored, *job_totals(ConversionJob.objects.all())]:
+        key = (row["operation"], row["status"])
+        if key not in merged:
+            merged[key] = dict(row)
+            continue
+        total = merged[key]
+        for field, value in row.items():
+            if field == "peak_rss":
+                total[field] = max(total[field], value)
+            elif field == "wall_buckets":
+                total[field] = [a + b for a, b in zip_longest(total[field], value, fillvalue=0)]
+            elif field not in ("operation", "status"):
+                total[field] += value
+    return [merged[key] for key in sorted(merged)]
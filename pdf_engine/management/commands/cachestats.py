@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q, Sum
+
+from pdf_engine.models import CachedResult, ConversionJob
+
+
+class Command(BaseCommand):
+    help = "Show conversion cache hits, misses and the compute time saved."
+
+    def handle(self, *args, **options):
+        jobs = (
+            ConversionJob.objects.filter(status=ConversionJob.DONE)
+            .values("operation")
+            .annotate(
+                hits=Count("pk", filter=Q(cache_hit=True)),
+                misses=Count("pk", filter=Q(cache_hit=False)),
+            )
+        )
+        entries = {
+            row["operation"]: row
+            for row in CachedResult.objects.values("operation").annotate(
+                entries=Count("pk"),
+                size=Sum("size"),
+                saved=Sum(F("hits") * F("compute_seconds")),
+            )
+        }
+
+        self.stdout.write(
+            f"{'operation':<14} {'hits':>7} {'misses':>7} {'hit %':>6} "
+            f"{'entries':>8} {'MiB':>9} {'saved s':>9}"
+        )
+        for row in jobs.order_by("operation"):
+            total = row["hits"] + row["misses"]
+            entry = entries.get(row["operation"], {})
+            self.stdout.write(
+                f"{row['operation']:<14} {row['hits']:>7} {row['misses']:>7} "
+                f"{100 * row['hits'] / total if total else 0:>6.1f} "
+                f"{entry.get('entries', 0):>8} "
+                f"{(entry.get('size') or 0) / 1024 ** 2:>9.1f} "
+                f"{entry.get('saved') or 0:>9.1f}"
+            )
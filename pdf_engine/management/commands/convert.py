@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pdf_engine.core import cli
+
+
+class Command(BaseCommand):
+    help = "Convert files or whole directories in parallel, outside the web app."
+
+    def add_arguments(self, parser):
+        cli.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        try:
+            failed = cli.run(
+                options["operation"],
+                options["inputs"],
+                output_dir=options["output_dir"],
+                options=cli.parse_options(options["option"]),
+                workers=options["workers"],
+                recursive=options["recursive"],
+                skip_existing=options["skip_existing"],
+                out=self.stdout,
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        if failed:
+            raise CommandError(f"{failed} conversion(s) failed")
@@ -0,0 +1,34 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from pdf_engine.models import SharedFile
+from pdf_engine.storage import store_blob
+
+
+class Command(BaseCommand):
+    help = "Move SharedFiles stored before blobs existed into blob storage."
+
+    def handle(self, *args, **options):
+        moved = reclaimed = 0
+
+        for shared in SharedFile.objects.filter(blob__isnull=True).iterator():
+            name = shared.file.name
+            if not name or not default_storage.exists(name):
+                continue
+
+            blob = store_blob(default_storage.path(name))
+            SharedFile.objects.filter(pk=shared.pk).update(
+                blob=blob,
+                file=blob.file.name,
+                filename=shared.filename or os.path.basename(name),
+            )
+            # The row now owns the reference store_blob took for us.
+            if blob.refcount > 1:
+                reclaimed += blob.size
+            if not SharedFile.objects.filter(file=name).exists():
+                default_storage.delete(name)
+            moved += 1
+
+        self.stdout.write(f"Moved {moved} file(s), {reclaimed / 1024 ** 2:.1f} MiB deduplicated")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pdf_engine.models import SharedFile
+from pdf_engine.jobs import fail_stale_jobs
+from pdf_engine.reaper import (
+    DEFAULT_BATCH_SIZE, prune_document_caches, prune_jobs, reap_expired,
+)
+from pdf_engine.uploads import reap_stale_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired shared files, abandoned uploads and old jobs, fail jobs "
+        "whose worker died, trim the document caches, and report the disk "
+        "space reclaimed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help="Rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only count the expired files.",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = SharedFile.objects.filter(expire_at__lt=timezone.now()).count()
+            self.stdout.write(f"{count} expired file(s)")
+            return
+
+        rows, freed = reap_expired(options["batch_size"])
+        self.stdout.write(f"Deleted {rows} expired file(s), reclaimed {freed / 1024 ** 2:.1f} MiB")
+        self.stdout.write(f"Removed {reap_stale_sessions()} abandoned upload session(s)")
+        files, size = prune_document_caches()
+        self.stdout.write(f"Pruned {files} cached document file(s), {size / 1024 ** 2:.1f} MiB")
+        self.stdout.write(f"Failed {fail_stale_jobs()} job(s) abandoned by their worker")
+        self.stdout.write(f"Deleted {prune_jobs(options['batch_size'])} old job(s)")
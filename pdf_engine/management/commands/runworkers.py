@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from multiprocessing.connection import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from pdf_engine.core import config
+from pdf_engine.core.conversions import load_converters
+from pdf_engine.core.extraction import start_pool, stop_pool
+from pdf_engine.core.office import start_server, stop_server
+from pdf_engine.jobs import worker_loop
+from pdf_engine.reaper import start_scheduler
+
+# A worker that dies (crash, OOM kill) is replaced after RESTART_DELAY
+# seconds, doubling up to MAX_RESTART_DELAY while replacements keep dying
+# young; one that ran for STABLE_AFTER seconds starts the delay over.
+# Each worker leads its own process group, so the table extractors it
+# forked are killed with it instead of being left behind.
+RESTART_DELAY = 1
+MAX_RESTART_DELAY = 60
+STABLE_AFTER = 60
+# The extractors inherit a dead worker's sentinel until they are gone, so
+# workers are also checked on this interval.
+WATCH_INTERVAL = 1
+
+
+def _stop_on_sigterm(stop):
+    pid = os.getpid()
+
+    def handler(signum, frame):
+        if os.getpid() == pid:
+            stop.set()
+        else:
+            # A pool process forked by this worker: exit as it normally would.
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    signal.signal(signal.SIGTERM, handler)
+
+
+def _work(poll_interval):
+    # terminate() asks the worker to stop: it finishes the job in hand, then
+    # leaves through `finally` so LibreOffice and the table extractors go
+    # down too. In its own process group, the worker doesn't get the
+    # terminal's Ctrl-C; the parent handles that and terminates it.
+    os.setpgrp()
+    stop = threading.Event()
+    _stop_on_sigterm(stop)
+    try:
+        start_pool()
+        start_server()
+        worker_loop(poll_interval=poll_interval, stop=stop)
+    finally:
+        stop_server()
+        stop_pool()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class Worker:
+    """One slot of the pool: its current process and restart backoff."""
+
+    def __init__(self, poll_interval):
+        self.poll_interval = poll_interval
+        self.process = None
+        self.started_at = 0
+        self.delay = RESTART_DELAY
+        self.restart_at = None
+
+    def start(self):
+        self.process = multiprocessing.Process(target=_work, args=(self.poll_interval,))
+        self.process.start()
+        self.started_at = time.monotonic()
+        self.restart_at = None
+
+    def died(self, now):
+        """Schedule a replacement for a dead process; returns its delay."""
+        self.process.join()
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        if now - self.started_at >= STABLE_AFTER:
+            self.delay = RESTART_DELAY
+        delay = self.delay
+        self.delay = min(self.delay * 2, MAX_RESTART_DELAY)
+        self.restart_at = now + delay
+        return delay
+
+
+class Command(BaseCommand):
+    help = "Run a pool of local worker processes for queued conversion jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 1,
+            help="Number of worker processes (default: CPU count).",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--reap-interval", type=float,
+            default=getattr(settings, "SHARED_FILE_REAP_INTERVAL", 0),
+            help="Seconds between expired file sweeps (0 disables).",
+        )
+
+    def handle(self, *args, **options):
+        # Children must open their own DB connections.
+        connections.close_all()
+        # Import the conversion backends once; forked workers inherit them.
+        load_converters()
+        if not getattr(settings, "RENDER_WORKERS", 0):
+            # Every worker may render at once: split the cores between them.
+            config.configure(
+                RENDER_WORKERS=max(1, (os.cpu_count() or 1) // options["processes"])
+            )
+
+        workers = [Worker(options["poll_interval"]) for _ in range(options["processes"])]
+        for w in workers:
+            w.start()
+
+        self.stdout.write(f"Started {len(workers)} conversion worker(s)")
+        # Stopping the command (SIGTERM) stops the workers like Ctrl-C does.
+        signal.signal(signal.SIGTERM, _interrupt)
+
+        if options["reap_interval"] > 0:
+            start_scheduler(options["reap_interval"])
+            self.stdout.write(f"Reaping expired files every {options['reap_interval']:g}s")
+
+        try:
+            self.supervise(workers)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping: waiting for running jobs to finish")
+            running = [w.process for w in workers if w.restart_at is None]
+            for process in running:
+                process.terminate()
+            for process in running:
+                process.join()
+
+    def supervise(self, workers):
+        """Replace workers that die until the command is stopped.
+
+        Their jobs stay `running` until the stale-job sweep fails them.
+        """
+        while True:
+            now = time.monotonic()
+            for w in workers:
+                if w.restart_at is None and not w.process.is_alive():
+                    delay = w.died(now)
+                    self.stderr.write(
+                        f"Worker {w.process.pid} exited with code {w.process.exitcode}; "
+                        f"restarting in {delay:g}s"
+                    )
+                elif w.restart_at is not None and now >= w.restart_at:
+                    w.start()
+
+            pending = [w.restart_at - now for w in workers if w.restart_at is not None]
+            alive = [w.process.sentinel for w in workers if w.restart_at is None]
+            # Wake up when a worker exits or a replacement is due.
+            wait(alive, timeout=max(min(pending + [WATCH_INTERVAL]), 0))
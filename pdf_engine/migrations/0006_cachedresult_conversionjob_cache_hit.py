@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+import django.utils.timezone
+import pdf_engine.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_engine', '0005_conversionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('operation', models.CharField(max_length=32)),
+                ('file', models.FileField(max_length=255, upload_to=pdf_engine.models.upload_to_cache)),
+                ('size', models.BigIntegerField(default=0)),
+                ('compute_seconds', models.FloatField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='conversionjob',
+            name='cache_hit',
+            field=models.BooleanField(default=False),
+        ),
+    ]
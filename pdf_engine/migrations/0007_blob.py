@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def clear_cache(apps, schema_editor):
+    # Cache entries pointed at plain files; they are rebuilt on demand.
+    apps.get_model('pdf_engine', 'CachedResult').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_engine', '0006_cachedresult_conversionjob_cache_hit'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_cache, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='')),
+                ('size', models.BigIntegerField(default=0)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='cachedresult',
+            name='file',
+        ),
+        migrations.AddField(
+            model_name='sharedfile',
+            name='filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='sharedfile',
+            name='file',
+            field=models.FileField(max_length=255, upload_to='shared/'),
+        ),
+        migrations.AddField(
+            model_name='cachedresult',
+            name='blob',
+            field=models.ForeignKey(default=None, on_delete=django.db.models.deletion.PROTECT, to='pdf_engine.blob'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='sharedfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='pdf_engine.blob'),
+        ),
+    ]
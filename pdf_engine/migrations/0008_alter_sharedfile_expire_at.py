@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_engine', '0007_blob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sharedfile',
+            name='expire_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
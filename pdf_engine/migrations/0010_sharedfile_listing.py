@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:10
+
+import mimetypes
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_listing_fields(apps, schema_editor):
+    SharedFile = apps.get_model("pdf_engine", "SharedFile")
+    for shared in SharedFile.objects.select_related("blob").iterator():
+        name = shared.filename or os.path.basename(shared.file.name)
+        shared.content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if shared.blob is not None:
+            shared.size = shared.blob.size
+        else:
+            try:
+                shared.size = shared.file.size
+            except OSError:
+                pass
+        shared.save(update_fields=["size", "content_type"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_engine', '0009_uploadsession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharedfile',
+            name='content_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='sharedfile',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='sharedfile',
+            name='size',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='sharedfile',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='sharedfile_user_created'),
+        ),
+        migrations.RunPython(fill_listing_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_output_bytes(apps, schema_editor):
+    # Jobs whose result is still around; the others are already lost.
+    ConversionJob = apps.get_model('pdf_engine', 'ConversionJob')
+    SharedFile = apps.get_model('pdf_engine', 'SharedFile')
+    ConversionJob.objects.filter(result__isnull=False).update(
+        output_bytes=Subquery(
+            SharedFile.objects.filter(pk=OuterRef('result_id')).values('size')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_engine', '0011_conversionjob_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversionjob',
+            name='output_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_output_bytes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pdf_engine', '0012_conversionjob_output_bytes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversionjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(max_length=32)),
+                ('status', models.CharField(max_length=10)),
+                ('jobs', models.BigIntegerField(default=0)),
+                ('cache_hits', models.BigIntegerField(default=0)),
+                ('cpu_time', models.FloatField(default=0)),
+                ('input_bytes', models.BigIntegerField(default=0)),
+                ('output_bytes', models.BigIntegerField(default=0)),
+                ('pages', models.BigIntegerField(default=0)),
+                ('peak_rss', models.BigIntegerField(default=0)),
+                ('wall_count', models.BigIntegerField(default=0)),
+                ('wall_time', models.FloatField(default=0)),
+                ('wall_buckets', models.JSONField(default=list)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('operation', 'status'), name='unique_job_totals')],
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+import os
+
 from django.db import models
 from django.contrib.auth.models import User
 import uuid
@@ -19,12 +21,158 @@ from django.utils import timezone
 from datetime import timedelta
 import uuid
 
+def blob_path(sha256):
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+class Blob(models.Model):
+    """A stored file, kept once per content hash and shared by reference."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    size = models.BigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.refcount} refs)"
+
+
 class SharedFile(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="shared/")
+    file = models.FileField(upload_to="shared/", max_length=255)
+    blob = models.ForeignKey(Blob, null=True, blank=True, on_delete=models.PROTECT)
+    filename = models.CharField(max_length=255, blank=True)
+    # Stored on creation so listings never have to touch storage.
+    original_name = models.CharField(max_length=255, blank=True)
+    size = models.BigIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True)
     token = models.UUIDField(default=uuid.uuid4, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    expire_at = models.DateTimeField()
+    expire_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        indexes = [
+            # Per-user listings, newest first (see views.documents_page).
+            models.Index(fields=["user", "-created_at", "-id"], name="sharedfile_user_created"),
+        ]
 
     def is_expired(self):
         return timezone.now() > self.expire_at
+
+
+class ConversionJob(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    operation = models.CharField(max_length=32)
+    options = models.JSONField(default=dict, blank=True)
+    inputs = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    error = models.TextField(blank=True)
+    cache_hit = models.BooleanField(default=False)
+    result = models.ForeignKey(
+        SharedFile, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Touched by the worker while the job runs (see jobs.heartbeat).
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    # Filled in by run_job (see metrics.py); stages maps step -> seconds.
+    input_bytes = models.BigIntegerField(default=0)
+    # Kept on the row: the result itself may be deleted or reaped later.
+    output_bytes = models.BigIntegerField(default=0)
+    pages = models.IntegerField(null=True, blank=True)
+    wall_time = models.FloatField(null=True, blank=True)
+    cpu_time = models.FloatField(null=True, blank=True)
+    peak_rss = models.BigIntegerField(null=True, blank=True)
+    stages = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def input_size(self):
+        return sum(item.get("size", 0) for item in self.inputs)
+
+    def __str__(self):
+        return f"{self.operation} ({self.status})"
+
+
+class JobTotals(models.Model):
+    """Counters of finished jobs whose rows were pruned, per operation and
+    status, so the /metrics totals never go back (see reaper.prune_jobs)."""
+    operation = models.CharField(max_length=32)
+    status = models.CharField(max_length=10)
+    jobs = models.BigIntegerField(default=0)
+    cache_hits = models.BigIntegerField(default=0)
+    cpu_time = models.FloatField(default=0)
+    input_bytes = models.BigIntegerField(default=0)
+    output_bytes = models.BigIntegerField(default=0)
+    pages = models.BigIntegerField(default=0)
+    peak_rss = models.BigIntegerField(default=0)
+    wall_count = models.BigIntegerField(default=0)
+    wall_time = models.FloatField(default=0)
+    # Jobs at or under each of jobs.WALL_TIME_BUCKETS.
+    wall_buckets = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["operation", "status"], name="unique_job_totals"),
+        ]
+
+    def __str__(self):
+        return f"{self.operation} {self.status}: {self.jobs}"
+
+
+class UploadSession(models.Model):
+    """A file uploaded in chunks, assembled on disk until a job uses it."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    complete = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @property
+    def name(self):
+        # Lets a finished session stand in for an uploaded file.
+        return self.filename
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+def upload_to_cache(instance, filename):
+    ext = os.path.splitext(filename)[1]
+    return f"cache/{instance.key[:2]}/{instance.key}{ext}"
+
+
+class CachedResult(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    operation = models.CharField(max_length=32)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT)
+    size = models.BigIntegerField(default=0)
+    compute_seconds = models.FloatField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.operation} {self.key[:12]}"
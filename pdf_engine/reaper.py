@@ -0,0 +1,136 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .core import config, filecache
+from .jobs import add_totals, fail_stale_jobs, job_totals
+from .models import Blob, ConversionJob, SharedFile
+from .uploads import reap_stale_sessions
+
+# Removal of expired SharedFiles. Rows are found through the expire_at index
+# and deleted a batch at a time, each batch in its own transaction; the
+# post_delete signal releases their blobs, which removes the file once the
+# last reference is gone. Abandoned chunked upload sessions are swept at the
+# same time, and the document analysis and OCR caches are trimmed to their
+# age and size limits.
+#
+# Jobs are swept too: running jobs whose worker died are failed, and
+# finished jobs older than CONVERSION_JOB_RETENTION_DAYS are deleted after
+# their counters are added to JobTotals, which keeps the jobs table (and
+# /metrics' queries over it) small.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+DOCUMENT_CACHE_MAX_AGE = getattr(settings, "DOCUMENT_CACHE_MAX_AGE", 24 * 60 * 60)
+DOCUMENT_CACHE_MAX_BYTES = getattr(settings, "DOCUMENT_CACHE_MAX_BYTES", 256 * 1024 ** 2)
+JOB_RETENTION_DAYS = getattr(settings, "CONVERSION_JOB_RETENTION_DAYS", 30)
+
+
+def reap_batch(now, batch_size=DEFAULT_BATCH_SIZE):
+    """Delete up to `batch_size` expired files. Returns (rows, bytes freed)."""
+    with transaction.atomic():
+        expired = list(
+            SharedFile.objects.filter(expire_at__lt=now)
+            .select_related("blob")
+            .order_by("expire_at")[:batch_size]
+        )
+        if not expired:
+            return 0, 0
+
+        blobs = {s.blob_id: s.blob.size for s in expired if s.blob_id}
+        legacy = 0
+        for s in expired:
+            if not s.blob_id and s.file and default_storage.exists(s.file.name):
+                legacy += default_storage.size(s.file.name)
+
+        SharedFile.objects.filter(pk__in=[s.pk for s in expired]).delete()
+
+        # Blobs still shared by live files or the cache don't free anything.
+        remaining = set(Blob.objects.filter(pk__in=blobs).values_list("pk", flat=True))
+        freed = legacy + sum(size for pk, size in blobs.items() if pk not in remaining)
+
+    return len(expired), freed
+
+
+def reap_expired(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Delete every file expired at `now`. Returns (rows, bytes freed)."""
+    now = now or timezone.now()
+    rows = freed = 0
+
+    while True:
+        count, size = reap_batch(now, batch_size)
+        rows += count
+        freed += size
+        if count < batch_size:
+            return rows, freed
+
+
+def prune_jobs(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Delete jobs finished before the retention period. Returns the count."""
+    cutoff = (now or timezone.now()) - timedelta(days=JOB_RETENTION_DAYS)
+    deleted = 0
+
+    while True:
+        with transaction.atomic():
+            pks = list(
+                ConversionJob.objects.filter(finished_at__lt=cutoff)
+                .order_by("finished_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            batch = ConversionJob.objects.filter(pk__in=pks)
+            for row in job_totals(batch):
+                add_totals(row)
+            batch.delete()
+        deleted += len(pks)
+        if len(pks) < batch_size:
+            return deleted
+
+
+def prune_document_caches(now=None):
+    """Trim the analysis and OCR caches. Returns (files removed, bytes freed)."""
+    removed = freed = 0
+    # The directories the engines write to, as configured by the app.
+    for directory in (config.ANALYSIS_DIR, config.OCR_CACHE_DIR):
+        files, size = filecache.prune(
+            directory, DOCUMENT_CACHE_MAX_BYTES, DOCUMENT_CACHE_MAX_AGE, now
+        )
+        removed += files
+        freed += size
+    return removed, freed
+
+
+def start_scheduler(interval, batch_size=DEFAULT_BATCH_SIZE):
+    """Run reap_expired every `interval` seconds in a daemon thread."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                close_old_connections()
+                rows, freed = reap_expired(batch_size)
+                if rows:
+                    logger.info("Reaped %d expired file(s), %d bytes freed", rows, freed)
+                sessions = reap_stale_sessions()
+                if sessions:
+                    logger.info("Removed %d abandoned upload session(s)", sessions)
+                files, size = prune_document_caches()
+                if files:
+                    logger.info("Pruned %d cached document file(s), %d bytes", files, size)
+                stale = fail_stale_jobs()
+                if stale:
+                    logger.warning("Failed %d job(s) abandoned by their worker", stale)
+                jobs = prune_jobs(batch_size)
+                if jobs:
+                    logger.info("Deleted %d old job(s)", jobs)
+            except Exception:
+                logger.exception("Expired file reaper failed")
+
+    threading.Thread(target=run, name="shared-file-reaper", daemon=True).start()
+    return stop
@@ -0,0 +1,39 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import SharedFile, CachedResult, UploadSession
+from .storage import release_blob
+from .uploads import session_path
+
+
+@receiver(post_delete, sender=SharedFile)
+def release_shared_file(sender, instance, **kwargs):
+    if instance.blob_id:
+        release_blob(instance.blob)
+    elif instance.file and not SharedFile.objects.filter(file=instance.file.name).exists():
+        # Files stored before blobs existed are owned by their rows.
+        name = instance.file.name
+        transaction.on_commit(lambda: default_storage.delete(name))
+
+
+@receiver(post_delete, sender=CachedResult)
+def release_cached_result(sender, instance, **kwargs):
+    release_blob(instance.blob)
+
+
+@receiver(post_delete, sender=UploadSession)
+def remove_upload_session(sender, instance, **kwargs):
+    path = session_path(instance)
+
+    def remove():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Sessions handed to a job have already been moved out of place.
+            pass
+
+    transaction.on_commit(remove)
@@ -0,0 +1,139 @@
+import hashlib
+import mimetypes
+import os
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Blob, SharedFile, blob_path
+
+# Content-addressed storage for results. Every distinct file is written once
+# under blobs/<aa>/<bb>/<sha256>; SharedFiles and cache entries hold a
+# counted reference to it, and the file is removed when the last reference
+# goes away (see signals.py).
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def place_file(path, name):
+    """Put the file at `path` into storage as `name`.
+
+    On local storage the file is hard-linked into place, so a finished result
+    isn't copied a second time; other backends get a regular save. A linked
+    file gets FILE_UPLOAD_PERMISSIONS like a saved one: it may be a staged
+    upload, which Django creates readable by its owner only.
+    """
+    if isinstance(default_storage, FileSystemStorage):
+        dest = default_storage.path(name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            os.link(path, dest)
+            if default_storage.file_permissions_mode is not None:
+                os.chmod(dest, default_storage.file_permissions_mode)
+            return
+        except FileExistsError:
+            return
+        except OSError:
+            # Different filesystem: fall back to copying.
+            pass
+
+    with open(path, "rb") as f:
+        saved = default_storage.save(name, File(f))
+    if saved != name:
+        # Someone else wrote the same content meanwhile.
+        default_storage.delete(saved)
+
+
+def acquire_blob(blob):
+    Blob.objects.filter(pk=blob.pk).update(refcount=F("refcount") + 1)
+
+
+def release_blob(blob):
+    """Drop one reference and delete the blob once nothing uses it."""
+    with transaction.atomic():
+        Blob.objects.filter(pk=blob.pk).update(refcount=F("refcount") - 1)
+        deleted, _ = Blob.objects.filter(pk=blob.pk, refcount=0).delete()
+
+        # Only touch the disk once the surrounding transaction has committed.
+        if deleted:
+            name = blob.file.name
+            transaction.on_commit(lambda: default_storage.delete(name))
+
+
+def store_blob(path):
+    """Store the file at `path` (unless already known) and return its blob.
+
+    The caller owns one reference on the returned blob.
+    """
+    sha256 = hash_file(path)
+    name = blob_path(sha256)
+
+    while True:
+        with transaction.atomic():
+            updated = Blob.objects.filter(sha256=sha256).update(
+                refcount=F("refcount") + 1
+            )
+            if updated:
+                blob = Blob.objects.get(sha256=sha256)
+                break
+
+        if not default_storage.exists(name):
+            place_file(path, name)
+
+        try:
+            with transaction.atomic():
+                blob = Blob.objects.create(
+                    sha256=sha256,
+                    file=name,
+                    size=default_storage.size(name),
+                    refcount=1,
+                )
+            break
+        except IntegrityError:
+            # Lost the race to create the row; take a reference on the winner.
+            continue
+
+    # The file may have been removed by a release that raced with us.
+    if not default_storage.exists(name):
+        place_file(path, name)
+    return blob
+
+
+def guess_content_type(filename):
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def share_blob(user, blob, filename, days, original_name=""):
+    """Create a SharedFile referencing `blob` without copying it."""
+    acquire_blob(blob)
+    return SharedFile.objects.create(
+        user=user,
+        file=blob.file.name,
+        blob=blob,
+        filename=filename,
+        original_name=original_name,
+        size=blob.size,
+        content_type=guess_content_type(filename),
+        expire_at=timezone.now() + timedelta(days=days),
+    )
+
+
+def create_shared_file(user, file_path, filename, days, original_name=""):
+    """Create a SharedFile entry for download or sharing."""
+    blob = store_blob(file_path)
+    try:
+        return share_blob(user, blob, filename, days, original_name)
+    finally:
+        release_blob(blob)
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from pdf_engine import jobs, uploads
+from pdf_engine.core import config
+
+
+class TempDirsMixin:
+    """Media, job, upload and engine cache directories under a fresh temp
+    dir per test."""
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+        media = override_settings(MEDIA_ROOT=os.path.join(self.tmp, "media"))
+        media.enable()
+        self.addCleanup(media.disable)
+
+        # Read once at import, like the settings they come from; the engine
+        # settings are read at call time.
+        for module, name, directory in (
+            (jobs, "JOB_DIR", "jobs"),
+            (uploads, "UPLOAD_DIR", "uploads"),
+            (config, "ANALYSIS_DIR", "analysis"),
+            (config, "OCR_CACHE_DIR", "ocr"),
+        ):
+            patcher = mock.patch.object(module, name, os.path.join(self.tmp, directory))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user("alice")
+        self.client.force_login(self.user)
+
+    def make_file(self, content, name="in.pdf"):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
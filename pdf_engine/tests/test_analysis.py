@@ -0,0 +1,70 @@
+import os
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from PyPDF2 import PdfWriter
+
+from pdf_engine import jobs
+from pdf_engine.core import config, filecache, rendering
+from pdf_engine.core.analysis import DocumentAnalysis
+
+from .base import TempDirsMixin
+
+KNOWN = "ab" * 32
+
+
+class DocumentAnalysisTests(TempDirsMixin, TestCase):
+    def make_pdf(self, pages=3, password=None):
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(72, 72)
+        if password:
+            writer.encrypt(password)
+        path = os.path.join(self.tmp, "in.pdf")
+        with open(path, "wb") as f:
+            writer.write(f)
+        return path
+
+    def stored(self):
+        return sorted(name for _, _, names in os.walk(config.ANALYSIS_DIR) for name in names)
+
+    def test_known_hash_is_used_as_the_key(self):
+        path = self.make_pdf()
+        with filecache.known_hashes({path: KNOWN}):
+            with DocumentAnalysis(path) as analysis:
+                self.assertEqual(analysis.sha256, KNOWN)
+                self.assertEqual(analysis.page_count, 3)
+        self.assertEqual(self.stored(), [f"{KNOWN}.json"])
+
+    def test_unknown_files_are_hashed(self):
+        path = self.make_pdf()
+        with DocumentAnalysis(path) as analysis:
+            sha256 = analysis.sha256
+        self.assertNotEqual(sha256, KNOWN)
+        self.assertEqual(self.stored(), [f"{sha256}.json"])
+
+    def test_page_count_skips_the_analysis(self):
+        path = self.make_pdf(pages=5)
+        self.assertEqual(rendering.page_count(path), 5)
+        self.assertEqual(self.stored(), [])
+
+    def test_page_count_checks_the_password(self):
+        path = self.make_pdf(pages=2, password="secret")
+        self.assertEqual(rendering.page_count(path, "secret"), 2)
+        with self.assertRaises(ValueError):
+            rendering.page_count(path, "wrong")
+
+    def test_jobs_hand_their_hashes_to_the_engines(self):
+        seen = []
+
+        def convert(operation, paths, output_path, **options):
+            seen.append(filecache.file_sha256(paths[0]))
+            with open(output_path, "wb") as f:
+                f.write(b"out")
+
+        upload = SimpleUploadedFile("in.pdf", b"%PDF-1.4", content_type="application/pdf")
+        job = jobs.enqueue_job(self.user, "pdf_to_word", [upload])
+        with mock.patch.object(jobs, "run_operation", side_effect=convert):
+            jobs.run_job(jobs.claim_next_job())
+        self.assertEqual(seen, [job.inputs[0]["sha256"]])
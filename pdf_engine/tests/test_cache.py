@@ -0,0 +1,113 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.utils import timezone
+
+from pdf_engine import cache, jobs
+from pdf_engine.models import Blob, CachedResult, ConversionJob
+from pdf_engine.storage import release_blob, share_blob, store_blob
+
+from .base import TempDirsMixin
+from .test_jobs import write_output
+
+
+class ResultKeyTests(TestCase):
+    def test_key_covers_operation_inputs_and_options(self):
+        key = cache.result_key("compress", ["a", "b"], {"level": "less", "dpi": 72})
+        self.assertEqual(key, cache.result_key("compress", ["a", "b"], {"dpi": 72, "level": "less"}))
+        self.assertNotEqual(key, cache.result_key("compress", ["b", "a"], {"level": "less", "dpi": 72}))
+        self.assertNotEqual(key, cache.result_key("merge", ["a", "b"], {"level": "less", "dpi": 72}))
+        self.assertNotEqual(key, cache.result_key("compress", ["a", "b"], {"level": "extreme", "dpi": 72}))
+
+    def test_password_jobs_are_not_cacheable(self):
+        self.assertTrue(cache.cacheable({"compression_level": "less"}))
+        self.assertTrue(cache.cacheable({"password": None}))
+        self.assertFalse(cache.cacheable({"password": "secret"}))
+        with mock.patch.object(cache, "MAX_BYTES", 0):
+            self.assertFalse(cache.cacheable({}))
+
+
+class ResultCacheTests(TempDirsMixin, TestCase):
+    def cached_blob(self, key, content=b"result"):
+        blob = store_blob(self.make_file(content))
+        cache.store(key, "compress", blob, 2.0)
+        release_blob(blob)
+        return blob
+
+    def refcount(self, blob):
+        return Blob.objects.get(pk=blob.pk).refcount
+
+    def test_lookup_counts_hits_and_takes_a_reference(self):
+        self.assertIsNone(cache.lookup("missing"))
+        blob = self.cached_blob("k1")
+
+        cached = cache.lookup("k1")
+        self.assertEqual(cached.blob_id, blob.pk)
+        self.assertEqual(CachedResult.objects.get(key="k1").hits, 1)
+        self.assertEqual(self.refcount(blob), 2)
+
+    def test_hit_survives_eviction_before_sharing(self):
+        self.cached_blob("k1")
+        cached = cache.lookup("k1")
+
+        # Evicted between the lookup and the share.
+        with self.captureOnCommitCallbacks(execute=True):
+            cache.evict(max_bytes=0)
+        shared = share_blob(self.user, cached.blob, "out.pdf", 1)
+        release_blob(cached.blob)
+
+        self.assertEqual(self.refcount(cached.blob), 1)
+        self.assertTrue(default_storage.exists(shared.file.name))
+
+    def test_store_keeps_the_first_result(self):
+        first = self.cached_blob("k1", b"first")
+        second = store_blob(self.make_file(b"second"))
+        cached = cache.store("k1", "compress", second, 1.0)
+
+        self.assertEqual(cached.blob_id, first.pk)
+        self.assertEqual(self.refcount(second), 1)
+
+    def test_evict_drops_least_recently_used(self):
+        for i, key in enumerate(("old", "new", "newest")):
+            self.cached_blob(key, b"x" * 10 + key.encode())
+            CachedResult.objects.filter(key=key).update(
+                last_used_at=timezone.now() - timedelta(hours=3 - i)
+            )
+        cache.lookup("old")  # now the most recently used
+
+        sizes = dict(CachedResult.objects.values_list("key", "size"))
+        evicted = cache.evict(max_bytes=sizes["old"] + sizes["newest"])
+        self.assertEqual(evicted, 1)
+        self.assertEqual(
+            set(CachedResult.objects.values_list("key", flat=True)), {"old", "newest"}
+        )
+
+
+@mock.patch.object(jobs, "run_operation", side_effect=write_output)
+class CachedJobTests(TempDirsMixin, TestCase):
+    def run_once(self, **options):
+        upload = SimpleUploadedFile("in.pdf", b"%PDF-1.4 same", content_type="application/pdf")
+        job = jobs.enqueue_job(self.user, "compress", [upload], **options)
+        if job.status == ConversionJob.QUEUED:
+            job = jobs.run_job(jobs.claim_next_job())
+        return job
+
+    def test_repeated_job_is_answered_from_the_cache(self, run_operation):
+        first = self.run_once(compression_level="less")
+        second = self.run_once(compression_level="less")
+
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(second.result.blob_id, first.result.blob_id)
+        self.assertEqual(run_operation.call_count, 1)
+
+    def test_password_jobs_bypass_the_cache(self, run_operation):
+        self.run_once(password="secret")
+        second = self.run_once(password="secret")
+
+        self.assertFalse(second.cache_hit)
+        self.assertFalse(CachedResult.objects.exists())
+        self.assertEqual(run_operation.call_count, 2)
@@ -0,0 +1,108 @@
+import io
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from PyPDF2 import PdfReader, PdfWriter
+
+from pdf_engine.core import cli
+
+
+class CliTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.src = os.path.join(self.dir, "src")
+        self.out = os.path.join(self.dir, "out")
+
+    def make_pdf(self, relative, pages=1):
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(72, 72)
+        path = os.path.join(self.src, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            writer.write(f)
+        return path
+
+    def run_cli(self, operation, inputs, **kwargs):
+        out = io.StringIO()
+        kwargs.setdefault("workers", 1)
+        failed = cli.run(operation, inputs, self.out, out=out, **kwargs)
+        return failed, out.getvalue().splitlines()
+
+    def test_parse_options(self):
+        self.assertEqual(
+            cli.parse_options(["dpi=150", "pages=1-3", "page_ranges=[\"1\", null]"]),
+            {"dpi": 150, "pages": "1-3", "page_ranges": ["1", None]},
+        )
+        with self.assertRaises(ValueError):
+            cli.parse_options(["dpi"])
+
+    def test_bad_options_are_refused_up_front(self):
+        with self.assertRaises(ValueError):
+            self.run_cli("compress", [self.src], options={"dpi": 150})
+        with self.assertRaises(ValueError):
+            self.run_cli("teleport", [self.src])
+
+    def test_directories_keep_their_layout(self):
+        self.make_pdf("a.pdf")
+        self.make_pdf("sub/b.pdf")
+        self.make_pdf("notes.txt")
+
+        failed, lines = self.run_cli("compress", [self.src], recursive=True, workers=2)
+        self.assertEqual(failed, 0)
+        self.assertEqual(lines[-1], "2 converted, 0 skipped, 0 failed")
+        self.assertTrue(os.path.exists(os.path.join(self.out, "a.pdf")))
+        self.assertTrue(os.path.exists(os.path.join(self.out, "sub", "b.pdf")))
+
+        failed, lines = self.run_cli("compress", [self.src])
+        self.assertEqual(lines[-1], "1 converted, 0 skipped, 0 failed")
+
+    def test_skip_existing(self):
+        self.make_pdf("a.pdf")
+        self.make_pdf("b.pdf")
+        self.run_cli("compress", [os.path.join(self.src, "a.pdf")])
+
+        failed, lines = self.run_cli("compress", [self.src], skip_existing=True)
+        self.assertEqual(lines[0], f"skipped {os.path.join(self.src, 'a.pdf')}")
+        self.assertEqual(lines[-1], "1 converted, 1 skipped, 0 failed")
+
+    def test_failures_are_counted_and_leave_nothing_behind(self):
+        self.make_pdf("good.pdf")
+        bad = os.path.join(self.src, "bad.pdf")
+        with open(bad, "wb") as f:
+            f.write(b"not a pdf")
+
+        failed, lines = self.run_cli("compress", [self.src])
+        self.assertEqual(failed, 1)
+        self.assertTrue(any(line.startswith(f"failed  {bad}: ") for line in lines))
+        self.assertEqual(sorted(os.listdir(self.out)), ["good.pdf"])
+
+    def test_result_never_overwrites_its_input(self):
+        path = self.make_pdf("a.pdf")
+        out = io.StringIO()
+        failed = cli.run("compress", [path], self.src, workers=1, out=out)
+        self.assertEqual(failed, 1)
+        self.assertIn("would overwrite the input", out.getvalue())
+
+    def test_merge_combines_inputs_in_order(self):
+        first = self.make_pdf("1.pdf", pages=2)
+        second = self.make_pdf("2.pdf", pages=3)
+
+        failed, _ = self.run_cli("merge", [second, first])
+        self.assertEqual(failed, 0)
+        self.assertEqual(len(PdfReader(os.path.join(self.out, "merged.pdf")).pages), 5)
+
+    def test_management_command(self):
+        self.make_pdf("a.pdf")
+        out = io.StringIO()
+        call_command("convert", "compress", self.src, "-o", self.out, "--workers", "1", stdout=out)
+        self.assertIn("1 converted", out.getvalue())
+
+        with open(os.path.join(self.src, "bad.pdf"), "wb") as f:
+            f.write(b"not a pdf")
+        with self.assertRaises(CommandError):
+            call_command("convert", "compress", self.src, "-o", self.out, stdout=io.StringIO())
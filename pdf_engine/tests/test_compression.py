@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+from PIL import Image
+from PyPDF2 import PdfReader
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from pdf_engine.core.pdfops import compress_pdf
+
+
+def gradient(size):
+    """A smooth image: large as raw pixels, small as JPEG."""
+    image = Image.new("RGB", size)
+    image.putdata([(x % 256, y % 256, (x + y) % 256)
+                   for y in range(size[1]) for x in range(size[0])])
+    return image
+
+
+class CompressPdfTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def make_pdf(self, image=None):
+        path = os.path.join(self.dir, "in.pdf")
+        c = canvas.Canvas(path, pagesize=(144, 144))
+        c.drawString(10, 10, "Hello")
+        if image is not None:
+            c.drawImage(ImageReader(image), 0, 20, 144, 124)
+        c.save()
+        return path
+
+    def compress(self, path, level):
+        output = os.path.join(self.dir, f"out-{level}.pdf")
+        return compress_pdf([path], output, compression_level=level)
+
+    def images(self, path):
+        page = PdfReader(path).pages[0]
+        xobjects = page["/Resources"]["/XObject"]
+        return [xobjects[name].get_object() for name in xobjects]
+
+    def test_images_are_downsampled_to_the_level(self):
+        path = self.make_pdf(gradient((600, 600)))
+        output = self.compress(path, "extreme")
+
+        self.assertLess(os.path.getsize(output), os.path.getsize(path))
+        [image] = self.images(output)
+        self.assertEqual(image["/Filter"], "/DCTDecode")
+        # A 2-inch page at 72 DPI.
+        self.assertLessEqual(max(image["/Width"], image["/Height"]), 144)
+
+    def test_levels_keep_more_detail(self):
+        path = self.make_pdf(gradient((600, 600)))
+        sizes = [os.path.getsize(self.compress(path, level))
+                 for level in ("extreme", "recommended", "less")]
+        self.assertEqual(sizes, sorted(sizes))
+
+    def test_original_is_kept_when_nothing_shrinks(self):
+        # Already rewritten once, so a second pass can't win anything.
+        path = self.compress(self.make_pdf(), "less")
+        output = self.compress(path, "recommended")
+
+        # Handed back by linking the original, not by writing a copy.
+        self.assertTrue(os.path.samefile(output, path))
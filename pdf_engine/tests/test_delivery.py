@@ -0,0 +1,124 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pdf_engine import delivery
+from pdf_engine.models import SharedFile
+from pdf_engine.storage import create_shared_file
+
+from .base import TempDirsMixin
+
+
+@mock.patch.object(delivery, "DELIVERY", "sendfile")
+class DeliveryTests(TempDirsMixin, TestCase):
+    CONTENT = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.shared = create_shared_file(
+            self.user, self.make_file(self.CONTENT), "result.pdf", 1
+        )
+        self.url = reverse("download_pdf", args=[self.shared.token])
+        self.etag = f'"{self.shared.blob.sha256}"'
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_response(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(int(response["Content-Length"]), len(self.CONTENT))
+        self.assertEqual(self.body(response), self.CONTENT)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], self.etag)
+
+    def test_if_none_match_lists(self):
+        for header, status in (
+            (f'"other", {self.etag}', 304),
+            (f"W/{self.etag}", 304),
+            ("*", 304),
+            ('"other"', 200),
+            # Contains the ETag, but isn't it.
+            (f'"x{self.etag}"', 200),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, status)
+
+    def test_range(self):
+        for header, start, end in (
+            ("bytes=10-19", 10, 19),
+            ("bytes=1000-", 1000, 1023),
+            ("bytes=-24", 1000, 1023),
+            ("bytes=1000-5000", 1000, 1023),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/1024")
+                self.assertEqual(int(response["Content-Length"]), end - start + 1)
+                self.assertEqual(self.body(response), self.CONTENT[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        for header in ("bytes=1024-", "bytes=20-10"):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_malformed_range_sends_everything(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1,5-6")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.CONTENT)
+
+    def test_if_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.CONTENT)
+
+    def test_expired_share(self):
+        SharedFile.objects.filter(pk=self.shared.pk).update(
+            expire_at=timezone.now() - timedelta(minutes=1)
+        )
+        response = self.client.get(reverse("share_file", args=[self.shared.token]))
+        self.assertEqual(response.status_code, 410)
+
+
+class ProxyDeliveryTests(TempDirsMixin, TestCase):
+    def legacy_file(self, name, content=b"legacy"):
+        # Stored before blobs existed, under the uploaded file's own name.
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return SharedFile.objects.create(
+            user=self.user, file=name, filename=os.path.basename(name),
+            size=len(content), expire_at=timezone.now() + timedelta(days=1),
+        )
+
+    def test_accel_redirect_quotes_the_name(self):
+        shared = self.legacy_file("shared/1/my report 100%?é.pdf")
+        with mock.patch.object(delivery, "DELIVERY", "x-accel-redirect"):
+            response = self.client.get(reverse("download_pdf", args=[shared.token]))
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected/shared/1/my%20report%20100%25%3F%C3%A9.pdf"
+        )
+
+    def test_sendfile_header_quotes_the_path(self):
+        shared = self.legacy_file("shared/1/a b.pdf")
+        with mock.patch.object(delivery, "DELIVERY", "x-sendfile"):
+            response = self.client.get(reverse("download_pdf", args=[shared.token]))
+        self.assertTrue(response["X-Sendfile"].endswith("/shared/1/a%20b.pdf"))
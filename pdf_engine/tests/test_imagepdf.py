@@ -0,0 +1,75 @@
+import os
+import tempfile
+import zlib
+
+from django.test import SimpleTestCase
+from PIL import Image
+from PyPDF2 import PdfReader
+
+from pdf_engine.core.imagepdf import EXIF_ORIENTATION, images_to_pdf
+
+
+class ImagesToPdfTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def save(self, image, name, orientation=None, **params):
+        path = os.path.join(self.dir, name)
+        if orientation is not None:
+            exif = Image.Exif()
+            exif[EXIF_ORIENTATION] = orientation
+            params["exif"] = exif
+        image.save(path, **params)
+        return path
+
+    def convert(self, path, **options):
+        output = os.path.join(self.dir, "out.pdf")
+        images_to_pdf([path], output, **options)
+        page = PdfReader(output).pages[0]
+        return page, page["/Resources"]["/XObject"]["/Im0"].get_object()
+
+    def test_jpeg_is_embedded_untouched(self):
+        path = self.save(Image.new("RGB", (40, 20), "red"), "in.jpg")
+        page, image = self.convert(path, page_size="auto")
+
+        with open(path, "rb") as f:
+            self.assertEqual(image._data, f.read())
+        self.assertEqual(image["/Filter"], "/DCTDecode")
+        self.assertEqual((page.mediabox.width, page.mediabox.height), (40, 20))
+
+    def test_exif_rotation_is_applied_while_drawing(self):
+        path = self.save(Image.new("RGB", (40, 20), "red"), "in.jpg", orientation=6)
+        page, image = self.convert(path, page_size="auto")
+
+        with open(path, "rb") as f:
+            self.assertEqual(image._data, f.read())
+        # Stored 40x20, shown 20x40.
+        self.assertEqual((image["/Width"], image["/Height"]), (40, 20))
+        self.assertEqual((page.mediabox.width, page.mediabox.height), (20, 40))
+        self.assertTrue(page.get_contents().get_data().startswith(b"q 0.0000 -40.0000 20.0000"))
+
+    def test_mirrored_jpeg_is_decoded_upright(self):
+        path = self.save(Image.new("RGB", (40, 20), "red"), "in.jpg", orientation=5)
+        page, image = self.convert(path, page_size="auto")
+
+        with open(path, "rb") as f:
+            self.assertNotEqual(image._data, f.read())
+        self.assertEqual((image["/Width"], image["/Height"]), (20, 40))
+
+    def test_large_jpeg_is_downscaled(self):
+        path = self.save(Image.new("RGB", (2000, 1000), "red"), "in.jpg")
+        _, image = self.convert(path, max_dpi=72)
+        # Fitted to the width of an A4 page at 72 DPI.
+        self.assertLessEqual(image["/Width"], 595)
+        self.assertEqual(image["/Filter"], "/DCTDecode")
+
+    def test_16_bit_grayscale_keeps_its_levels(self):
+        im = Image.new("I;16", (4, 1))
+        im.putdata([0, 256, 32768, 65535])
+        path = self.save(im, "in.png")
+        _, image = self.convert(path, page_size="auto")
+
+        self.assertEqual(image["/ColorSpace"], "/DeviceGray")
+        self.assertEqual(list(zlib.decompress(image._data)), [0, 1, 128, 255])
@@ -0,0 +1,152 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import DailyUsage
+from pdf_engine import jobs
+from pdf_engine.models import ConversionJob, JobTotals
+from pdf_engine.reaper import prune_jobs
+
+from .base import TempDirsMixin
+
+
+def write_output(operation, paths, output_path, **options):
+    with open(paths[0], "rb") as src, open(output_path, "wb") as f:
+        f.write(b"converted " + src.read())
+
+
+class JobQueueTests(TempDirsMixin, TestCase):
+    def enqueue(self, content=b"%PDF-1.4", operation="compress", **options):
+        upload = SimpleUploadedFile("in.pdf", content, content_type="application/pdf")
+        return jobs.enqueue_job(self.user, operation, [upload], **options)
+
+    def test_enqueue_stages_the_upload(self):
+        job = self.enqueue(b"%PDF-1.4 input", compression_level="less")
+
+        self.assertEqual(job.status, ConversionJob.QUEUED)
+        self.assertEqual(job.options, {"compression_level": "less"})
+        [item] = job.inputs
+        self.assertEqual(item["name"], "in.pdf")
+        self.assertEqual(item["size"], len(b"%PDF-1.4 input"))
+        with open(item["path"], "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4 input")
+        self.assertEqual(DailyUsage.total(self.user), 1)
+
+    def test_unknown_operation(self):
+        with self.assertRaises(ValueError):
+            self.enqueue(operation="teleport")
+        self.assertEqual(DailyUsage.total(self.user), 0)
+
+    def test_claim_takes_the_oldest_queued_job(self):
+        first, second = self.enqueue(b"1"), self.enqueue(b"2")
+
+        claimed = jobs.claim_next_job()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.status, ConversionJob.RUNNING)
+        self.assertIsNotNone(claimed.heartbeat_at)
+
+        self.assertEqual(jobs.claim_next_job().pk, second.pk)
+        self.assertIsNone(jobs.claim_next_job())
+
+    @mock.patch.object(jobs, "run_operation", side_effect=write_output)
+    def test_run_job_shares_the_result(self, run_operation):
+        self.enqueue(b"%PDF-1.4", password="secret")
+        job = jobs.run_job(jobs.claim_next_job())
+
+        self.assertEqual(job.status, ConversionJob.DONE)
+        self.assertEqual(job.result.size, len(b"converted %PDF-1.4"))
+        self.assertEqual(job.output_bytes, job.result.size)
+        self.assertNotIn("password", job.options)
+        self.assertIsNotNone(job.wall_time)
+        self.assertFalse(os.path.exists(jobs.job_dir(job)))
+        self.assertEqual(DailyUsage.total(self.user), 1)
+
+    @mock.patch.object(jobs, "run_operation", side_effect=ValueError("Invalid PDF password"))
+    def test_failed_job_gives_the_conversion_back(self, run_operation):
+        self.enqueue(password="wrong")
+        job = jobs.run_job(jobs.claim_next_job())
+
+        self.assertEqual(job.status, ConversionJob.FAILED)
+        self.assertEqual(job.error, "Invalid PDF password")
+        self.assertIsNone(job.result)
+        self.assertNotIn("password", job.options)
+        self.assertFalse(os.path.exists(jobs.job_dir(job)))
+        self.assertEqual(DailyUsage.total(self.user), 0)
+
+    @mock.patch.object(jobs, "run_operation", side_effect=KeyboardInterrupt)
+    def test_interrupted_job_is_recorded(self, run_operation):
+        self.enqueue()
+        job = jobs.claim_next_job()
+        with self.assertRaises(KeyboardInterrupt):
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ConversionJob.FAILED)
+        self.assertEqual(job.error, "The worker stopped before the job finished.")
+        self.assertEqual(DailyUsage.total(self.user), 0)
+
+    @mock.patch.object(jobs, "run_operation", side_effect=write_output)
+    def test_worker_loop_runs_queued_jobs(self, run_operation):
+        self.enqueue(b"1")
+        self.enqueue(b"2")
+        jobs.worker_loop(poll_interval=0, max_jobs=2)
+        self.assertEqual(
+            ConversionJob.objects.filter(status=ConversionJob.DONE).count(), 2
+        )
+
+    def test_stale_jobs_are_failed(self):
+        stale, fresh = self.enqueue(b"1"), self.enqueue(b"2")
+        jobs.claim_next_job()
+        jobs.claim_next_job()
+        ConversionJob.objects.filter(pk=stale.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=jobs.STALE_AFTER + 1)
+        )
+
+        self.assertEqual(jobs.fail_stale_jobs(), 1)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.status, ConversionJob.FAILED)
+        self.assertEqual(stale.error, "The worker stopped before the job finished.")
+        self.assertFalse(os.path.exists(jobs.job_dir(stale)))
+        self.assertEqual(fresh.status, ConversionJob.RUNNING)
+        self.assertTrue(os.path.exists(jobs.job_dir(fresh)))
+        self.assertEqual(DailyUsage.total(self.user), 1)
+
+        # A second sweep doesn't refund it again.
+        self.assertEqual(jobs.fail_stale_jobs(), 0)
+        self.assertEqual(DailyUsage.total(self.user), 1)
+
+
+class JobRetentionTests(TempDirsMixin, TestCase):
+    def finished_job(self, operation, status, days_ago, wall_time):
+        job = ConversionJob.objects.create(
+            user=self.user, operation=operation, status=status,
+            input_bytes=100, output_bytes=40, pages=2, cpu_time=0.5,
+            peak_rss=1000, wall_time=wall_time,
+        )
+        ConversionJob.objects.filter(pk=job.pk).update(
+            finished_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return job
+
+    def test_pruned_jobs_keep_their_totals(self):
+        self.finished_job("merge", ConversionJob.DONE, 90, 0.2)
+        self.finished_job("merge", ConversionJob.DONE, 60, 3)
+        self.finished_job("merge", ConversionJob.FAILED, 60, None)
+        recent = self.finished_job("merge", ConversionJob.DONE, 1, 0.05)
+        before = jobs.all_job_totals()
+
+        self.assertEqual(prune_jobs(batch_size=2), 3)
+        self.assertEqual(list(ConversionJob.objects.values_list("pk", flat=True)), [recent.pk])
+        self.assertEqual(JobTotals.objects.count(), 2)
+        self.assertEqual(jobs.all_job_totals(), before)
+
+        done = JobTotals.objects.get(operation="merge", status=ConversionJob.DONE)
+        self.assertEqual(done.jobs, 2)
+        self.assertEqual(done.wall_count, 2)
+        self.assertEqual(done.input_bytes, 200)
+        self.assertEqual(done.wall_buckets[:4], [0, 1, 1, 1])
@@ -0,0 +1,17 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from pdf_engine.storage import create_shared_file
+
+from .base import TempDirsMixin
+
+
+class DocumentsPageTests(TempDirsMixin, TestCase):
+    def test_crafted_cursors_fall_back_to_first_page(self):
+        create_shared_file(self.user, self.make_file(b"result"), "a.pdf", 1)
+        for cursor in ("junk", "1-2-3", f"{10 ** 30}-1", f"1-{2 ** 64}", "1-0"):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("my_documents"), {"before": cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context["is_first_page"])
+                self.assertEqual(len(response.context["files"]), 1)
@@ -0,0 +1,87 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pdf_engine.models import ConversionJob
+from pdf_engine.storage import create_shared_file
+
+from .base import TempDirsMixin
+
+
+class MetricsTests(TempDirsMixin, TestCase):
+    def job(self, operation, status, **fields):
+        return ConversionJob.objects.create(
+            user=self.user, operation=operation, status=status,
+            finished_at=timezone.now() if status in (ConversionJob.DONE, ConversionJob.FAILED) else None,
+            **fields,
+        )
+
+    def scrape(self, **headers):
+        return self.client.get(reverse("metrics"), **headers)
+
+    def samples(self, response):
+        return dict(
+            line.rsplit(" ", 1) for line in response.content.decode().splitlines()
+            if line and not line.startswith("#")
+        )
+
+    @override_settings(METRICS_TOKEN="")
+    def test_loopback_only_without_a_token(self):
+        self.assertEqual(self.scrape().status_code, 200)
+        self.assertEqual(self.scrape(REMOTE_ADDR="10.0.0.8").status_code, 403)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        response = self.scrape(HTTP_AUTHORIZATION="Bearer s3cret", REMOTE_ADDR="10.0.0.8")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(METRICS_TOKEN="")
+    def test_job_counters_and_queue(self):
+        self.job("merge", ConversionJob.DONE, wall_time=0.3, cpu_time=0.2, peak_rss=1000,
+                 input_bytes=300, output_bytes=100, pages=4,
+                 stages={"parse": 0.1, "convert": 0.2})
+        self.job("merge", ConversionJob.DONE, wall_time=4, cpu_time=1, peak_rss=5000,
+                 input_bytes=700, output_bytes=200, pages=6, cache_hit=True)
+        self.job("merge", ConversionJob.FAILED)
+        self.job("compress", ConversionJob.QUEUED)
+        self.job("compress", ConversionJob.RUNNING)
+
+        samples = self.samples(self.scrape())
+        self.assertEqual(samples['pdf_jobs_total{operation="merge",status="done"}'], "2")
+        self.assertEqual(samples['pdf_jobs_total{operation="merge",status="failed"}'], "1")
+        self.assertEqual(samples['pdf_job_cache_hits_total{operation="merge"}'], "1")
+        self.assertEqual(samples['pdf_job_wall_seconds_bucket{operation="merge",le="0.5"}'], "1")
+        self.assertEqual(samples['pdf_job_wall_seconds_bucket{operation="merge",le="5"}'], "2")
+        self.assertEqual(samples['pdf_job_wall_seconds_count{operation="merge"}'], "2")
+        self.assertEqual(samples['pdf_job_peak_rss_bytes{operation="merge"}'], "5000")
+        self.assertEqual(samples['pdf_job_input_bytes_total{operation="merge"}'], "1000")
+        self.assertEqual(samples['pdf_job_output_bytes_total{operation="merge"}'], "300")
+        self.assertEqual(samples['pdf_job_pages_total{operation="merge"}'], "10")
+        self.assertEqual(
+            samples['pdf_job_stage_seconds_last_hour{operation="merge",stage="parse"}'], "0.1"
+        )
+        self.assertEqual(samples["pdf_jobs_queued"], "1")
+        self.assertEqual(samples["pdf_jobs_running"], "1")
+
+
+class JobStatusTests(TempDirsMixin, TestCase):
+    def test_reports_the_recorded_sizes(self):
+        job = ConversionJob.objects.create(
+            user=self.user, operation="compress", status=ConversionJob.RUNNING,
+            inputs=[{"name": "in.pdf", "size": 300}], input_bytes=300,
+        )
+        url = reverse("job_status", args=[job.id])
+        data = self.client.get(url).json()
+        self.assertEqual((data["input_bytes"], data["output_bytes"]), (300, None))
+        self.assertIsNone(data["share_url"])
+
+        job.result = create_shared_file(self.user, self.make_file(b"result"), "out.pdf", 1)
+        job.status, job.output_bytes = ConversionJob.DONE, len(b"result")
+        job.save()
+        with self.assertNumQueries(3):  # session, user, job with its result
+            data = self.client.get(url).json()
+        self.assertEqual((data["input_bytes"], data["output_bytes"]), (300, 6))
+        self.assertEqual(data["share_url"], f"/share/{job.result.token}/")
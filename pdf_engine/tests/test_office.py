@@ -0,0 +1,35 @@
+import subprocess
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from pdf_engine.apps import PdfEngineConfig
+from pdf_engine.core import config, office
+
+
+class OfficeSettingsTests(SimpleTestCase):
+    def setUp(self):
+        names = ("WORD_TO_PDF_BACKEND", "OFFICE_SERVER_COMMAND", "SOFFICE_PATH",
+                 "OFFICE_TIMEOUT", "OFFICE_MAX_CONVERSIONS")
+        self.addCleanup(config.configure, **{name: getattr(config, name) for name in names})
+
+    @override_settings(WORD_TO_PDF_BACKEND="soffice", SOFFICE_PATH="/opt/lo/soffice",
+                       OFFICE_TIMEOUT=5)
+    def test_settings_reach_the_engine(self):
+        PdfEngineConfig.ready(mock.Mock())
+        self.assertEqual(office.backend(), "soffice")
+
+        with mock.patch.object(subprocess, "run", side_effect=OSError) as run:
+            with self.assertRaises(OSError):
+                office.convert_to_pdf("in.docx", "out.pdf")
+        self.assertEqual(run.call_args.args[0][0], "/opt/lo/soffice")
+        self.assertEqual(run.call_args.kwargs["timeout"], 5)
+
+    def test_auto_picks_the_first_installed_backend(self):
+        config.configure(WORD_TO_PDF_BACKEND="auto", OFFICE_SERVER_COMMAND="/opt/uno/unoserver -v",
+                         SOFFICE_PATH="soffice")
+        installed = {"soffice"}
+        with mock.patch.object(office.shutil, "which", side_effect=lambda c: c in installed or None):
+            self.assertEqual(office.backend(), "soffice")
+            installed.add("/opt/uno/unoserver")
+            self.assertEqual(office.backend(), "unoserver")
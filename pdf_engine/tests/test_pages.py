@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+
+from pdf_engine.core.pages import batches, parse_page_ranges
+
+
+class ParsePageRangesTests(SimpleTestCase):
+    def test_everything(self):
+        for spec in (None, "", "  ", "all", "ALL"):
+            self.assertEqual(parse_page_ranges(spec, 3), [1, 2, 3])
+
+    def test_ranges_keep_their_order(self):
+        self.assertEqual(parse_page_ranges("1-3, 5, 8-", 9), [1, 2, 3, 5, 8, 9])
+        self.assertEqual(parse_page_ranges("-2,, 4 - 3", 5), [1, 2, 4, 3])
+        self.assertEqual(parse_page_ranges("2,2", 2), [2, 2])
+        self.assertEqual(parse_page_ranges(3, 4), [3])
+
+    def test_invalid(self):
+        for spec in ("0", "4", "2-5", "a", "1-2-3", "-", ",", "1.5"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_page_ranges(spec, 3)
+
+    def test_batches(self):
+        self.assertEqual(batches([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(batches([], 2), [])
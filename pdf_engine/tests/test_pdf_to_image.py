@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from pdf_engine.core import config, rendering
+from pdf_engine.models import ConversionJob
+
+from .base import TempDirsMixin
+
+
+class PdfToImageViewTests(TempDirsMixin, TestCase):
+    def post(self, **data):
+        data.setdefault("image_format", "png")
+        data.setdefault("quality", "standard")
+        upload = SimpleUploadedFile("in.pdf", b"%PDF-1.4", content_type="application/pdf")
+        return self.client.post(reverse("pdf_to_image"), {"file": upload, **data})
+
+    def test_queues_a_job(self):
+        response = self.post(quality="print")
+        job = ConversionJob.objects.get()
+        self.assertRedirects(response, reverse("job_detail", args=[job.id]),
+                             fetch_redirect_response=False)
+        self.assertEqual(job.options, {"dpi": 300, "image_format": "png"})
+
+    def test_invalid_options_are_reported(self):
+        response = self.post(quality="ultra")
+        self.assertRedirects(response, reverse("pdf_to_image"))
+        self.assertEqual(
+            [str(m) for m in get_messages(response.wsgi_request)],
+            ["Resolution: Select a valid choice. ultra is not one of the available choices."],
+        )
+        self.assertFalse(ConversionJob.objects.exists())
+
+
+class RenderWorkersTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(config.configure, RENDER_WORKERS=config.RENDER_WORKERS)
+
+    def test_pdf_to_image_uses_the_configured_pool_size(self):
+        config.configure(RENDER_WORKERS=3)
+        with mock.patch.object(rendering, "render_to_zip") as render_to_zip:
+            rendering.pdf_to_image(["in.pdf"], "out.zip")
+        self.assertEqual(render_to_zip.call_args.kwargs["workers"], 3)
+
+    def test_unknown_setting(self):
+        with self.assertRaises(TypeError):
+            config.configure(RENDER_THREADS=3)
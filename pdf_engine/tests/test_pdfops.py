@@ -0,0 +1,145 @@
+import io
+import os
+import tempfile
+import zipfile
+
+from django.test import SimpleTestCase
+from PIL import Image
+from PyPDF2 import PdfReader, PdfWriter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from pdf_engine.core.compression import Deduplicator
+from pdf_engine.core.pdfops import merge_pdfs, split_parts, split_pdf
+
+
+class PdfTestCase(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def make_pdf(self, pages, name="in.pdf", bookmarks=()):
+        """A PDF whose page i (0-based) is 100 + i points wide."""
+        writer = PdfWriter()
+        for i in range(pages):
+            writer.add_blank_page(100 + i, 100)
+        parent = None
+        for title, page, nested in bookmarks:
+            item = writer.add_outline_item(title, page, parent=parent if nested else None)
+            if not nested:
+                parent = item
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            writer.write(f)
+        return path
+
+    def page_numbers(self, reader):
+        """1-based numbers of the source pages in `reader`, by page width."""
+        return [int(page.mediabox.width) - 99 for page in reader.pages]
+
+
+class SplitTests(PdfTestCase):
+    def parts(self, path, **options):
+        reader = PdfReader(path)
+        return [(name, [i + 1 for i in pages]) for name, pages in split_parts(reader, **options)]
+
+    def test_fixed_ranges(self):
+        path = self.make_pdf(7)
+        self.assertEqual(self.parts(path, split_mode="fixed", range_size=3), [
+            ("part_1.pdf", [1, 2, 3]), ("part_2.pdf", [4, 5, 6]), ("part_3.pdf", [7]),
+        ])
+
+    def test_custom_ranges(self):
+        path = self.make_pdf(6)
+        self.assertEqual(self.parts(path, split_mode="custom", custom_ranges="1-2, 5-,,3"), [
+            ("part_1.pdf", [1, 2]), ("part_2.pdf", [5, 6]), ("part_3.pdf", [3]),
+        ])
+        with self.assertRaises(ValueError):
+            self.parts(path, split_mode="custom", custom_ranges="4-9")
+
+    def test_bookmarks(self):
+        path = self.make_pdf(6, bookmarks=[
+            ("Intro: part/1", 1, False),
+            ("Detail", 2, True),  # nested: doesn't start a part
+            ("Appendix", 4, False),
+        ])
+        self.assertEqual(self.parts(path, split_mode="bookmarks"), [
+            ("part_1_start.pdf", [1]),
+            ("part_2_Intro part1.pdf", [2, 3, 4]),
+            ("part_3_Appendix.pdf", [5, 6]),
+        ])
+
+    def test_no_bookmarks(self):
+        with self.assertRaises(ValueError):
+            self.parts(self.make_pdf(2), split_mode="bookmarks")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.parts(self.make_pdf(2), split_mode="halves")
+
+    def test_split_pdf_writes_every_part_to_the_zip(self):
+        output = os.path.join(self.dir, "out.zip")
+        split_pdf([self.make_pdf(5)], output, split_mode="fixed", range_size=2)
+
+        with zipfile.ZipFile(output) as z:
+            self.assertEqual(z.namelist(), ["part_1.pdf", "part_2.pdf", "part_3.pdf"])
+            part = PdfReader(io.BytesIO(z.read("part_2.pdf")))
+        self.assertEqual(self.page_numbers(part), [3, 4])
+        self.assertFalse(os.path.exists(output + ".part"))
+
+
+class MergeTests(PdfTestCase):
+    def scan(self, name, pages=2):
+        """A PDF drawing the same image on every page."""
+        image = Image.frombytes("L", (64, 64), bytes(range(256)) * 16)
+        path = os.path.join(self.dir, name)
+        c = canvas.Canvas(path, pagesize=(100, 100))
+        for _ in range(pages):
+            c.drawImage(ImageReader(image), 0, 0, 100, 100)
+            c.showPage()
+        c.save()
+        return path
+
+    def image_ids(self, reader):
+        return [
+            xobject.idnum
+            for page in reader.pages
+            for xobject in page["/Resources"]["/XObject"].values()
+        ]
+
+    def test_page_ranges_select_pages_of_each_input(self):
+        first, second = self.make_pdf(4, "a.pdf"), self.make_pdf(3, "b.pdf")
+        output = os.path.join(self.dir, "out.pdf")
+        merge_pdfs([first, second, first], output, page_ranges=["3-2", None, "4,1,4"])
+
+        self.assertEqual(
+            self.page_numbers(PdfReader(output)), [3, 2, 1, 2, 3, 4, 1, 4]
+        )
+
+    def test_bad_page_range(self):
+        with self.assertRaises(ValueError):
+            merge_pdfs([self.make_pdf(2)], os.path.join(self.dir, "out.pdf"), ["3"])
+
+    def test_images_shared_between_inputs_are_stored_once(self):
+        first, second = self.scan("a.pdf"), self.scan("b.pdf")
+        output = os.path.join(self.dir, "out.pdf")
+        merge_pdfs([first, second], output)
+
+        ids = self.image_ids(PdfReader(output))
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(len(set(ids)), 1)
+        self.assertLess(os.path.getsize(output), os.path.getsize(first) + os.path.getsize(second))
+
+    def test_deduplicator_counts_what_it_collapsed(self):
+        readers = [PdfReader(self.scan("a.pdf")), PdfReader(self.scan("b.pdf", pages=1))]
+        dedupe = Deduplicator()
+        for reader in readers:
+            for page in reader.pages:
+                dedupe.dedupe_page(page)
+
+        # b.pdf's copy of the image now points at a.pdf's.
+        self.assertEqual(dedupe.stats["duplicates_removed"], 1)
+        self.assertEqual(
+            self.image_ids(readers[1]), [self.image_ids(readers[0])[0]]
+        )
@@ -0,0 +1,88 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from pdf_engine import reaper
+from pdf_engine.core import config, filecache
+from pdf_engine.models import Blob, SharedFile
+from pdf_engine.reaper import reap_batch, reap_expired
+from pdf_engine.storage import create_shared_file
+
+from .base import TempDirsMixin
+
+
+class ReaperTests(TempDirsMixin, TestCase):
+    def shared(self, content, expired_minutes_ago=None):
+        shared = create_shared_file(self.user, self.make_file(content), "out.pdf", 1)
+        if expired_minutes_ago is not None:
+            SharedFile.objects.filter(pk=shared.pk).update(
+                expire_at=timezone.now() - timedelta(minutes=expired_minutes_ago)
+            )
+        return shared
+
+    def legacy_file(self, name, content, expired_minutes_ago):
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return SharedFile.objects.create(
+            user=self.user, file=name, size=len(content),
+            expire_at=timezone.now() - timedelta(minutes=expired_minutes_ago),
+        )
+
+    def test_batch_takes_the_oldest_expired_files(self):
+        oldest = self.shared(b"a", expired_minutes_ago=30)
+        self.shared(b"bb", expired_minutes_ago=10)
+        live = self.shared(b"ccc")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows, freed = reap_batch(timezone.now(), batch_size=1)
+        self.assertEqual((rows, freed), (1, 1))
+        self.assertFalse(SharedFile.objects.filter(pk=oldest.pk).exists())
+        self.assertEqual(SharedFile.objects.count(), 2)
+        self.assertTrue(SharedFile.objects.filter(pk=live.pk).exists())
+
+    def test_reap_expired_runs_every_batch(self):
+        for i in range(5):
+            self.shared(b"x" * (i + 1), expired_minutes_ago=i + 1)
+        live = self.shared(b"live")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows, freed = reap_expired(batch_size=2)
+        self.assertEqual((rows, freed), (5, 15))
+        self.assertEqual(list(SharedFile.objects.values_list("pk", flat=True)), [live.pk])
+        self.assertEqual(Blob.objects.count(), 1)
+
+    def test_legacy_files_are_removed_with_their_rows(self):
+        shared = self.legacy_file("shared/1/old.pdf", b"legacy", expired_minutes_ago=5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows, freed = reap_expired()
+        self.assertEqual((rows, freed), (1, len(b"legacy")))
+        self.assertFalse(default_storage.exists(shared.file.name))
+
+    def test_nothing_expired(self):
+        self.shared(b"live")
+        self.assertEqual(reap_expired(), (0, 0))
+
+    def test_command_reports_the_sweep(self):
+        self.shared(b"expired", expired_minutes_ago=1)
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("reap_expired", stdout=out)
+        self.assertIn("Deleted 1 expired file(s)", out.getvalue())
+        self.assertFalse(SharedFile.objects.exists())
+
+    def test_document_caches_are_pruned_where_the_engines_write(self):
+        entry = os.path.join(config.OCR_CACHE_DIR, "ab", "abc.txt")
+        filecache.write_text(config.OCR_CACHE_DIR, entry, "old text")
+        os.utime(entry, (0, 0))
+
+        self.assertEqual(reaper.prune_document_caches(), (1, len("old text")))
+        self.assertFalse(os.path.exists(entry))
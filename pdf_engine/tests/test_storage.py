@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pdf_engine import cache
+from pdf_engine.models import Blob, CachedResult, SharedFile
+from pdf_engine.reaper import reap_expired
+from pdf_engine.storage import create_shared_file, release_blob, share_blob, store_blob
+
+from .base import TempDirsMixin
+
+
+class BlobRefcountTests(TempDirsMixin, TestCase):
+    def refcount(self, blob):
+        return Blob.objects.get(pk=blob.pk).refcount
+
+    def test_identical_results_share_one_blob(self):
+        first = create_shared_file(self.user, self.make_file(b"same"), "a.pdf", 1)
+        second = create_shared_file(self.user, self.make_file(b"same", "b.pdf"), "b.pdf", 1)
+
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(self.refcount(first.blob), 2)
+        self.assertEqual(Blob.objects.count(), 1)
+
+    def test_share_takes_a_reference(self):
+        shared = create_shared_file(self.user, self.make_file(b"result"), "a.pdf", 1)
+        copy = share_blob(self.user, shared.blob, "copy.pdf", 1)
+
+        self.assertEqual(copy.file.name, shared.file.name)
+        self.assertEqual(self.refcount(shared.blob), 2)
+
+    def test_deleting_last_share_removes_file(self):
+        shared = create_shared_file(self.user, self.make_file(b"result"), "a.pdf", 1)
+        other = share_blob(self.user, shared.blob, "b.pdf", 1)
+        name = shared.blob.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(reverse("delete_pdf", args=[shared.token]))
+        self.assertRedirects(response, reverse("my_documents"))
+        self.assertEqual(self.refcount(other.blob), 1)
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_reaper_releases_expired_shares(self):
+        live = create_shared_file(self.user, self.make_file(b"result"), "a.pdf", 1)
+        expired = share_blob(self.user, live.blob, "b.pdf", 1)
+        SharedFile.objects.filter(pk=expired.pk).update(
+            expire_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rows, freed = reap_expired()
+        # The live share still holds the blob, so nothing was freed.
+        self.assertEqual((rows, freed), (1, 0))
+        self.assertEqual(self.refcount(live.blob), 1)
+
+        SharedFile.objects.filter(pk=live.pk).update(
+            expire_at=timezone.now() - timedelta(minutes=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            rows, freed = reap_expired()
+        self.assertEqual((rows, freed), (1, len(b"result")))
+        self.assertFalse(default_storage.exists(live.file.name))
+
+    def test_cache_eviction_keeps_shared_blob(self):
+        blob = store_blob(self.make_file(b"cached result"))
+        cache.store("k" * 64, "compress", blob, 1.0)
+        shared = share_blob(self.user, blob, "a.pdf", 1)
+        # store_blob's own reference, the cache entry and the share.
+        self.assertEqual(self.refcount(blob), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(cache.evict(max_bytes=0), 1)
+        self.assertFalse(CachedResult.objects.exists())
+        self.assertEqual(self.refcount(blob), 2)
+        self.assertTrue(default_storage.exists(shared.file.name))
+
+    def test_evicting_last_reference_removes_file(self):
+        blob = store_blob(self.make_file(b"cached result"))
+        cache.store("k" * 64, "compress", blob, 1.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            # The caller's reference goes first, as in run_job.
+            release_blob(blob)
+            cache.evict(max_bytes=0)
+
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(blob.file.name))
@@ -0,0 +1,95 @@
+import datetime
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+from openpyxl import Workbook
+from PyPDF2 import PdfReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from pdf_engine.core import tables
+
+
+class CellTests(SimpleTestCase):
+    def test_format_value(self):
+        self.assertEqual(tables.format_value(None), "")
+        self.assertEqual(tables.format_value(float("nan")), "")
+        self.assertEqual(tables.format_value(3.0), "3")
+        self.assertEqual(tables.format_value(0.1 + 0.2), "0.3")
+        self.assertEqual(tables.format_value(datetime.datetime(2024, 5, 1)), "2024-05-01")
+        self.assertEqual(tables.format_value("two\n lines"), "two lines")
+
+    def test_clip_adds_an_ellipsis(self):
+        self.assertEqual(tables.clip("short", 100), "short")
+
+        clipped = tables.clip("x" * 200, 50)
+        self.assertTrue(clipped.endswith(tables.ELLIPSIS))
+        self.assertLessEqual(stringWidth(clipped, tables.FONT, tables.FONT_SIZE), 50)
+        self.assertGreater(
+            stringWidth(clipped[:-1] + "x" + tables.ELLIPSIS, tables.FONT, tables.FONT_SIZE), 50
+        )
+
+    def test_fit_widths_narrows_only_the_widest(self):
+        widths = np.array([30.0, 40.0, 400.0, 300.0])
+        fitted = tables.fit_widths(widths, 500)
+        self.assertAlmostEqual(fitted.sum(), 500)
+        self.assertEqual(list(fitted[:2]), [30, 40])
+        self.assertEqual(fitted[2], fitted[3])
+
+        self.assertIs(tables.fit_widths(widths, 1000), widths)
+
+
+class RenderWorkbookTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def workbook(self, rows):
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        path = os.path.join(self.dir, "in.xlsx")
+        wb.save(path)
+        return path
+
+    def render(self, path):
+        output = os.path.join(self.dir, "out.pdf")
+        with mock.patch.object(
+            tables.TableRenderer, "draw_page", autospec=True,
+            side_effect=tables.TableRenderer.draw_page,
+        ) as draw_page:
+            tables.render_workbook(path, output)
+        return PdfReader(output), [call.args for call in draw_page.call_args_list]
+
+    def test_rows_are_split_across_pages(self):
+        path = self.workbook([["id", "name"]] + [[i, f"row {i}"] for i in range(150)])
+        reader, pages = self.render(path)
+
+        self.assertEqual(len(reader.pages), len(pages))
+        self.assertGreater(len(pages), 1)
+        self.assertEqual(sum(len(rows) for _, _, _, _, rows, _, _ in pages), 150)
+        # The header is repeated on every page.
+        self.assertTrue(all(header == ["id", "name"] for _, _, _, header, _, _, _ in pages))
+        self.assertIn("row 149", reader.pages[-1].extract_text())
+
+    @mock.patch.object(tables, "SAMPLE_ROWS", 3)
+    def test_layout_widens_for_rows_past_the_sample(self):
+        rows = [["a", "b"]] + [[1, 2]] * 2 + [[1, 2, "late", "cells"]]
+        _, [(_, _, _, header, page, offsets, widths)] = self.render(self.workbook(rows))
+
+        self.assertEqual(len(widths), 4)
+        self.assertEqual(len(offsets), 4)
+        self.assertEqual(header, ["a", "b", "", ""])
+        self.assertEqual(page[-1], ["1", "2", "late", "cells"])
+
+    def test_long_cells_are_clipped_to_the_page(self):
+        rows = [["h"] * 12] + [["value " * 20] * 12]
+        reader, [(_, pagesize, _, _, _, offsets, widths)] = self.render(self.workbook(rows))
+
+        # Too wide for portrait: turned to landscape, then narrowed to fit.
+        self.assertGreater(pagesize[0], pagesize[1])
+        self.assertLessEqual(offsets[-1] + widths[-1], pagesize[0] - tables.MARGIN + 1e-6)
+        self.assertIn(tables.ELLIPSIS, reader.pages[0].extract_text())
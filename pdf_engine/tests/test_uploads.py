@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from pdf_engine import jobs, uploads
+from pdf_engine.models import UploadSession
+
+from .base import TempDirsMixin
+
+
+@mock.patch.object(uploads, "CHUNK_SIZE", 4)
+class ChunkedUploadTests(TempDirsMixin, TestCase):
+    def create(self, content=b"0123456789"):
+        response = self.client.post(
+            reverse("upload_create"), {"filename": "in.pdf", "size": len(content)}
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def put(self, upload_id, offset, data):
+        return self.client.put(
+            reverse("upload_detail", args=[upload_id]) + f"?offset={offset}",
+            data, content_type="application/octet-stream",
+        )
+
+    def test_upload_in_chunks(self):
+        upload_id = self.create()
+        for offset in (0, 4, 8):
+            response = self.put(upload_id, offset, b"0123456789"[offset:offset + 4])
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["received"], 10)
+
+        response = self.client.post(reverse("upload_complete", args=[upload_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["complete"])
+
+        session = UploadSession.objects.get(pk=upload_id)
+        with open(uploads.session_path(session), "rb") as f:
+            self.assertEqual(f.read(), b"0123456789")
+
+    def test_resume_after_wrong_offset(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, b"0123")
+
+        # A retried chunk the server already has.
+        response = self.put(upload_id, 0, b"0123")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["received"], 4)
+
+        response = self.put(upload_id, 8, b"89")
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.get(reverse("upload_detail", args=[upload_id]))
+        self.assertEqual(response.json()["received"], 4)
+        self.assertEqual(self.put(upload_id, 4, b"4567").status_code, 200)
+        self.assertEqual(self.put(upload_id, 8, b"89").json()["received"], 10)
+
+    def test_oversized_chunk(self):
+        upload_id = self.create()
+        self.assertEqual(self.put(upload_id, 0, b"012345").status_code, 400)
+
+    def test_incomplete_upload_cannot_finish(self):
+        upload_id = self.create()
+        self.put(upload_id, 0, b"0123")
+        response = self.client.post(reverse("upload_complete", args=[upload_id]))
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.json()["complete"])
+
+    def test_no_chunks_after_completion(self):
+        upload_id = self.create(b"0123")
+        self.put(upload_id, 0, b"0123")
+        self.client.post(reverse("upload_complete", args=[upload_id]))
+        self.assertEqual(self.put(upload_id, 4, b"4").status_code, 409)
+
+    def test_other_users_uploads_are_hidden(self):
+        upload_id = self.create()
+        self.client.force_login(User.objects.create_user("bob"))
+        response = self.client.get(reverse("upload_detail", args=[upload_id]))
+        self.assertEqual(response.status_code, 404)
+
+    @mock.patch.object(uploads, "MAX_OPEN", 2)
+    def test_open_sessions_are_capped(self):
+        self.create()
+        self.create()
+        response = self.client.post(reverse("upload_create"), {"filename": "in.pdf", "size": 1})
+        self.assertEqual(response.status_code, 429)
+
+        # Another user has their own allowance.
+        self.client.force_login(User.objects.create_user("bob"))
+        self.create()
+
+    @mock.patch.object(uploads, "MAX_OPEN_BYTES", 15)
+    def test_reserved_bytes_are_capped(self):
+        self.create(b"0123456789")
+        response = self.client.post(reverse("upload_create"), {"filename": "in.pdf", "size": 6})
+        self.assertEqual(response.status_code, 429)
+        self.create(b"01234")
+
+    def test_repeated_ids_keep_their_order(self):
+        first, second = self.create(b"0123"), self.create(b"4567")
+        for upload_id, data in ((first, b"0123"), (second, b"4567")):
+            self.put(upload_id, 0, data)
+            self.client.post(reverse("upload_complete", args=[upload_id]))
+
+        sessions = uploads.finished_sessions(self.user, [first, second, first])
+        self.assertEqual([str(s.id) for s in sessions], [first, second, first])
+
+        job = jobs.enqueue_job(self.user, "merge", sessions)
+        contents = []
+        for item in job.inputs:
+            with open(item["path"], "rb") as f:
+                contents.append(f.read())
+        self.assertEqual(contents, [b"0123", b"4567", b"0123"])
+        self.assertFalse(UploadSession.objects.exists())
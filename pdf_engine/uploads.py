@@ -0,0 +1,143 @@
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import UploadSession
+from .storage import hash_file
+from accounts.models import UserProfile
+
+# Resumable chunked uploads. The client opens a session with the file's name
+# and size, PUTs fixed-size chunks at increasing offsets and finalizes it;
+# each chunk is appended to <UPLOAD_SESSION_DIR>/<id>.part as it arrives, so
+# nothing is buffered in memory and a dropped connection only costs the
+# chunk in flight. Finished sessions are passed to enqueue_job like uploaded
+# files and are consumed by it. A user can hold at most
+# UPLOAD_SESSION_MAX_OPEN sessions reserving UPLOAD_SESSION_MAX_OPEN_BYTES
+# between them until jobs consume them or the reaper removes them.
+
+UPLOAD_DIR = getattr(
+    settings, "UPLOAD_SESSION_DIR",
+    os.path.join(tempfile.gettempdir(), "pdf_engine_uploads"),
+)
+CHUNK_SIZE = getattr(settings, "UPLOAD_CHUNK_SIZE", 5 * 1024 ** 2)
+MAX_BYTES = getattr(settings, "UPLOAD_SESSION_MAX_BYTES", 1024 ** 3)
+MAX_AGE = getattr(settings, "UPLOAD_SESSION_MAX_AGE", 24 * 60 * 60)
+MAX_OPEN = getattr(settings, "UPLOAD_SESSION_MAX_OPEN", 20)
+MAX_OPEN_BYTES = getattr(settings, "UPLOAD_SESSION_MAX_OPEN_BYTES", 2 * 1024 ** 3)
+
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """A chunk or session request that can't be honoured."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def session_path(session):
+    return os.path.join(UPLOAD_DIR, f"{session.id}.part")
+
+
+def create_session(user, filename, size):
+    if size < 0:
+        raise UploadError("Invalid size")
+    if size > MAX_BYTES:
+        raise UploadError("File too large", status=413)
+
+    # Counted and created with the profile row locked, so parallel requests
+    # can't open more than the cap between them.
+    with transaction.atomic():
+        UserProfile.objects.select_for_update().get(pk=UserProfile.for_user(user).pk)
+        held = UploadSession.objects.filter(user=user).aggregate(
+            sessions=Count("pk"), size=Sum("size")
+        )
+        if held["sessions"] >= MAX_OPEN or (held["size"] or 0) + size > MAX_OPEN_BYTES:
+            raise UploadError("Too many unfinished uploads", status=429)
+        session = UploadSession.objects.create(
+            user=user, filename=os.path.basename(filename)[:255], size=size
+        )
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    open(session_path(session), "wb").close()
+    return session
+
+
+def write_chunk(session, offset, stream, length):
+    """Write `length` bytes from `stream` at `offset` and return the session.
+
+    Chunks must arrive in order: an offset other than the number of bytes
+    already received is answered with 409 so the client can resume from
+    the session's `received`.
+    """
+    if session.complete:
+        raise UploadError("Upload already finalized", status=409)
+    if offset != session.received:
+        raise UploadError("Unexpected offset", status=409)
+    if length <= 0 or length > CHUNK_SIZE or offset + length > session.size:
+        raise UploadError("Invalid chunk length")
+
+    written = 0
+    with open(session_path(session), "r+b") as f:
+        f.seek(offset)
+        while written < length:
+            data = stream.read(min(READ_SIZE, length - written))
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+    if written != length:
+        raise UploadError("Incomplete chunk")
+
+    # Only count the chunk if no other request got there first.
+    updated = UploadSession.objects.filter(
+        pk=session.pk, received=offset, complete=False
+    ).update(received=offset + length, updated_at=timezone.now())
+    session.refresh_from_db()
+    if not updated:
+        raise UploadError("Unexpected offset", status=409)
+    return session
+
+
+def finalize_session(session):
+    """Check the upload is whole and record its hash."""
+    if session.complete:
+        return session
+    if session.received != session.size:
+        raise UploadError("Upload incomplete", status=409)
+
+    session.sha256 = hash_file(session_path(session))
+    session.complete = True
+    session.save(update_fields=["sha256", "complete", "updated_at"])
+    return session
+
+
+def finished_sessions(user, ids):
+    """Return the user's finalized sessions for `ids`, in the given order.
+
+    An id listed twice (the same file merged with itself) appears twice.
+    """
+    try:
+        ids = [uuid.UUID(str(i)) for i in ids]
+    except ValueError:
+        raise UploadError("Unknown or unfinished upload")
+
+    sessions = UploadSession.objects.filter(user=user, complete=True).in_bulk(set(ids))
+    if len(sessions) != len(set(ids)):
+        raise UploadError("Unknown or unfinished upload")
+    return [sessions[i] for i in ids]
+
+
+def reap_stale_sessions(now=None):
+    """Delete sessions not touched for UPLOAD_SESSION_MAX_AGE seconds."""
+    now = now or timezone.now()
+    deleted, _ = UploadSession.objects.filter(
+        updated_at__lt=now - timedelta(seconds=MAX_AGE)
+    ).delete()
+    return deleted
@@ -27,4 +27,13 @@ urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard"),
 
     path("share/<uuid:token>/", views.share_file, name="share_file"),
+
+    path("jobs/<uuid:job_id>/", views.job_detail, name="job_detail"),
+    path("jobs/<uuid:job_id>/status/", views.job_status, name="job_status"),
+
+    path("uploads/", views.upload_create, name="upload_create"),
+    path("uploads/<uuid:upload_id>/", views.upload_detail, name="upload_detail"),
+    path("uploads/<uuid:upload_id>/complete/", views.upload_complete, name="upload_complete"),
+
+    path("metrics", views.metrics_view, name="metrics"),
 ]
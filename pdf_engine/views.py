@@ -1,96 +1,92 @@
-import os
-import uuid
-import tempfile
-import zipfile
-from datetime import timedelta
+import hmac
+from datetime import datetime, timedelta, timezone as dt_timezone
 
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import FileResponse
+from django.conf import settings
+from django.db.models import Count, Min, Q, Sum
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_POST, require_http_methods
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.core.files import File
 
-from PyPDF2 import PdfReader, PdfWriter, PdfMerger
-from docx import Document
-from docx2pdf import convert as docx2pdf_convert
-from pdf2image import convert_from_path
-from PIL import Image
-from .forms import SplitPDFForm, MergePDFForm, CompressPDFForm
+from .forms import SplitPDFForm, CompressPDFForm, PdfToImageForm, ImageToPdfForm
 
-import pandas as pd
-import tabula
-import pytesseract
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from openpyxl import load_workbook
-
-from .models import SharedFile
-from accounts.models import UserProfile
+from .models import SharedFile, ConversionJob, UploadSession
+from accounts.decorators import usage_limit
+from .jobs import WALL_TIME_BUCKETS, all_job_totals, enqueue_job
+from .delivery import serve_file
+from .uploads import (
+    CHUNK_SIZE, UploadError, create_session, write_chunk, finalize_session,
+    finished_sessions,
+)
 
 # =====================================================
-# UTILITIES
+# STATIC / DASHBOARD
 # =====================================================
 
-def unlock_pdf(uploaded_file, password=None):
-    if not uploaded_file:
-        raise ValueError("No PDF uploaded")
-
-    uploaded_file.seek(0)
-    reader = PdfReader(uploaded_file)
+def tools(request):
+    return render(request, "tools.html")
 
-    if reader.is_encrypted:
-        if not password or not reader.decrypt(password):
-            raise ValueError("Invalid PDF password")
 
-    writer = PdfWriter()
-    for page in reader.pages:
-        writer.add_page(page)
+def pricing(request):
+    return render(request, "pricing.html")
 
-    path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.pdf")
-    with open(path, "wb") as f:
-        writer.write(f)
 
-    return path
+DOCUMENTS_PAGE_SIZE = 50
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
 
 
-def create_shared_file(user, file_path, filename, days):
-    with open(file_path, "rb") as f:
-        shared = SharedFile.objects.create(
-            user=user,
-            expire_at=timezone.now() + timedelta(days=days)
-        )
-        shared.file.save(filename, File(f))
-    return shared
+def page_cursor(shared):
+    """Opaque position of a SharedFile in the newest-first listing."""
+    micros = (shared.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}-{shared.pk}"
 
 
-def ensure_visible_sheet(xlsx_path):
-    wb = load_workbook(xlsx_path)
-    if not any(ws.sheet_state == "visible" for ws in wb.worksheets):
-        wb.worksheets[0].sheet_state = "visible"
-        wb.save(xlsx_path)
-# =====================================================
-# STATIC / DASHBOARD
-# =====================================================
+def documents_page(request):
+    """Listing context for one page of the user's files, newest first.
 
-def tools(request):
-    return render(request, "tools.html")
+    Keyset pagination on (created_at, id) walks the (user, created_at)
+    index instead of counting past an OFFSET.
+    """
+    files = SharedFile.objects.filter(user=request.user)
+    totals = files.aggregate(count=Count("id"), used=Sum("size"))
 
+    before = request.GET.get("before", "")
+    try:
+        micros, pk = (int(part) for part in before.split("-"))
+        created_at = EPOCH + timedelta(microseconds=micros)
+        if not 0 < pk < 2 ** 63:
+            raise OverflowError("id out of range")
+    except (ValueError, OverflowError):
+        # Not a cursor we handed out: start from the first page.
+        before = ""
+    else:
+        files = files.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
 
-def pricing(request):
-    return render(request, "pricing.html")
+    page = list(files.order_by("-created_at", "-id")[:DOCUMENTS_PAGE_SIZE + 1])
+    has_more = len(page) > DOCUMENTS_PAGE_SIZE
+    page = page[:DOCUMENTS_PAGE_SIZE]
+    return {
+        "files": page,
+        "next_cursor": page_cursor(page[-1]) if has_more else None,
+        "is_first_page": not before,
+        "file_count": totals["count"],
+        "storage_used": totals["used"] or 0,
+        "now": timezone.now(),
+    }
 
 
 @login_required
 def dashboard(request):
-    files = SharedFile.objects.filter(user=request.user).order_by("-created_at")
-    return render(request, "dashboard.html", {"files": files})
+    return render(request, "my_documents.html", documents_page(request))
 
 
 @login_required
 def my_documents(request):
-    files = SharedFile.objects.filter(user=request.user).order_by("-created_at")
-    return render(request, "my_documents.html", {"files": files})
+    return render(request, "my_documents.html", documents_page(request))
 # =====================================================
 # VIEW / DOWNLOAD / DELETE / SHARE
 # =====================================================
@@ -101,19 +97,21 @@ def view_pdf(request, token):
     if shared.expire_at and shared.expire_at < timezone.now():
         messages.error(request, "Link expired")
         return redirect("my_documents")
-    return FileResponse(shared.file.open("rb"), as_attachment=False)
+    return serve_file(request, shared, as_attachment=False)
 
 
 @login_required
 def download_pdf(request, token):
     shared = get_object_or_404(SharedFile, token=token)
-    return FileResponse(shared.file.open("rb"), as_attachment=True)
+    if shared.is_expired():
+        return render(request, "share_expired.html", status=410)
+    return serve_file(request, shared, as_attachment=True)
 
 
 @login_required
 def delete_pdf(request, token):
     shared = get_object_or_404(SharedFile, token=token, user=request.user)
-    shared.file.delete(save=False)
+    # Releases the stored blob once no other share or cache entry uses it.
     shared.delete()
     messages.success(request, "File deleted")
     return redirect("my_documents")
@@ -122,131 +120,271 @@ def delete_pdf(request, token):
 @login_required
 def share_file(request, token):
     shared = get_object_or_404(SharedFile, token=token)
-    return FileResponse(
-        shared.file.open("rb"),
-        as_attachment=request.GET.get("download") == "1"
+    if shared.is_expired():
+        return render(request, "share_expired.html", status=410)
+    return serve_file(
+        request, shared, as_attachment=request.GET.get("download") == "1"
     )
 # =====================================================
-# PDF TOOLS
+# JOBS
 # =====================================================
 
 @login_required
-def unlock_pdf_view(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+def job_detail(request, job_id):
+    job = get_object_or_404(ConversionJob, id=job_id, user=request.user)
+    return render(request, "job.html", {"job": job})
 
-    if request.method == "POST":
-        pdf = request.FILES.get("file")
-        password = request.POST.get("password")
 
-        try:
-            path = unlock_pdf(pdf, password)
-            shared = create_shared_file(
-                request.user, path, f"unlocked_{pdf.name}", profile.share_days()
-            )
-        except Exception as e:
-            messages.error(request, str(e))
-            return redirect("unlock_pdf")
-        finally:
-            if "path" in locals() and os.path.exists(path):
-                os.remove(path)
+@login_required
+def job_status(request, job_id):
+    job = get_object_or_404(
+        ConversionJob.objects.select_related("result"), id=job_id, user=request.user
+    )
+    data = {
+        "id": str(job.id),
+        "operation": job.operation,
+        "status": job.status,
+        "error": job.error,
+        "token": None,
+        "share_url": None,
+        "input_bytes": job.input_bytes,
+        "output_bytes": None,
+    }
+    if job.status == ConversionJob.DONE and job.result_id:
+        data["token"] = str(job.result.token)
+        data["share_url"] = f"/share/{job.result.token}/"
+        data["output_bytes"] = job.output_bytes
+    return JsonResponse(data)
 
-        profile.increment()
-        return render(request, "unlock.html", {
-            "share_url": f"/share/{shared.token}/"
-        })
 
-    return render(request, "unlock.html")
+# =====================================================
+# METRICS
+# =====================================================
 
-import os
-import uuid
-import tempfile
-from datetime import timedelta
+STAGE_WINDOW = timedelta(hours=1)
 
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib import messages
-from django.contrib.auth.decorators import login_required
-from django.utils import timezone
-from django.core.files import File
 
-from PyPDF2 import PdfReader, PdfWriter, PdfMerger
-from .models import SharedFile
-from accounts.models import UserProfile
+def exposition(name, kind, help_text, samples):
+    """Prometheus text format lines for one metric; samples are (labels, value)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value or 0:g}" if labels else f"{name} {value or 0:g}")
+    return lines
 
-# =================== Utilities ===================
 
-def unlock_pdf(uploaded_file, password=None):
-    """Unlocks an uploaded PDF and saves a temp copy."""
-    if not uploaded_file:
-        raise ValueError("No PDF uploaded")
+def metrics_view(request):
+    """Job counters, timings and queue depth, for Prometheus to scrape.
 
-    uploaded_file.seek(0)
-    reader = PdfReader(uploaded_file)
+    Workers record per-job measurements on ConversionJob rows, so the
+    numbers cover every worker process, not just this one. Rows pruned by
+    the reaper live on in JobTotals.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return HttpResponseForbidden()
+    else:
+        # Behind a proxy on the same host every request comes from loopback;
+        # set METRICS_TOKEN there (or block /metrics at the proxy).
+        allowed = getattr(settings, "METRICS_ALLOWED_IPS", ("127.0.0.1", "::1"))
+        if request.META.get("REMOTE_ADDR") not in allowed:
+            return HttpResponseForbidden()
+
+    totals = all_job_totals()
+    queue = ConversionJob.objects.filter(
+        status__in=(ConversionJob.QUEUED, ConversionJob.RUNNING)
+    ).aggregate(
+        queued=Count("id", filter=Q(status=ConversionJob.QUEUED)),
+        running=Count("id", filter=Q(status=ConversionJob.RUNNING)),
+        oldest=Min("created_at", filter=Q(status=ConversionJob.QUEUED)),
+    )
 
-    if reader.is_encrypted:
-        if not password or not reader.decrypt(password):
-            raise ValueError("Invalid PDF password")
+    stages = {}
+    recent = ConversionJob.objects.filter(finished_at__gte=timezone.now() - STAGE_WINDOW)
+    for operation, job_stages in recent.values_list("operation", "stages").iterator():
+        for stage, seconds in job_stages.items():
+            key = (operation, stage)
+            stages[key] = stages.get(key, 0) + seconds
+
+    def by_job(field):
+        return [({"operation": t["operation"], "status": t["status"]}, t[field]) for t in totals]
+
+    def by_operation(field, combine=lambda a, b: a + b):
+        merged = {}
+        for t in totals:
+            merged[t["operation"]] = combine(merged.get(t["operation"], 0), t[field] or 0)
+        return [({"operation": op}, value) for op, value in merged.items()]
+
+    timed = {}
+    for t in totals:
+        count, seconds, buckets = timed.get(t["operation"], (0, 0, [0] * len(WALL_TIME_BUCKETS)))
+        timed[t["operation"]] = (
+            count + t["wall_count"], seconds + t["wall_time"],
+            [a + b for a, b in zip(buckets, t["wall_buckets"])],
+        )
 
-    writer = PdfWriter()
-    for page in reader.pages:
-        writer.add_page(page)
+    histogram = []
+    for op, (count, _, buckets) in timed.items():
+        for bound, value in zip(WALL_TIME_BUCKETS, buckets):
+            histogram.append((f'operation="{op}",le="{bound:g}"', value))
+        histogram.append((f'operation="{op}",le="+Inf"', count))
+
+    oldest = queue["oldest"]
+    lines = (
+        exposition("pdf_jobs_total", "counter", "Finished conversion jobs.", by_job("jobs"))
+        + exposition("pdf_job_cache_hits_total", "counter",
+                     "Jobs answered from the result cache.", by_operation("cache_hits"))
+        + ["# HELP pdf_job_wall_seconds Wall time of conversion jobs.",
+           "# TYPE pdf_job_wall_seconds histogram"]
+        + [f"pdf_job_wall_seconds_bucket{{{labels}}} {value}" for labels, value in histogram]
+        + [f'pdf_job_wall_seconds_sum{{operation="{op}"}} {seconds:g}'
+           for op, (_, seconds, _) in timed.items()]
+        + [f'pdf_job_wall_seconds_count{{operation="{op}"}} {count}'
+           for op, (count, _, _) in timed.items()]
+        + exposition("pdf_job_cpu_seconds_total", "counter",
+                     "CPU time of conversion jobs, pool processes included.", by_operation("cpu_time"))
+        + exposition("pdf_job_peak_rss_bytes", "gauge",
+                     "Largest peak RSS of a single job.", by_operation("peak_rss", max))
+        + exposition("pdf_job_input_bytes_total", "counter",
+                     "Bytes uploaded to conversion jobs.", by_operation("input_bytes"))
+        + exposition("pdf_job_output_bytes_total", "counter",
+                     "Bytes produced by conversion jobs.", by_operation("output_bytes"))
+        + exposition("pdf_job_pages_total", "counter",
+                     "Pages (or images) read by conversion jobs.", by_operation("pages"))
+        + exposition("pdf_job_stage_seconds_last_hour", "gauge",
+                     "Time spent per pipeline stage by jobs finished in the last hour.",
+                     [({"operation": op, "stage": stage}, secs)
+                      for (op, stage), secs in sorted(stages.items())])
+        + exposition("pdf_jobs_queued", "gauge", "Jobs waiting for a worker.",
+                     [({}, queue["queued"])])
+        + exposition("pdf_jobs_running", "gauge", "Jobs being converted.",
+                     [({}, queue["running"])])
+        + exposition("pdf_queue_oldest_seconds", "gauge", "Age of the oldest queued job.",
+                     [({}, (timezone.now() - oldest).total_seconds() if oldest else 0)])
+    )
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4")
 
-    temp_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.pdf")
-    with open(temp_path, "wb") as f:
-        writer.write(f)
+# =====================================================
+# CHUNKED UPLOADS
+# =====================================================
 
-    return temp_path
+def upload_json(session):
+    return {
+        "id": str(session.id),
+        "filename": session.filename,
+        "size": session.size,
+        "received": session.received,
+        "complete": session.complete,
+        "chunk_size": CHUNK_SIZE,
+    }
 
-def create_shared_file(user, file_path, filename, days):
-    """Create a SharedFile entry for download or sharing."""
-    with open(file_path, "rb") as f:
-        shared = SharedFile.objects.create(
-            user=user,
-            expire_at=timezone.now() + timedelta(days=days)
-        )
-        shared.file.save(filename, File(f))
-    return shared
 
-# =================== Merge PDF ===================
+def collect_uploads(request, field):
+    """Files posted in `field` followed by the finished sessions in upload_ids."""
+    files = request.FILES.getlist(field)
+    return files + finished_sessions(request.user, request.POST.getlist("upload_ids"))
+
+
+def single_upload(request, field):
+    """The one file posted in `field` or passed as an upload id, else None."""
+    files = collect_uploads(request, field)
+    return files[0] if len(files) == 1 else None
+
 
 @login_required
-def merge(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+@require_POST
+def upload_create(request):
+    try:
+        size = int(request.POST.get("size", ""))
+        session = create_session(request.user, request.POST.get("filename") or "upload", size)
+    except ValueError:
+        return JsonResponse({"error": "Invalid size"}, status=400)
+    except UploadError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    return JsonResponse(upload_json(session), status=201)
+
+
+@login_required
+@require_http_methods(["GET", "PUT"])
+def upload_detail(request, upload_id):
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+    if request.method == "PUT":
+        try:
+            offset = int(request.GET.get("offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return JsonResponse({"error": "Invalid offset"}, status=400)
+
+        try:
+            write_chunk(session, offset, request, length)
+        except UploadError as e:
+            # Tell the client where to resume from.
+            session.refresh_from_db()
+            return JsonResponse({"error": str(e), **upload_json(session)}, status=e.status)
+
+    return JsonResponse(upload_json(session))
+
+
+@login_required
+@require_POST
+def upload_complete(request, upload_id):
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+    try:
+        finalize_session(session)
+    except UploadError as e:
+        return JsonResponse({"error": str(e), **upload_json(session)}, status=e.status)
+    return JsonResponse(upload_json(session))
+
+
+# =====================================================
+# PDF TOOLS
+# =====================================================
 
+@login_required
+@usage_limit
+def unlock_pdf_view(request):
     if request.method == "POST":
-        files = request.FILES.getlist("pdf_files")  # matches your form field
-        if len(files) < 2:
-            messages.error(request, "Select at least 2 PDFs")
-            return redirect("merge")
+        try:
+            pdf = single_upload(request, "file")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("unlock_pdf_view")
+        password = request.POST.get("password")
+
+        if not pdf:
+            messages.error(request, "Please upload a PDF file.")
+            return redirect("unlock_pdf_view")
+
+        job = enqueue_job(request.user, "unlock", [pdf], password=password)
+        return redirect("job_detail", job_id=job.id)
+
+    return render(request, "unlock.html")
 
-        merger = PdfMerger()
-        temp_paths = []
+# =================== Merge PDF ===================
 
+@login_required
+@usage_limit
+def merge(request):
+    if request.method == "POST":
         try:
-            for f in files:
-                temp_path = unlock_pdf(f)
-                temp_paths.append(temp_path)
-                with open(temp_path, "rb") as pdf_file:
-                    merger.append(pdf_file)
-
-            output_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.pdf")
-            merger.write(output_path)
-            merger.close()
-
-            shared = create_shared_file(
-                request.user, output_path, "merged.pdf", profile.share_days()
-            )
+            files = collect_uploads(request, "pdf_files")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("merge")
 
-        finally:
-            # Clean up temp files safely
-            for path in temp_paths + [output_path]:
-                try:
-                    if os.path.exists(path):
-                        os.remove(path)
-                except PermissionError:
-                    pass
+        if len(files) < 2:
+            messages.error(request, "Select at least 2 PDFs")
+            return redirect("merge")
 
-        profile.increment()
-        return render(request, "merge.html", {"share_url": f"/share/{shared.token}/"})
+        page_ranges = [spec.strip() or None for spec in request.POST.getlist("page_ranges")]
+        job = enqueue_job(
+            request.user, "merge", files,
+            page_ranges=page_ranges if any(page_ranges) else None,
+        )
+        return redirect("job_detail", job_id=job.id)
 
     return render(request, "merge.html")
 
@@ -255,55 +393,28 @@ def merge(request):
 
 # ================= SPLIT =================
 @login_required
+@usage_limit
 def split_pdf_view(request):
     if request.method == 'POST':
-        form = SplitPDFForm(request.POST, request.FILES)
-        if form.is_valid():
-            pdf_file = request.FILES['pdf_file']
-            split_mode = form.cleaned_data['split_mode']
-            reader = PdfReader(pdf_file)
-            num_pages = len(reader.pages)
-            writers = []
-
-            # Fixed split
-            if split_mode == 'fixed':
-                range_size = form.cleaned_data['range_size']
-                for i in range(0, num_pages, range_size):
-                    writer = PdfWriter()
-                    for j in range(i, min(i + range_size, num_pages)):
-                        writer.add_page(reader.pages[j])
-                    writers.append(writer)
-
-            # Custom ranges
-            else:
-                custom_ranges = form.cleaned_data['custom_ranges']
-                try:
-                    for part in custom_ranges.split(','):
-                        writer = PdfWriter()
-                        if '-' in part:
-                            start, end = map(int, part.split('-'))
-                            for i in range(start - 1, min(end, num_pages)):
-                                writer.add_page(reader.pages[i])
-                        else:
-                            i = int(part) - 1
-                            if i < num_pages:
-                                writer.add_page(reader.pages[i])
-                        writers.append(writer)
-                except Exception:
-                    form.add_error('custom_ranges', 'Invalid page range format.')
-                    return render(request, 'split_pdf.html', {'form': form})
-
-            # Save temp PDFs
-            temp_paths = []
-            for idx, writer in enumerate(writers, start=1):
-                path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}_part{idx}.pdf")
-                with open(path, 'wb') as f:
-                    writer.write(f)
-                temp_paths.append(path)
-
-            message = f"{len(temp_paths)} PDF(s) created."
-            return render(request, 'split_pdf.html', {'form': form, 'message': message, 'files': temp_paths})
+        try:
+            pdf = single_upload(request, 'pdf_file')
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("split")
+
+        if not pdf:
+            messages.error(request, "Please upload a PDF file.")
+            return redirect("split")
 
+        form = SplitPDFForm(request.POST)
+        if form.is_valid():
+            job = enqueue_job(
+                request.user, "split", [pdf],
+                split_mode=form.cleaned_data['split_mode'],
+                range_size=form.cleaned_data['range_size'],
+                custom_ranges=form.cleaned_data['custom_ranges'] or None,
+            )
+            return redirect("job_detail", job_id=job.id)
     else:
         form = SplitPDFForm()
 
@@ -312,37 +423,26 @@ def split_pdf_view(request):
 
 # ================= COMPRESS =================
 @login_required
+@usage_limit
 def compress(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        form = CompressPDFForm(request.POST, request.FILES)
-        if form.is_valid():
-            pdf = request.FILES['pdf_file']
-            path = unlock_pdf(pdf)
-            reader = PdfReader(path)
-            writer = PdfWriter()
-
-            for page in reader.pages:
-                page.compress_content_streams()
-                writer.add_page(page)
+        try:
+            pdf = single_upload(request, 'pdf_file')
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("compress")
 
-            compressed_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.pdf")
-            with open(compressed_path, "wb") as f:
-                writer.write(f)
+        if not pdf:
+            messages.error(request, "Please upload a PDF file.")
+            return redirect("compress")
 
-            shared = create_shared_file(
-                request.user, compressed_path, "compressed.pdf", profile.share_days()
+        form = CompressPDFForm(request.POST)
+        if form.is_valid():
+            job = enqueue_job(
+                request.user, "compress", [pdf],
+                compression_level=form.cleaned_data['compression_level'],
             )
-
-            # Cleanup temp
-            try: os.remove(path)
-            except PermissionError: pass
-            try: os.remove(compressed_path)
-            except PermissionError: pass
-
-            profile.increment()
-            return render(request, "compress.html", {"form": form, "share_url": f"/share/{shared.token}/"})
+            return redirect("job_detail", job_id=job.id)
     else:
         form = CompressPDFForm()
 
@@ -353,261 +453,137 @@ def compress(request):
 # =====================================================
 
 @login_required
+@usage_limit
 def word_to_pdf(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        file = request.FILES.get("file")
-
-        docx_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.docx")
-        pdf_path = docx_path.replace(".docx", ".pdf")
-
-        with open(docx_path, "wb") as f:
-            for c in file.chunks():
-                f.write(c)
-
-        docx2pdf_convert(docx_path, pdf_path)
-
-        shared = create_shared_file(
-            request.user, pdf_path, "output.pdf", profile.share_days()
-        )
+        try:
+            file = single_upload(request, "file")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("word_to_pdf")
 
-        os.remove(docx_path)
-        os.remove(pdf_path)
-        profile.increment()
+        if not file:
+            messages.error(request, "Please upload a Word file.")
+            return redirect("word_to_pdf")
 
-        return render(request, "word_to_pdf.html", {
-            "share_url": f"/share/{shared.token}/"
-        })
+        job = enqueue_job(request.user, "word_to_pdf", [file])
+        return redirect("job_detail", job_id=job.id)
 
     return render(request, "word_to_pdf.html")
 
 @login_required
+@usage_limit
 def image_to_pdf(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        images = request.FILES.getlist("files")
-        pil = []
-
-        for img in images:
-            im = Image.open(img)
-            if im.mode != "RGB":
-                im = im.convert("RGB")
-            pil.append(im)
-
-        pdf_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.pdf")
-        pil[0].save(pdf_path, save_all=True, append_images=pil[1:])
+        form = ImageToPdfForm(request.POST)
+        try:
+            images = collect_uploads(request, "files")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("image_to_pdf")
 
-        shared = create_shared_file(
-            request.user, pdf_path, "images.pdf", profile.share_days()
-        )
+        if not images:
+            messages.error(request, "Please upload at least one image.")
+            return redirect("image_to_pdf")
 
-        os.remove(pdf_path)
-        profile.increment()
+        if not form.is_valid():
+            messages.error(request, "Invalid page options.")
+            return redirect("image_to_pdf")
 
-        return render(request, "image_to_pdf.html", {
-            "share_url": f"/share/{shared.token}/"
-        })
+        job = enqueue_job(request.user, "image_to_pdf", images, **form.cleaned_data)
+        return redirect("job_detail", job_id=job.id)
 
     return render(request, "image_to_pdf.html")
 
 @login_required
+@usage_limit
 def pdf_to_excel(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        pdf = request.FILES.get("file")
-        path = unlock_pdf(pdf)
-
-        excel = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.xlsx")
-
-        tables = tabula.read_pdf(path, pages="all", multiple_tables=True)
-
-        if not tables:
-            reader = PdfReader(path)
-            rows = []
-            for p in reader.pages:
-                text = p.extract_text()
-                if text:
-                    for line in text.splitlines():
-                        rows.append([line])
-            tables = [pd.DataFrame(rows, columns=["Content"])]
-
-        with pd.ExcelWriter(excel, engine="openpyxl") as writer:
-            for i, t in enumerate(tables):
-                t.to_excel(writer, sheet_name=f"Sheet{i+1}", index=False)
+        try:
+            pdf = single_upload(request, "file")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("pdf_to_excel")
 
-        ensure_visible_sheet(excel)
+        if not pdf:
+            messages.error(request, "Please upload a PDF file.")
+            return redirect("pdf_to_excel")
 
-        shared = create_shared_file(
-            request.user, excel, "output.xlsx", profile.share_days()
+        job = enqueue_job(
+            request.user, "pdf_to_excel", [pdf],
+            password=request.POST.get("password") or None,
+            pages=request.POST.get("pages") or None,
         )
-
-        os.remove(path)
-        os.remove(excel)
-        profile.increment()
-
-        return render(request, "pdf_to_excel.html", {
-            "share_url": f"/share/{shared.token}/"
-        })
+        return redirect("job_detail", job_id=job.id)
 
     return render(request, "pdf_to_excel.html")
 
 @login_required
+@usage_limit
 def excel_to_pdf(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        excel = request.FILES.get("file")
-
-        excel_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.xlsx")
-        with open(excel_path, "wb") as f:
-            for c in excel.chunks():
-                f.write(c)
-
-        df = pd.read_excel(excel_path)
-        pdf_path = excel_path.replace(".xlsx", ".pdf")
-
-        c = canvas.Canvas(pdf_path, pagesize=A4)
-        w, h = A4
-        y = h - 40
-
-        for _, row in df.iterrows():
-            x = 40
-            for v in row:
-                c.drawString(x, y, str(v))
-                x += 120
-            y -= 20
-            if y < 40:
-                c.showPage()
-                y = h - 40
-
-        c.save()
-
-        shared = create_shared_file(
-            request.user, pdf_path, "output.pdf", profile.share_days()
-        )
+        try:
+            excel = single_upload(request, "file")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("excel_to_pdf")
 
-        os.remove(excel_path)
-        os.remove(pdf_path)
-        profile.increment()
+        if not excel:
+            messages.error(request, "Please upload an Excel file.")
+            return redirect("excel_to_pdf")
+
+        job = enqueue_job(request.user, "excel_to_pdf", [excel])
+        return redirect("job_detail", job_id=job.id)
 
-        return render(request, "excel_to_pdf.html", {
-            "share_url": f"/share/{shared.token}/"
-        })
     return render(request, "excel_to_pdf.html")
 
 @login_required
+@usage_limit
 def pdf_to_word(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        pdf = request.FILES.get("file")
+        try:
+            pdf = single_upload(request, "file")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("pdf_to_word")
 
         if not pdf:
             messages.error(request, "Please upload a PDF file.")
             return redirect("pdf_to_word")
 
-        try:
-            pdf_path = unlock_pdf(pdf)
-            reader = PdfReader(pdf_path)
-            doc = Document()
-
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    doc.add_paragraph(text)
-
-            docx_path = os.path.join(
-                tempfile.gettempdir(), f"{uuid.uuid4()}.docx"
-            )
-            doc.save(docx_path)
-
-            shared = create_shared_file(
-                request.user,
-                docx_path,
-                "output.docx",
-                profile.share_days()
-            )
-
-        except Exception as e:
-            messages.error(request, f"Conversion failed: {e}")
-            return redirect("pdf_to_word")
-
-        finally:
-            if "pdf_path" in locals() and os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            if "docx_path" in locals() and os.path.exists(docx_path):
-                os.remove(docx_path)
-
-        profile.increment()
-        return render(
-            request,
-            "pdf_to_word.html",
-            {"share_url": f"/share/{shared.token}/"}
+        job = enqueue_job(
+            request.user, "pdf_to_word", [pdf],
+            password=request.POST.get("password") or None,
         )
+        return redirect("job_detail", job_id=job.id)
 
     return render(request, "pdf_to_word.html")
 @login_required
+@usage_limit
 def pdf_to_image(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        pdf = request.FILES.get("file")
+        form = PdfToImageForm(request.POST)
+        try:
+            pdf = single_upload(request, "file")
+        except UploadError as e:
+            messages.error(request, str(e))
+            return redirect("pdf_to_image")
 
         if not pdf:
             messages.error(request, "Please upload a PDF file.")
             return redirect("pdf_to_image")
-
-        try:
-            # Unlock PDF (handles encrypted + normal PDFs)
-            pdf_path = unlock_pdf(pdf)
-
-            # Convert PDF → images
-            images = convert_from_path(
-                pdf_path,
-                dpi=200,
-                poppler_path=r"C:\poppler\Library\bin"  # ⚠️ REQUIRED ON WINDOWS
-            )
-
-            # Zip output
-            zip_path = os.path.join(
-                tempfile.gettempdir(), f"{uuid.uuid4()}.zip"
-            )
-
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
-                for i, img in enumerate(images, start=1):
-                    img_path = os.path.join(
-                        tempfile.gettempdir(), f"page_{i}.png"
-                    )
-                    img.save(img_path, "PNG")
-                    z.write(img_path, f"page_{i}.png")
-                    os.remove(img_path)
-
-            shared = create_shared_file(
-                request.user,
-                zip_path,
-                "images.zip",
-                profile.share_days()
-            )
-
-        except Exception as e:
-            messages.error(request, f"Conversion failed: {e}")
+        if not form.is_valid():
+            for field, errors in form.errors.items():
+                label = form.fields[field].label if field in form.fields else None
+                for error in errors:
+                    messages.error(request, f"{label}: {error}" if label else error)
             return redirect("pdf_to_image")
 
-        finally:
-            if "pdf_path" in locals() and os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            if "zip_path" in locals() and os.path.exists(zip_path):
-                os.remove(zip_path)
-
-        profile.increment()
-        return render(
-            request,
-            "pdf_to_image.html",
-            {"share_url": f"/share/{shared.token}/"}
+        job = enqueue_job(
+            request.user, "pdf_to_image", [pdf],
+            dpi=form.cleaned_data["dpi"],
+            image_format=form.cleaned_data["image_format"],
         )
+        return redirect("job_detail", job_id=job.id)
 
     return render(request, "pdf_to_image.html")
-